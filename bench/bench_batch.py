@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_batch.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+hcwr --batch: erzeugt N Benutzer mit eigener time.db und hcwr.conf (gemeinsame keyword_id.db),
+misst die Wandzeit von 'hcwr --batch' mit 1 Prozess und mit --jobs Prozessen und prüft,
+dass jeder Batch-Bericht der Ausgabe von 'hcwr -n' mit der Config des Benutzers entspricht.
+user0 bekommt in der Berichtswoche einen Eintrag mit zwei Contract-Keywords, --batch muss
+ohne Rückfrage den ersten Treffer nehmen wie 'hcwr -n' mit der Antwort 1.
+
+Beispiel:
+    python3 bench/bench_batch.py -u 8
+    python3 bench/bench_batch.py -u 16 -j 1 -j 4 -j 8 -y 2
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+from datetime import date, timedelta
+
+from hcwr_bench_db import create_time_db, day_entry, CONTRACT_PIDS, KEYWORDS
+from bench_suite import BIN_DIR, MODULE_DIR, write_config
+
+def run_batch(users_toml, out_dir, year, week, jobs, env):
+    cmd = [sys.executable, os.path.join(BIN_DIR, "hcwr"), "--batch", users_toml, "-y", str(year), "-w", str(week),
+           "--out-dir", out_dir, "--jobs", str(jobs)]
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    return (time.perf_counter() - t0) * 1000, proc.returncode, proc.stdout
+
+def report_of(config, year, week, env):
+    """Bericht wie ihn 'hcwr -n' für diese Config auf stdout ausgibt."""
+    cmd = [sys.executable, os.path.join(BIN_DIR, "hcwr"), "-n", "-c", config, "-y", str(year), "-w", str(week)]
+    # Rückfragen mit 1 beantworten: bei [J/n] bleibt der Eintrag unverändert,
+    # bei mehrdeutigen Keywords gilt der erste Treffer wie bei --batch
+    proc = subprocess.run(cmd, env=env, input="1\n" * 1000, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return proc.stdout
+
+def add_ambiguous_entry(db_path, year, week):
+    """Bucht am Montag der Berichtswoche einen Eintrag, der auf zwei Contract-Keywords passt."""
+    monday = date.fromisocalendar(year, week, 1)
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO entries (project_id, start_time, stop_time, description) VALUES (?, ?, ?, ?)",
+                 day_entry(monday, CONTRACT_PIDS[0], f"{KEYWORDS[0]} und {KEYWORDS[3]} Abstimmung", hours=1))
+    conn.commit()
+    conn.close()
+
+def same_report(report, stdout):
+    """
+    Vergleicht den Batch-Bericht mit dem Ende der 'hcwr -n' Ausgabe. Die erste Zeile folgt dort
+    ohne Zeilenumbruch auf den Fortschrittsbalken, verglichen wird sie ab 'Wochenfazit:'.
+    """
+    lines = report.splitlines()
+    expected = stdout.splitlines()[-len(lines):]
+    if not lines or len(expected) != len(lines) or expected[1:] != lines[1:]:
+        return False
+    return expected[0].endswith(lines[0].partition(":")[2])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-u", "--users", type=int, default=8, help="Anzahl Benutzer")
+    parser.add_argument("-j", "--jobs", type=int, action="append", help="Prozesse, mehrfach möglich (Default: 1 und CPU-Anzahl)")
+    parser.add_argument("-y", "--years", type=int, default=1, help="Jahre je time.db")
+    parser.add_argument("--last-day", default="2025-12-31", help="letzter Tag der time.db, Berichtswoche ist die KW davor")
+    args = parser.parse_args()
+
+    last_day = date.fromisoformat(args.last_day)
+    year, week = (last_day - timedelta(days=7)).isocalendar()[:2]
+    jobs_list = args.jobs or sorted({1, os.cpu_count() or 1})
+
+    with tempfile.TemporaryDirectory(prefix="hcwr-batch-bench-") as tmp:
+        lead = os.path.join(tmp, "lead")
+        env = dict(os.environ, HOME=lead, HCWR_NO_DAEMON="1")
+        for key in ("WEEK", "KW", "YEAR", "DATABASE", "GROUP", "EMAIL"):
+            env.pop(key, None)
+        # bin/hcwr lädt seine Module nur, wenn MODULE_DIR noch nicht in sys.path steht
+        env["PYTHONPATH"] = os.pathsep.join(p for p in env.get("PYTHONPATH", "").split(os.pathsep)
+                                            if p and os.path.abspath(p) != MODULE_DIR)
+
+        keyword_db = os.path.join(tmp, "keyword_id.db")
+        lines = []
+        for n in range(args.users):
+            home = os.path.join(tmp, f"user{n}")
+            db_path = os.path.join(home, "time.db")
+            os.makedirs(home, exist_ok=True)
+            first_day, count = create_time_db(db_path, args.years, 4, last_day=last_day, seed=74 + n,
+                                              projects=40, contract_keywords=100 if n == 0 else 0,
+                                              absence_density=0.08, holidays=True,
+                                              keyword_db=keyword_db if n == 0 else None)
+            if n == 0:
+                add_ambiguous_entry(db_path, year, week)
+            write_config(home, db_path, keyword_db, first_day)
+            lines.append(f'[[user]]\nname = "user{n}"\nconfig = "{home}/.heco/hcwr.conf"\n')
+        write_config(lead, os.path.join(tmp, "user0", "time.db"), keyword_db, first_day)
+        users_toml = os.path.join(tmp, "users.toml")
+        with open(users_toml, "w") as f:
+            f.write("\n".join(lines))
+        print(f"{args.users} Benutzer, {args.years} Jahr(e) je time.db, Berichtswoche {year}/{week}")
+
+        base = None
+        for jobs in jobs_list:
+            out_dir = os.path.join(tmp, f"out-{jobs}")
+            # Erster Lauf baut Ledger und .pyc auf, gemessen wird der zweite
+            run_batch(users_toml, out_dir, year, week, jobs, env)
+            ms, code, output = run_batch(users_toml, out_dir, year, week, jobs, env)
+            base = base or ms
+            status = "" if code == 0 else f"  Exit-Code {code}"
+            print(f"--jobs {jobs:>2}: {ms:>8.0f} ms  ({ms / args.users:>6.0f} ms je Benutzer, Speedup {base / ms:.2f}){status}")
+            if code:
+                print(output)
+
+        diffs = 0
+        for n in range(args.users):
+            expected = report_of(os.path.join(tmp, f"user{n}", ".heco", "hcwr.conf"), year, week, env)
+            for jobs in jobs_list:
+                path = os.path.join(tmp, f"out-{jobs}", str(year), str(week), f"user{n}.txt")
+                with open(path) as f:
+                    if not same_report(f.read(), expected):
+                        diffs += 1
+                        print(f"Abweichung: user{n} mit --jobs {jobs}")
+        print(f"Berichte gleich 'hcwr -n': {diffs == 0} ({args.users * len(jobs_list)} Berichte)")
+        sys.exit(1 if diffs else 0)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_contract_keywords.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+Benchmark Contract-Keyword-Suche: ein Regex je Keyword (früher get_contract_id)
+gegenüber dem Aho-Corasick-Index aus hcwr_keyword_mod, bei wachsender Keyword-Anzahl.
+
+Beispiel:
+    python3 bench/bench_contract_keywords.py -e 100
+"""
+import re
+import time
+import random
+import argparse
+
+import hcwr_bench_db
+from hcwr_keyword_mod import ContractKeywordIndex
+
+WORDS = ["pflege", "betrieb", "keycloak", "openslides", "datenbank", "relationale datenbank",
+         "crypto-vote", "projektor-service", "features", "über", "straße", "c++", "_intern"]
+
+def make_keywords(rnd, count):
+    rows = [(w, f"#{4000 + i}", "Projekt") for i, w in enumerate(WORDS)]
+    while len(rows) < count:
+        word = "".join(rnd.choice("abcdefghijklmnopqrstuvwxyzäöü") for _ in range(rnd.randint(4, 12)))
+        rows.append((word, f"#{5000 + len(rows)}", "Projekt"))
+    return rows
+
+def make_entries(rnd, rows, count):
+    fill = ["Review", "Meeting", "Fix", "für", "das", "Ticket", "-", "(", ")", "Doku"]
+    entries = []
+    for _ in range(count):
+        parts = [rnd.choice(fill) for _ in range(rnd.randint(3, 10))]
+        for _ in range(rnd.randint(0, 2)):
+            parts.insert(rnd.randint(0, len(parts)), rnd.choice(rows)[0].upper())
+        entries.append(" ".join(parts))
+    return entries
+
+def legacy_find(rows, entry_lower):
+    found = []
+    for keyword, contract_id, task in rows:
+        pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
+        if re.search(pattern, entry_lower):
+            found.append((keyword, contract_id, task))
+    return found
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-e", "--entries", type=int, default=100)
+    args = parser.parse_args()
+    rnd = random.Random(74)
+
+    for count in (20, 200, 2000, 5000):
+        rows = make_keywords(rnd, count)
+        entries = make_entries(rnd, rows, args.entries)
+
+        t0 = time.perf_counter()
+        old = [legacy_find(rows, e.lower()) for e in entries]
+        t_old = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        index = ContractKeywordIndex(rows)
+        t_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        new = [index.find(e.lower()) for e in entries]
+        t_new = time.perf_counter() - t0
+
+        print(f"{count:>5} Keywords: Regex je Keyword {t_old / args.entries * 1e6:>9.1f} µs/Entry, "
+              f"Index {t_new / args.entries * 1e6:>6.1f} µs/Entry (Aufbau {t_build * 1000:.1f} ms), "
+              f"gleich: {old == new}")
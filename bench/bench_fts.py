@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_fts.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+Benchmark -J -s Suchen: build_sql_from_search() mit LIKE gegenüber dem FTS5 Volltextindex
+(hcwr_fts_mod) auf einer time.db über mehrere Jahre. Gemessen werden Aufbau, Nachführen
+nach neuen und geänderten Einträgen und die Abfragen selbst, die Treffer müssen gleich sein
+(Exit-Code 1 sonst).
+
+Beispiel:
+    python3 bench/bench_fts.py
+    python3 bench/bench_fts.py -y 10 -e 20 -s "*Support*&!C=Intern*"
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+from argparse import Namespace
+from datetime import date
+
+from hcwr_bench_db import create_time_db
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbms_mod import get_connection, close_connections
+from hcwr_settings_mod import reset_settings
+from hcwr_tasks_mod import build_sql_from_search, build_jobtime_query
+from hcwr_fts_mod import attach_fts_index
+
+PROJECT_EXPR = "REPLACE(REPLACE(p.description, '├─ ', ''), '└─ ', '')"
+
+# Typische Entry-Texte, damit Teilstring-Suchen unterschiedlich viele Treffer haben
+WORDS = ["Support Ticket", "Meeting Planung", "Koordination", "Code Review", "Dokumentation",
+         "Kundentermin", "Release Vorbereitung", "Fehleranalyse", "Schulung", "Angebot"]
+
+SEARCHES = ["*Support*", "*Review*&*#12*", "Meeting*|Schulung*", "*Ticket*&!*#7*",
+            "C=*Entwicklung*&*Fehler*", "Koordination #4711", "*gibtesnicht*",
+            "*Qzxwvyk*", "C=*Qzxwvyk*", "*#7"]
+
+def create_db(path, years, entries_per_day):
+    first_day, count = create_time_db(path, years, entries_per_day, last_day=date(2025, 12, 31))
+    conn = sqlite3.connect(path)
+    conn.create_function("word", 1, lambda i: WORDS[i % len(WORDS)])
+    conn.execute("UPDATE entries SET description = word(id * 7) || ' #' || (id % 5000)")
+    conn.commit()
+    conn.close()
+    return count
+
+def search(conn, search_raw, use_fts, repeat):
+    where, params = build_sql_from_search(search_raw, "?", PROJECT_EXPR, use_fts)
+    query = build_jobtime_query([where], use_fts)
+    t0 = time.perf_counter()
+    for i in range(repeat):
+        rows = conn.execute(query, params).fetchall()
+    # Reihenfolge und Zeilen wie bei fetch_and_display_entries(), NULL-Zeilen der Projekte ohne Einträge entfallen
+    return [r for r in rows if r[2]], (time.perf_counter() - t0) / repeat
+
+def timed_attach(conn):
+    t0 = time.perf_counter()
+    ok = attach_fts_index(conn)
+    return ok, (time.perf_counter() - t0) * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-y", "--years", type=int, default=20)
+    parser.add_argument("-e", "--entries-per-day", type=int, default=20)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-s", "--search", action="append", help="Suchausdruck wie bei -s, mehrfach möglich")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    db_path = os.path.join(tmp_dir, "time.db")
+    HCWR_GLOBALS.DB_FTS_PATH = os.path.join(tmp_dir, "hcwr_fts.db")
+    HCWR_GLOBALS.args = Namespace(verbose=False, dry_run=False, database=db_path)
+    HCWR_GLOBALS.CFG.read_dict({"Database": {"fts_index": "true"}})
+    reset_settings()
+
+    count = create_db(db_path, args.years, args.entries_per_day)
+    conn = get_connection(db_path)
+    print(f"{count} Einträge, SQLite {sqlite3.sqlite_version}")
+
+    ok, ms = timed_attach(conn)
+    print(f"Index aufbauen:                {ms:>8.1f} ms")
+    ok, ms = timed_attach(conn)
+    print(f"Nachführen ohne Änderung:      {ms:>8.2f} ms")
+
+    writer = sqlite3.connect(db_path)
+    writer.execute("INSERT INTO entries (project_id, start_time, stop_time, description) "
+                   "SELECT project_id, datetime(start_time, '+7 days'), datetime(stop_time, '+7 days'), description "
+                   "FROM entries ORDER BY id DESC LIMIT 100")
+    writer.commit()
+    writer.close()
+    ok, ms = timed_attach(conn)
+    print(f"Nachführen 100 neue Einträge:  {ms:>8.1f} ms")
+    if not ok:
+        raise SystemExit("FTS5 Index nicht verfügbar")
+
+    # Projekt umbenennen, Eintrag in dieses Projekt verschieben, Eintrag löschen und zuletzt einen
+    # Text gleicher Länge ändern, jeweils einzeln nachgeführt: der Index muss jede Änderung sehen,
+    # nicht nur neue Einträge oberhalb des Wasserzeichens
+    changes = {
+        "Projekt umbenannt": "UPDATE projects SET description = description || ' Qzxwvyk' "
+                             "WHERE id = (SELECT project_id FROM entries WHERE id = 5)",
+        "Eintrag verschoben": "UPDATE entries SET project_id = (SELECT project_id FROM entries WHERE id = 5) "
+                              "WHERE id = (SELECT MIN(id) FROM entries WHERE project_id != "
+                              "(SELECT project_id FROM entries WHERE id = 5))",
+        "Eintrag gelöscht": "DELETE FROM entries WHERE id = 7",
+        "Text gleicher Länge": "UPDATE entries SET description = 'Qzxwvyk' || substr(description, 8) WHERE id = 3",
+    }
+    for label, sql in changes.items():
+        writer = sqlite3.connect(db_path)
+        writer.execute(sql)
+        writer.commit()
+        writer.close()
+        ok, ms = timed_attach(conn)
+        print(f"Nachführen {label + ':':<20}{ms:>8.1f} ms")
+
+    print(f"{'Suche':<28} | {'Treffer':>8} | {'LIKE':>10} | {'FTS5':>10} | gleich")
+    same = True
+    for search_raw in args.search or SEARCHES:
+        old, t_old = search(conn, search_raw, False, args.repeat)
+        new, t_new = search(conn, search_raw, True, args.repeat)
+        # Reihenfolge bei gleichem Projekt und gleicher Startzeit ist ohne ORDER BY nicht festgelegt
+        equal = sorted(old) == sorted(new)
+        print(f"{search_raw:<28} | {len(new):>8} | {t_old * 1000:>7.1f} ms | {t_new * 1000:>7.1f} ms | {equal}")
+        same = same and equal
+    close_connections()
+    sys.exit(0 if same else 1)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_function_name.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+Microbenchmark für get_function_name(): Overhead pro Aufruf mit der früheren
+inspect.stack()-Variante gegenüber sys._getframe(), mit und ohne DBG_PROCESS_ROUTE.
+
+Beispiel:
+    python3 bench/bench_function_name.py -n 20000
+"""
+import inspect
+import argparse
+import timeit
+from os.path import basename
+
+import hcwr_bench_db
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbg_mod import get_function_name
+
+def legacy_get_function_name():
+    """Frühere Implementierung (nur Namensermittlung, ohne Prozessroute)."""
+    stack = inspect.stack()
+    caller = stack[1]
+    ffile = basename(caller.filename)
+    fname = caller.function
+    return ffile if fname == "<module>" else fname
+
+def legacy_helper():
+    fname = legacy_get_function_name()
+    return fname
+
+def helper():
+    fname = get_function_name()
+    return fname
+
+def nested(func, depth=10):
+    """Simuliert die Aufruftiefe eines hcwr-Laufs."""
+    if depth:
+        return nested(func, depth - 1)
+    return timeit.timeit(func, number=ARGS.number)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=20000)
+    ARGS = parser.parse_args()
+
+    assert helper() == legacy_helper().replace("legacy_", "")
+
+    HCWR_GLOBALS.DBG_BREAK_POINT = ""
+    HCWR_GLOBALS.DBG_PROCESS_ROUTE = None
+    for label, func in (("inspect.stack()", legacy_helper), ("sys._getframe(), Debug aus", helper)):
+        seconds = nested(func)
+        print(f"{label:<32} {seconds / ARGS.number * 1e6:>10.2f} µs je Aufruf")
+
+    HCWR_GLOBALS.DBG_PROCESS_ROUTE = ["myGlobals"]
+    seconds = nested(helper)
+    print(f"{'sys._getframe(), Prozessroute':<32} {seconds / ARGS.number * 1e6:>10.2f} µs je Aufruf")
+    print(f"Call-Tree Einträge: {len(HCWR_GLOBALS.DBG_CALL_TREE)}, Tiefe: {HCWR_GLOBALS.DBG_CALL_TREE[-1][0]}")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_holiday_engine.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+Feiertage aus hcwr_holiday_mod.native_holidays() gegenüber 'geaCal -l -y JAHR -j' für 1990-2100:
+Daten und Namen je Jahr vergleichen, Laufzeit je Jahr messen. Immer geprüft werden das
+Osterdatum gegen die Meeus/Jones/Butcher Formel und eine Liste bekannter Landesregeln (KNOWN),
+ohne geaCal im PATH nur diese.
+Rückgabewert 1, wenn sich Feiertagsdaten oder -namen unterscheiden.
+
+Beispiel:
+    python3 bench/bench_holiday_engine.py
+    python3 bench/bench_holiday_engine.py --first 2020 --last 2030 --state NI
+"""
+import sys
+import time
+import shutil
+import argparse
+from datetime import date
+
+import hcwr_bench_db
+from hcwr_holiday_mod import native_holidays, easter_sunday, run_geacal
+
+# (Jahr, Bundesland, Datum, ist Feiertag): Stichtage der Landesregeln und bewegliche Feiertage
+KNOWN = [
+    (2000, None, "2000-04-21", True),   # Karfreitag
+    (2024, None, "2024-05-09", True),   # Christi Himmelfahrt
+    (2024, None, "2024-05-20", True),   # Pfingstmontag
+    (2017, "BY", "2017-10-31", True),   # Reformationstag 2017 bundesweit
+    (2016, "NI", "2016-10-31", False),
+    (2018, "NI", "2018-10-31", True),   # Reformationstag in NI ab 2018
+    (2025, "HH", "2025-10-31", True),
+    (2018, "BE", "2018-03-08", False),
+    (2019, "BE", "2019-03-08", True),   # Frauentag in BE ab 2019
+    (2022, "MV", "2022-03-08", False),
+    (2023, "MV", "2023-03-08", True),   # Frauentag in MV ab 2023
+    (2021, "BE", "2021-05-08", False),
+    (2025, "BE", "2025-05-08", True),   # Tag der Befreiung 2020 und 2025
+    (2018, "TH", "2018-09-20", False),
+    (2019, "TH", "2019-09-20", True),   # Weltkindertag in TH ab 2019
+    (2024, "SN", "2024-11-20", True),   # Buß- und Bettag
+    (2024, "BY", "2024-11-20", False),
+    (2025, "BW", "2025-01-06", True),
+    (2025, "BY", "2025-06-19", True),   # Fronleichnam
+    (2025, "BY", "2025-11-01", True),
+    (2025, "SL", "2025-08-15", True),
+    (2025, "NW", "2025-08-15", False),
+]
+
+def meeus_easter(year):
+    """Ostersonntag nach Meeus/Jones/Butcher, unabhängig von der Gaußschen Formel."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--first", type=int, default=1990)
+    parser.add_argument("--last", type=int, default=2100)
+    parser.add_argument("--state", help="Bundesland für native_holidays(), Default: nur bundesweite Feiertage")
+    args = parser.parse_args()
+    years = range(args.first, args.last + 1)
+
+    easter_diff = [y for y in years if easter_sunday(y) != meeus_easter(y)]
+    print(f"Ostersonntag {args.first}-{args.last}: {len(easter_diff)} Abweichungen zu Meeus/Jones/Butcher {easter_diff}")
+
+    known_diff = [(y, state, day) for y, state, day, expected in KNOWN
+                  if (day in dict(native_holidays(y, state))) != expected]
+    print(f"Bekannte Landesregeln: {len(known_diff)} von {len(KNOWN)} abweichend {known_diff}")
+
+    t0 = time.perf_counter()
+    native = {y: native_holidays(y, args.state) for y in years}
+    t_native = (time.perf_counter() - t0) / len(years)
+    print(f"native_holidays():        {t_native * 1e6:>10.1f} µs je Jahr")
+
+    if shutil.which("geaCal") is None:
+        print("geaCal nicht im PATH, Vergleich mit geaCal übersprungen")
+        sys.exit(1 if easter_diff or known_diff else 0)
+
+    t0 = time.perf_counter()
+    geacal = {y: run_geacal(y) for y in years}
+    t_geacal = (time.perf_counter() - t0) / len(years)
+    print(f"geaCal Prozess:           {t_geacal * 1e6:>10.1f} µs je Jahr")
+
+    date_diff, name_diff = 0, 0
+    for y in years:
+        ours, theirs = dict(native[y]), dict(geacal[y])
+        only_ours = sorted(set(ours) - set(theirs))
+        only_theirs = sorted(set(theirs) - set(ours))
+        names = [(d, ours[d], theirs[d]) for d in sorted(set(ours) & set(theirs)) if ours[d] != theirs[d]]
+        if only_ours or only_theirs:
+            date_diff += 1
+            print(f"{y}: nur native {only_ours}, nur geaCal {only_theirs}")
+        if names:
+            name_diff += 1
+            print(f"{y}: andere Namen {names}")
+    print(f"Jahre mit anderen Daten: {date_diff}, mit anderen Namen: {name_diff} von {len(years)}")
+    sys.exit(1 if date_diff or name_diff or easter_diff or known_diff else 0)
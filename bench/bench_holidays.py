@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_holidays.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+Benchmark für is_feiertag() über einen -B/-E Zeitraum: Anzahl geaCal Aufrufe und Laufzeit
+der früheren Variante (ein geaCal Prozess pro Datum) gegenüber dem Feiertagskalender.
+
+Ohne installiertes geaCal wird ein Skript mit festen Feiertagen in einem temporären
+Verzeichnis vor den PATH gestellt, das jeden Aufruf protokolliert.
+
+Beispiel:
+    python3 bench/bench_holidays.py -d 21
+"""
+import os
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+from argparse import Namespace
+from datetime import date, timedelta
+
+from hcwr_bench_db import create_time_db
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_plugins_mod import is_feiertag
+
+FAKE_GEACAL = """#!/bin/sh
+echo "$@" >> "{log}"
+y=$3
+echo '{{"holidays": [["'$y'-01-01", "Neujahr"], ["'$y'-05-01", "Tag der Arbeit"], ["'$y'-10-03", "Tag der Deutschen Einheit"], ["'$y'-12-25", "1. Weihnachtstag"], ["'$y'-12-26", "2. Weihnachtstag"]]}}'
+"""
+
+def legacy_is_feiertag(day):
+    """Nachbau der früheren Prüfung: je Datum ein geaCal Prozess und JSON parsen."""
+    output = subprocess.check_output(["geaCal", "-l", "-y", str(day.year), "-j"], text=True)
+    holidays = json.loads(output).get("holidays", [])
+    return any(hdate == day.strftime("%Y-%m-%d") for hdate, name in holidays)
+
+def count_calls(log):
+    if not os.path.exists(log):
+        return 0
+    with open(log) as f:
+        return len(f.readlines())
+
+def run(label, func, days, log):
+    before = count_calls(log)
+    t0 = time.perf_counter()
+    found = [d for d in days if func(d) not in (False, 2)]
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<26} {count_calls(log) - before:>5} geaCal {elapsed*1000:>10.1f} ms  -> {len(found)} Feiertage")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-d", "--days", type=int, default=21)
+    parser.add_argument("-s", "--start", default="2025-12-15")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    log = os.path.join(tmp, "geaCal.log")
+    if not any(os.path.exists(os.path.join(p, "geaCal")) for p in os.environ["PATH"].split(os.pathsep)):
+        with open(os.path.join(tmp, "geaCal"), "w") as f:
+            f.write(FAKE_GEACAL.format(log=log))
+        os.chmod(os.path.join(tmp, "geaCal"), 0o755)
+        os.environ["PATH"] = tmp + os.pathsep + os.environ["PATH"]
+
+    DB_PATH = os.path.join(tmp, "time.db")
+    create_time_db(DB_PATH, 1)
+    HCWR_GLOBALS.args = Namespace(verbose=False, dry_run=False, database=DB_PATH)
+    HCWR_GLOBALS.HOLIDAY_CACHE_PATH = os.path.join(tmp, "hcwr_holidays.json")
+    HCWR_GLOBALS.CFG.read_dict({
+        "Workdays": {"Mo": "8", "Di": "8", "Mi": "8", "Do": "8", "Fr": "8", "Sa": "0", "So": "0"},
+    })
+
+    start = date.fromisoformat(args.start)
+    days = [start + timedelta(days=i) for i in range(args.days)]
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    run("alt (geaCal je Datum)", legacy_is_feiertag, days, log)
+    run("neu (kalt)", lambda d: is_feiertag(d, cursor), days, log)
+    run("neu (warm, im Speicher)", lambda d: is_feiertag(d, cursor), days, log)
+    HCWR_GLOBALS.HOLIDAY_CACHE = {}
+    run("neu (Disk-Cache)", lambda d: is_feiertag(d, cursor), days, log)
+    conn.close()
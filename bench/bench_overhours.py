@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_overhours.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+Benchmark für das Zeitkonto (hcoh): Anzahl SQL-Abfragen und Laufzeit der alten
+Berechnung (Projekte × 7 Tage je KW) gegenüber get_kw_overhours() mit einem Durchlauf.
+
+Beispiel:
+    python3 bench/bench_overhours.py -w 50
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+from argparse import Namespace
+from datetime import date
+
+from hcwr_bench_db import create_time_db
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_hcwrd_mod import get_kw_overhours, get_weekly_total_time, get_monday_of_week
+
+def legacy_kw_overhours(conn, year, kw):
+    """Nachbau der früheren Berechnung: je KW alle Projekte, je Projekt 7 Tagesabfragen."""
+    weekhours = int(float(HCWR_GLOBALS.CFG.get('General', 'weekhours')) * 3600)
+    cursor = conn.cursor()
+    sum_seconds = 0
+    for i in range(1, kw + 1):
+        cursor.execute("SELECT * FROM projects")
+        total_kw_time = 0
+        for project in cursor.fetchall():
+            total_time = get_weekly_total_time(project[0], get_monday_of_week(i, year), i, conn.cursor())
+            if "Zeitkonto Abzug" in project[2]:
+                total_kw_time -= total_time
+            else:
+                total_kw_time += total_time
+        sum_seconds += total_kw_time - weekhours
+    return sum_seconds
+
+def run(label, func):
+    queries = []
+    conn = sqlite3.connect(DB_PATH)
+    conn.set_trace_callback(queries.append)
+    t0 = time.perf_counter()
+    result = func(conn)
+    elapsed = time.perf_counter() - t0
+    conn.close()
+    print(f"{label:<28} {len(queries):>8} Abfragen {elapsed*1000:>10.1f} ms  -> {result}")
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-w", "--week", type=int, default=50)
+    parser.add_argument("-y", "--year", type=int, default=2025)
+    args = parser.parse_args()
+
+    DB_PATH = os.path.join(tempfile.mkdtemp(), "time.db")
+    HCWR_GLOBALS.args = Namespace(verbose=False, dry_run=False, database=DB_PATH)
+    HCWR_GLOBALS.DB_LEDGER_PATH = os.path.join(os.path.dirname(DB_PATH), "hcwr_ledger.db")
+    HCWR_GLOBALS.CFG.read_dict({
+        "General": {"weekhours": "40"},
+        "Onboarding": {"firstday": f"{args.year - 1}-01-02"},
+    })
+
+    create_time_db(DB_PATH, 1, last_day=date.fromisocalendar(args.year, args.week, 7))
+
+    old = run("alt (KW × Projekte × 7)", lambda c: legacy_kw_overhours(c, args.year, args.week))
+    HCWR_GLOBALS.DB_LEDGER_PATH = "none"
+    sign, new = run("neu (ein Durchlauf)", lambda c: get_kw_overhours(c, args.week, args.year))
+    print(f"Gleiches Ergebnis: {abs(old) == new}")
+
+    # Zeitkonto-Ledger: kalt, warm und nach einem neuen Eintrag
+    HCWR_GLOBALS.DB_LEDGER_PATH = os.path.join(os.path.dirname(DB_PATH), "hcwr_ledger.db")
+    run("Ledger kalt", lambda c: get_kw_overhours(c, args.week, args.year))
+    run("Ledger warm", lambda c: get_kw_overhours(c, args.week, args.year))
+    conn = sqlite3.connect(DB_PATH)
+    monday = date.fromisocalendar(args.year, args.week, 1)
+    conn.execute("INSERT INTO entries (project_id, start_time, stop_time, description) VALUES (?, ?, ?, ?)",
+                 (1, f"{monday} 18:00:00", f"{monday} 19:00:00", "Nachtrag"))
+    conn.commit()
+    conn.close()
+    run("Ledger neuer Eintrag", lambda c: get_kw_overhours(c, args.week, args.year))
+    run("Ledger warm", lambda c: get_kw_overhours(c, args.week, args.year))
+
+    def without_ledger():
+        ledger_path, HCWR_GLOBALS.DB_LEDGER_PATH = HCWR_GLOBALS.DB_LEDGER_PATH, "none"
+        result = run("  ohne Ledger", lambda c: get_kw_overhours(c, args.week, args.year))
+        HCWR_GLOBALS.DB_LEDGER_PATH = ledger_path
+        return result
+
+    # Verschieben in ein anderes Jahr und Umbenennen in 'Zeitkonto Abzug' ändern weder Anzahl,
+    # Projekte noch Dauer, das Ledger muss trotzdem neu rechnen
+    changes = {
+        "Ledger verschobener Eintrag": ("UPDATE entries SET start_time = datetime(start_time, '+1 year'), "
+                                        "stop_time = datetime(stop_time, '+1 year') WHERE id = "
+                                        "(SELECT MAX(id) FROM entries WHERE start_time < ?)", (f"{monday}",)),
+        "Ledger Zeitkonto Abzug": ("UPDATE projects SET description = 'Zeitkonto Abzug' WHERE id = "
+                                   "(SELECT project_id FROM entries WHERE start_time < ? ORDER BY id DESC LIMIT 1)",
+                                   (f"{monday}",)),
+    }
+    same = True
+    for label, (sql, params) in changes.items():
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute(sql, params)
+        conn.commit()
+        conn.close()
+        result = run(label, lambda c: get_kw_overhours(c, args.week, args.year))
+        if result != without_ledger():
+            same = False
+    print(f"Ledger gleich ohne Ledger: {same}")
+    sys.exit(0 if same else 1)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_query_budget.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+Query-Budgets: führt hcwr/hcoh mit --profile gegen synthetische time.db unterschiedlicher
+Größe aus und prüft die Anzahl der SQL-Statements (hcwr_sqlstats_mod.py) gegen BUDGETS,
+gesamt und je Phase. Die Anzahl darf nicht mit der Größe der Datenbank wachsen, so fallen
+N+1 Muster (eine Abfrage je Projekt, Tag oder KW) sofort auf. Jeder Aufruf läuft einmal
+kalt (ohne Ledger/FTS Sidecar) und einmal warm. Exit-Code 1 bei Überschreitung oder wenn
+ein Aufruf selbst mit Fehler endet, damit das Skript als Gate vor einem Commit taugt.
+
+Beispiel:
+    python3 bench/bench_query_budget.py
+    python3 bench/bench_query_budget.py -y 1 -y 10 -v
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from datetime import date, timedelta
+
+from hcwr_bench_db import create_time_db
+from bench_suite import BIN_DIR, MODULE_DIR, write_config
+
+# Name -> (Programm, Argumente, Budget gesamt, Budgets je Phase aus hcwr_profile_mod.PHASE_LABELS)
+BUDGETS = {
+    "hcwr -n": ("hcwr", "-n -y {year} -w {week}", 15,
+                {"complete": 1, "totals": 2, "uuk": 1, "weekdays": 0, "absences": 0, "overtime": 8, "render": 0}),
+    "hcoh":    ("hcoh", "-y {year} -w {week}", 20,
+                {"complete": 1, "totals": 2, "uuk": 1, "weekdays": 0, "absences": 0, "overtime": 10}),
+    "-J -a":   ("hcwr", "-J -a", 10, {"job_entries": 1}),
+    "-J -s":   ("hcwr", "-J -s *Support*", 10, {"job_entries": 1}),
+}
+
+def run_profiled(prog, argv, env, json_path):
+    cmd = [sys.executable, os.path.join(BIN_DIR, prog)] + argv + [f"--profile={json_path}"]
+    proc = subprocess.run(cmd, env=env, input=b"n\n" * 1000, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if not os.path.exists(json_path):
+        raise RuntimeError(f"{' '.join(cmd)}: kein Profil (Exit-Code {proc.returncode})\n{proc.stderr.decode()[-2000:]}")
+    with open(json_path) as f:
+        result = json.load(f)
+    result["returncode"] = proc.returncode
+    return result
+
+def check(name, result, total_budget, phase_budgets):
+    """Liefert die Liste der Überschreitungen."""
+    failures = []
+    if result["returncode"]:
+        failures.append(f"Exit-Code {result['returncode']}")
+    if result["sql_total"] > total_budget:
+        top = ", ".join(f"{q['name'][:30]} x{q['count']}" for q in sorted(result["queries"], key=lambda q: -q["count"])[:3])
+        failures.append(f"gesamt {result['sql_total']} > {total_budget} ({top})")
+    phases = {p["name"]: p["sql"] for p in result["phases"]}
+    for phase, budget in phase_budgets.items():
+        if phases.get(phase, 0) > budget:
+            failures.append(f"{phase} {phases[phase]} > {budget}")
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-y", "--years", type=int, action="append", help="Jahre je time.db, mehrfach möglich (Default: 1, 5)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Abfragen je Aufruf ausgeben")
+    args = parser.parse_args()
+
+    last_day = date(2025, 12, 31)
+    year, week = (last_day - timedelta(days=7)).isocalendar()[:2]
+    fmt = {"year": year, "week": week}
+
+    failed = 0
+    counts = {}
+    with tempfile.TemporaryDirectory(prefix="hcwr-budget-") as tmp:
+        home = os.path.join(tmp, "home")
+        heco = os.path.join(home, ".heco")
+        os.makedirs(heco)
+        env = dict(os.environ, HOME=home, HCWR_NO_DAEMON="1")
+        for key in ("WEEK", "KW", "YEAR", "DATABASE", "GROUP"):
+            env.pop(key, None)
+        env["PYTHONPATH"] = os.pathsep.join(p for p in env.get("PYTHONPATH", "").split(os.pathsep)
+                                            if p and os.path.abspath(p) != MODULE_DIR)
+        json_path = os.path.join(tmp, "profile.json")
+
+        print(f"{'Jahre':>5} | {'Aufruf':<8} | {'Lauf':<4} | {'SQL':>4} | {'Budget':>6} | Status")
+        for years in args.years or [1, 5]:
+            db_path = os.path.join(tmp, f"time-{years}.db")
+            keyword_db = os.path.join(heco, "keyword_id.db")
+            first_day, count = create_time_db(db_path, years, 4, last_day=last_day, projects=40,
+                                              contract_keywords=100, absence_density=0.08, holidays=True,
+                                              keyword_db=keyword_db)
+            write_config(home, db_path, keyword_db, first_day)
+            for name, (prog, argv, total_budget, phase_budgets) in BUDGETS.items():
+                for sidecar in ("hcwr_ledger.db", "hcwr_fts.db"):
+                    if os.path.exists(os.path.join(heco, sidecar)):
+                        os.remove(os.path.join(heco, sidecar))
+                for run in ("kalt", "warm"):
+                    result = run_profiled(prog, argv.format(**fmt).split(), env, json_path)
+                    failures = check(name, result, total_budget, phase_budgets)
+                    # Gleicher Aufruf auf größerer Datenbank darf nicht mehr Statements brauchen
+                    smaller = counts.get((name, run))
+                    if smaller is not None and result["sql_total"] > smaller:
+                        failures.append(f"wächst mit der Datenbank: {smaller} -> {result['sql_total']}")
+                    counts[(name, run)] = result["sql_total"]
+                    failed += bool(failures)
+                    status = "OK" if not failures else "ÜBER BUDGET: " + "; ".join(failures)
+                    print(f"{years:>5} | {name:<8} | {run:<4} | {result['sql_total']:>4} | {total_budget:>6} | {status}")
+                    if args.verbose:
+                        for q in result["queries"]:
+                            print(f"{'':>10}{q['count']:>5} x {q['name']}")
+
+    if failed:
+        print(f"{failed} Aufrufe über Budget", file=sys.stderr)
+    sys.exit(1 if failed else 0)
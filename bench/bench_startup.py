@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_startup.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+Startzeit von hcwr/hcoh: Wandzeit je Aufruf (Median) gegenüber 'python3 -c pass' und
+die teuersten Imports laut 'python3 -X importtime'. Läuft ohne Daemon (HCWR_NO_DAEMON=1)
+gegen die Config des aufrufenden Benutzers.
+
+Für 'hcwr -V' gilt BUDGET_MS über 'python3 -c pass' (der Interpreterstart hängt vom Rechner ab),
+außerdem darf keines der Module aus NOT_ON_VERSION geladen werden. Die Modulprüfung ist
+unabhängig von der Last auf dem Rechner und schlägt bei neuen Top-Level-Imports sofort an.
+Exit-Code 1 bei Überschreitung.
+
+Beispiel:
+    python3 bench/bench_startup.py -n 10
+    python3 bench/bench_startup.py -a=-V -a=-sk --hcoh --top 15
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+import statistics
+
+BIN_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../opt/hcwr/bin"))
+
+# Akzeptiertes Budget für 'hcwr -V' über dem Interpreterstart, gemessen ca. 90 ms
+BUDGET_MS = 110.0
+
+# Module, die erst im jeweiligen Codepfad geladen werden und bei 'hcwr -V' fehlen müssen
+NOT_ON_VERSION = ["hcwr_profile_mod", "hcwr_sqlstats_mod", "hcwr_dbms_mod", "hcwr_config_mod",
+                  "json", "heapq", "tempfile", "fcntl", "subprocess"]
+
+def run_once(cmd, env):
+    t0 = time.perf_counter()
+    subprocess.run(cmd, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - t0) * 1000
+
+def wall_ms(cmd, env, runs):
+    run_once(cmd, env)  # .pyc erzeugen bzw. Dateicache füllen
+    return statistics.median(run_once(cmd, env) for i in range(runs))
+
+def import_times(cmd, env, nested=False):
+    """Liefert [(kumulierte µs, Modul)] aus -X importtime, nur Top-Level-Imports oder mit 'nested' alle."""
+    proc = subprocess.run([sys.executable, "-X", "importtime"] + cmd[1:], env=env,
+                          stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    result = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        # Eingerückte Namen sind Unter-Imports, deren Zeit steckt bereits im Elternmodul
+        if nested or len(name) - len(name.lstrip()) == 1:
+            result.append((int(cumulative), name.strip()))
+    return sorted(result, reverse=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--runs", type=int, default=10, help="Aufrufe je Kommando")
+    parser.add_argument("-a", "--args", action="append", help="hcwr Argumente, mehrfach möglich (Default: -V)")
+    parser.add_argument("--hcoh", action="store_true", help="zusätzlich hcoh messen")
+    parser.add_argument("--top", type=int, default=10, help="Anzahl der teuersten Imports")
+    args = parser.parse_args()
+
+    env = dict(os.environ, HCWR_NO_DAEMON="1")
+    commands = [[sys.executable, os.path.join(BIN_DIR, "hcwr")] + a.split() for a in (args.args or ["-V"])]
+    if args.hcoh:
+        commands.append([sys.executable, os.path.join(BIN_DIR, "hcoh")])
+
+    failed = 0
+    base = wall_ms([sys.executable, "-c", "pass"], env, args.runs)
+    print(f"{'python3 -c pass':<28} {base:>8.1f} ms")
+    for cmd in commands:
+        label = " ".join([os.path.basename(cmd[1])] + cmd[2:])
+        ms = wall_ms(cmd, env, args.runs)
+        status = ""
+        if cmd[2:] == ["-V"]:
+            loaded = {name for cumulative, name in import_times(cmd, env, nested=True)}
+            failures = [f"lädt {name}" for name in NOT_ON_VERSION if name in loaded]
+            if ms - base > BUDGET_MS:
+                failures.append(f"über {BUDGET_MS:.0f} ms")
+            failed += bool(failures)
+            status = "OK" if not failures else "; ".join(failures)
+        print(f"{label:<28} {ms:>8.1f} ms  (+{ms - base:.1f} ms gegenüber Interpreter)  {status}")
+        for cumulative, name in import_times(cmd, env)[:args.top]:
+            print(f"    {cumulative / 1000:>8.1f} ms  {name}")
+
+    sys.exit(1 if failed else 0)
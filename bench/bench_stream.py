@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_stream.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+Benchmark Job-Entry-Export 'hcwr -J -a -s Task*': Speicherspitze (tracemalloc) und
+Laufzeit von -j (fetchall, Zeilenliste, json.dumps über alles) gegenüber --stream ndjson
+und --stream csv. Beim Streaming bleibt die Speicherspitze unabhängig von der Anzahl Einträge.
+
+Beispiel:
+    python3 bench/bench_stream.py
+    python3 bench/bench_stream.py -n 10000 -n 200000
+"""
+import os
+import io
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+import contextlib
+import tracemalloc
+from argparse import Namespace
+from datetime import date
+
+from hcwr_bench_db import create_time_db
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbms_mod import close_connections
+from hcwr_tasks_mod import fetch_and_display_entries, stream_job_entries
+
+# 20 Einträge je Arbeitstag, ca. 5200 je Jahr
+ENTRIES_PER_DAY = 20
+
+def set_args(db_path, json=False, search="Task*"):
+    HCWR_GLOBALS.args = Namespace(
+        verbose=False, dry_run=False, database=db_path, search=search, all_jobs=True,
+        sum_times=False, json=json, zeiterfassung=None, cat_time_totals_of=None,
+        start_day=None, stop_day=None, week=None, year=None, stream=None,
+    )
+
+def measure(func):
+    """
+    Liefert (Ergebnis, Sekunden, Speicherspitze in MiB), Ausgaben auf stderr werden verworfen.
+    Die Zeit wird ohne tracemalloc gemessen, das bremst die Ausführung um ein Vielfaches.
+    """
+    with contextlib.redirect_stderr(io.StringIO()):
+        t0 = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - t0
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+def legacy_json(db_path):
+    """-j: fetch_and_display_entries() mit JSON als String, wie bei 'hcwr -J -a -j'."""
+    set_args(db_path, json=True)
+    return len(fetch_and_display_entries(stdout=False))
+
+def streamed(db_path, fmt):
+    set_args(db_path)
+    with open(os.devnull, "w") as out:
+        return stream_job_entries(fmt, out=out)
+
+def same_order(db_path):
+    """'hcwr -J -a --stream ndjson' liefert die Einträge in derselben Reihenfolge wie 'hcwr -J -a'."""
+    set_args(db_path, search=None)
+    out = io.StringIO()
+    with contextlib.redirect_stderr(io.StringIO()):
+        stream_job_entries("ndjson", out=out)
+    conn = sqlite3.connect(db_path)
+    expected = [row[0] for row in conn.execute("SELECT * FROM entries")]
+    conn.close()
+    return [json.loads(line)["id"] for line in out.getvalue().splitlines()] == expected
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--entries", type=int, action="append", help="Anzahl Einträge, mehrfach möglich, aufgerundet auf ganze Jahre (Default: 25000, 50000, 100000)")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    print(f"{'Einträge':>9} | {'Ausgabe':<15} | {'Zeit':>10} | {'Speicherspitze':>14}")
+    for count in args.entries or [25000, 50000, 100000]:
+        db_path = os.path.join(tmp_dir, f"time-{count}.db")
+        years = -(-count // (ENTRIES_PER_DAY * 260))
+        first_day, total = create_time_db(db_path, years, ENTRIES_PER_DAY, last_day=date(2025, 12, 31))
+
+        results = {}
+        for label, func in (("-j", lambda: legacy_json(db_path)),
+                            ("--stream ndjson", lambda: streamed(db_path, "ndjson")),
+                            ("--stream csv", lambda: streamed(db_path, "csv"))):
+            results[label], elapsed, peak = measure(func)
+            print(f"{total:>9} | {label:<15} | {elapsed * 1000:>7.0f} ms | {peak:>10.1f} MiB")
+        print(f"{'':>9}   Gleiche Anzahl Einträge: {len(set(results.values())) == 1} ({results['-j']})")
+        print(f"{'':>9}   Reihenfolge wie 'hcwr -J -a': {same_order(db_path)}")
+        close_connections()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_suite.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+End-to-End Benchmark: misst typische hcwr/hcoh Aufrufe gegen synthetische 1-, 5- und
+10-Jahres time.db (hcwr_bench_db.py) und schreibt Wandzeit (Median), Anzahl der
+SQL-Statements und Speicherspitze (max RSS) je Aufruf als JSON. Mit --compare werden die
+Werte gegen einen früheren Lauf verglichen, Verschlechterungen führen zu Exit-Code 1.
+
+Jeder Aufruf läuft ohne Daemon (HCWR_NO_DAEMON=1) mit eigenem HOME und hcwr.conf,
+schreibende Aufrufe (-A) gegen eine frische Kopie der time.db.
+
+Beispiel:
+    python3 bench/bench_suite.py -o /tmp/hcwr-bench-2.0.3.json
+    python3 bench/bench_suite.py -y 1 -n 1 -c hcoh -c "-J -a"
+    python3 bench/bench_suite.py -o neu.json --compare /tmp/hcwr-bench-2.0.3.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+import statistics
+from datetime import date, datetime, timedelta
+
+from hcwr_bench_db import create_time_db
+from hcwr_globals_mod import HCWR_GLOBALS
+
+BIN_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../opt/hcwr/bin"))
+MODULE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../opt/hcwr/modules"))
+
+# Zähler für SQL-Statements (sqlite3 trace callback) und max RSS, läuft als 'python3 -c'
+# vor bin/hcwr bzw. bin/hcoh im selben Prozess
+BOOTSTRAP = """
+import sys, json, atexit, runpy, sqlite3, resource
+stats_path = sys.argv.pop(1)
+queries = [0]
+sqlite3_connect = sqlite3.connect
+def connect(*args, **kwargs):
+    conn = sqlite3_connect(*args, **kwargs)
+    conn.set_trace_callback(lambda stmt: queries.__setitem__(0, queries[0] + 1))
+    return conn
+sqlite3.connect = connect
+def write_stats():
+    with open(stats_path, "w") as f:
+        json.dump({"queries": queries[0], "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}, f)
+atexit.register(write_stats)
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+# Name -> (Programm, Argumente, schreibt in time.db), {year}, {week}, {monday}, {friday} = Berichtswoche
+COMMANDS = {
+    "hcwr -n":         ("hcwr", "-n -y {year} -w {week}", False),
+    "hcoh":            ("hcoh", "-y {year} -w {week}", False),
+    "-J -a":           ("hcwr", "-J -a", False),
+    "-J -s":           ("hcwr", "-J -s *Support*", False),
+    "-A VAC -B/-E":    ("hcwr", "-A VAC -B {monday} -E {friday}", True),
+}
+
+CONFIG = """[General]
+fullname = Bench User
+weekhours = 40
+kw_report_base_dir = {home}/Wochenberichte
+
+[Database]
+dbms = sqlite3
+dbpath = {db_path}
+db_keyword_id_path = {keyword_db}
+
+[Workdays]
+Mo = 8
+Di = 8
+Mi = 8
+Do = 8
+Fr = 8
+Sa = 0
+So = 0
+
+[Onboarding]
+firstday = {firstday}
+
+[ProjectIDs]
+"""
+
+def write_config(home, db_path, keyword_db, first_day):
+    os.makedirs(os.path.join(home, ".heco"), exist_ok=True)
+    os.makedirs(os.path.join(home, "Wochenberichte"), exist_ok=True)
+    text = CONFIG.format(home=home, db_path=db_path, keyword_db=keyword_db, firstday=first_day.isoformat())
+    text += "".join(f"{name} = {pid}\n" for name, pid in HCWR_GLOBALS.PROJECTS_ID_MAP.items())
+    with open(os.path.join(home, ".heco", "hcwr.conf"), "w") as f:
+        f.write(text)
+
+def run_once(cmd, env, stats_path):
+    """Liefert (Millisekunden, Exit-Code, Statistik aus BOOTSTRAP)."""
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", BOOTSTRAP, stats_path] + cmd, env=env,
+                          input=b"n\n" * 1000, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    ms = (time.perf_counter() - t0) * 1000
+    try:
+        with open(stats_path) as f:
+            stats = json.load(f)
+    except (OSError, ValueError):
+        stats = {"queries": None, "max_rss_kib": None}
+    return ms, proc.returncode, stats
+
+def bench_command(name, workdir, db_path, env, fmt, runs):
+    prog, argv, writes = COMMANDS[name]
+    cmd = [os.path.join(BIN_DIR, prog)] + argv.format(**fmt).split()
+    stats_path = os.path.join(workdir, "stats.json")
+    times, results = [], []
+    for i in range(runs + 1):
+        if writes:
+            shutil.copyfile(db_path, os.path.join(workdir, "time.db"))
+        ms, code, stats = run_once(cmd, env, stats_path)
+        # Erster Lauf füllt Dateicache und .pyc, Zähler danach wie in jedem weiteren Lauf
+        if i:
+            times.append(ms)
+            results.append((code, stats))
+    code, stats = results[-1]
+    return {
+        "command": name,
+        "argv": [prog] + cmd[1:],
+        "wall_ms": round(statistics.median(times), 1),
+        "wall_ms_min": round(min(times), 1),
+        "queries": stats["queries"],
+        "max_rss_kib": stats["max_rss_kib"],
+        "exit_code": code,
+    }
+
+def git_describe():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=BIN_DIR, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(results, old_path, tolerance):
+    """Vergleicht mit einem früheren JSON, Rückgabe: Anzahl Verschlechterungen."""
+    with open(old_path) as f:
+        old = {(r["years"], r["command"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    print(f"\nVergleich mit {old_path} (Toleranz {tolerance:.0%}):")
+    for r in results:
+        prev = old.get((r["years"], r["command"]))
+        if prev is None:
+            continue
+        notes = []
+        if r["wall_ms"] > prev["wall_ms"] * (1 + tolerance):
+            notes.append(f"Zeit {prev['wall_ms']:.0f} -> {r['wall_ms']:.0f} ms")
+        if r["queries"] is not None and prev["queries"] is not None and r["queries"] > prev["queries"]:
+            notes.append(f"SQL {prev['queries']} -> {r['queries']}")
+        if r["max_rss_kib"] and prev["max_rss_kib"] and r["max_rss_kib"] > prev["max_rss_kib"] * (1 + tolerance):
+            notes.append(f"RSS {prev['max_rss_kib'] / 1024:.1f} -> {r['max_rss_kib'] / 1024:.1f} MiB")
+        status = "SCHLECHTER: " + ", ".join(notes) if notes else "OK"
+        regressions += bool(notes)
+        print(f"{r['years']:>3} Jahre | {r['command']:<14} | {prev['wall_ms']:>9.1f} -> {r['wall_ms']:>9.1f} ms | {status}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-y", "--years", type=int, action="append", help="Jahre je time.db, mehrfach möglich (Default: 1, 5, 10)")
+    parser.add_argument("-c", "--command", action="append", choices=list(COMMANDS), help="nur diese Aufrufe, mehrfach möglich")
+    parser.add_argument("-n", "--runs", type=int, default=3, help="Läufe je Aufruf")
+    parser.add_argument("-e", "--entries-per-day", type=int, default=4)
+    parser.add_argument("-p", "--projects", type=int, default=40)
+    parser.add_argument("-k", "--contract-keywords", type=int, default=100)
+    parser.add_argument("--absence", type=float, default=0.08, help="Anteil Urlaubs-/Krankheitstage")
+    parser.add_argument("--last-day", default="2025-12-31", help="letzter Tag der time.db, Berichtswoche ist die KW davor")
+    parser.add_argument("-o", "--output", help="Ergebnis als JSON schreiben")
+    parser.add_argument("--compare", help="früheres JSON zum Vergleich")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="erlaubte Abweichung bei Zeit und RSS")
+    args = parser.parse_args()
+
+    last_day = date.fromisoformat(args.last_day)
+    year, week = (last_day - timedelta(days=7)).isocalendar()[:2]
+    monday = date.fromisocalendar(year, week, 1)
+    fmt = {"year": year, "week": week, "monday": monday, "friday": monday + timedelta(days=4)}
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="hcwr-bench-") as tmp:
+        home = os.path.join(tmp, "home")
+        env = dict(os.environ, HOME=home, HCWR_NO_DAEMON="1")
+        for key in ("WEEK", "KW", "YEAR", "DATABASE", "GROUP"):
+            env.pop(key, None)
+        # bin/hcwr lädt seine Module nur, wenn MODULE_DIR noch nicht in sys.path steht
+        env["PYTHONPATH"] = os.pathsep.join(p for p in env.get("PYTHONPATH", "").split(os.pathsep)
+                                            if p and os.path.abspath(p) != MODULE_DIR)
+        for years in args.years or [1, 5, 10]:
+            src_db = os.path.join(tmp, f"time-{years}.db")
+            keyword_db = os.path.join(home, ".heco", "keyword_id.db")
+            os.makedirs(os.path.dirname(keyword_db), exist_ok=True)
+            first_day, count = create_time_db(src_db, years, args.entries_per_day, last_day=last_day,
+                                              projects=args.projects, contract_keywords=args.contract_keywords,
+                                              absence_density=args.absence, holidays=True, keyword_db=keyword_db)
+            print(f"time.db {years} Jahre: {count} Einträge ab {first_day}, Berichtswoche {year}/{week}")
+            for name in args.command or COMMANDS:
+                workdir = os.path.join(tmp, "run")
+                os.makedirs(workdir, exist_ok=True)
+                writes = COMMANDS[name][2]
+                db_path = os.path.join(workdir, "time.db") if writes else src_db
+                write_config(home, db_path, keyword_db, first_day)
+                # Ledger und FTS Index gehören zur jeweiligen time.db
+                for sidecar in ("hcwr_ledger.db", "hcwr_fts.db"):
+                    if os.path.exists(os.path.join(home, ".heco", sidecar)):
+                        os.remove(os.path.join(home, ".heco", sidecar))
+                r = bench_command(name, workdir, src_db, env, fmt, args.runs)
+                r.update(years=years, entries=count)
+                results.append(r)
+                status = "" if r["exit_code"] == 0 else f"  Exit-Code {r['exit_code']}"
+                rss = f"{r['max_rss_kib'] / 1024:>7.1f} MiB" if r["max_rss_kib"] else "      ? MiB"
+                print(f"{years:>3} Jahre | {name:<14} | {r['wall_ms']:>9.1f} ms | {r['queries'] or 0:>6} SQL | {rss}{status}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "hcwr_version": HCWR_GLOBALS.VERSION,
+                "git": git_describe(),
+                "python": platform.python_version(),
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+                "results": results,
+            }, f, indent=2, default=str)
+        print(f"Ergebnis: {args.output}")
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
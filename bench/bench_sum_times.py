@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_sum_times.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+Benchmark für -J -a -S in fetch_and_display_entries():
+Nachbau der früheren Suche per next() über die bisherigen Zeilen (O(n²)) gegenüber
+dem dict in sum_times_by_entry(). Je Größe wird eine eigene time.db erzeugt, ca. jeder vierte
+Entry-Text ist eindeutig. Bei linearer Laufzeit bleiben die µs je Eintrag gleich.
+
+Beispiel:
+    python3 bench/bench_sum_times.py
+    python3 bench/bench_sum_times.py -n 25000 -n 100000 --legacy-max 0
+"""
+import io
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+import contextlib
+from argparse import Namespace
+from datetime import date
+
+from hcwr_bench_db import create_time_db
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbms_mod import close_connections
+from hcwr_tasks_mod import fetch_and_display_entries, sum_times_by_entry, parse_duration
+
+# 20 Einträge je Arbeitstag, ca. 5200 je Jahr
+ENTRIES_PER_DAY = 20
+
+def create_db(path, count):
+    """time.db mit mindestens 'count' Einträgen, Entry-Texte mit count/4 verschiedenen Werten."""
+    years = -(-count // (ENTRIES_PER_DAY * 260))
+    create_time_db(path, years, ENTRIES_PER_DAY, last_day=date(2025, 12, 31))
+    conn = sqlite3.connect(path)
+    conn.execute("DELETE FROM entries WHERE id > ?", (count,))
+    conn.execute("UPDATE entries SET description = description || ' #' || (id % ?)", (max(count // 4, 1),))
+    conn.commit()
+    conn.close()
+
+def legacy_sum_times(data):
+    """Nachbau der früheren --sum-times Schleife mit Suche in new_data je Zeile."""
+    new_data = []
+    for line in data:
+        idx, category, start, end, duration, entry = line
+        duration_sec = parse_duration(duration)
+        existing = next((x for x in new_data if x[5] == entry), None)
+        if existing:
+            existing[4] += duration_sec
+        else:
+            new_data.append([idx, category, start, end, duration_sec, entry])
+    return new_data
+
+def timed(func, *args):
+    t0 = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - t0
+
+def fetch(db_path, search, sum_times):
+    """fetch_and_display_entries() wie 'hcwr -J -a [-S] -s search', Ausgabe wird verworfen."""
+    HCWR_GLOBALS.args = Namespace(
+        verbose=False, dry_run=False, database=db_path, search=search, all_jobs=True,
+        sum_times=sum_times, json=False, zeiterfassung=None, cat_time_totals_of=None,
+        start_day=None, stop_day=None, week=None, year=None,
+    )
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        return fetch_and_display_entries(asListObj=True)
+
+def report(label, count, seconds):
+    print(f"    {label:<40} {seconds * 1000:>10.1f} ms  {seconds * 1e6 / count:>8.2f} µs/Eintrag")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--entries", type=int, action="append", help="Anzahl Einträge, mehrfach möglich (Default: 25000, 50000, 100000)")
+    parser.add_argument("--legacy-max", type=int, default=25000,
+                        help="Nachbau der alten Schleifen nur bis zu dieser Größe messen (0: nie), bei 100000 dauert er Minuten")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    for count in args.entries or [25000, 50000, 100000]:
+        db_path = os.path.join(tmp_dir, f"time-{count}.db")
+        create_db(db_path, count)
+        print(f"{count} Einträge:")
+
+        legacy = count <= args.legacy_max
+        data = fetch(db_path, "", False)
+        new, t_new = timed(sum_times_by_entry, [list(line) for line in data])
+        report(f"--sum-times ({len(new)} Zeilen)", count, t_new)
+        if legacy:
+            old, t_old = timed(legacy_sum_times, [list(line) for line in data])
+            report("--sum-times Nachbau alt", count, t_old)
+            print(f"    Gleiches Ergebnis: {old == new}")
+
+        close_connections()
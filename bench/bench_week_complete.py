@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_week_complete.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+Benchmark für die Vollständigkeitsprüfung: frühere Prüfung (je Wochentag eine Abfrage)
+gegenüber check_weeks_complete() mit einer gruppierten Abfrage für alle Wochen.
+
+Beispiel:
+    python3 bench/bench_week_complete.py -y 2025
+"""
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+from argparse import Namespace
+from datetime import date, timedelta
+
+from hcwr_bench_db import create_time_db
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbms_mod import check_weeks_complete
+
+def legacy_weeks_complete(conn, year, last_kw):
+    """Nachbau der früheren Prüfung: je Woche 7 count(*) Abfragen."""
+    cursor = conn.cursor()
+    missing = {}
+    for kw in range(1, last_kw + 1):
+        monday = date.fromisocalendar(year, kw, 1)
+        for i, wday in enumerate(HCWR_GLOBALS.WEEKDAYS):
+            day = monday + timedelta(days=i)
+            cursor.execute("SELECT count(*) FROM entries WHERE start_time >= ? AND start_time < ?",
+                           (day.strftime('%Y-%m-%d'), (day + timedelta(days=1)).strftime('%Y-%m-%d')))
+            if float(HCWR_GLOBALS.CFG.get("Workdays", wday)) > 0 and cursor.fetchone()[0] == 0:
+                missing.setdefault((year, kw), []).append(wday)
+    return missing
+
+def run(label, func):
+    queries = []
+    conn = sqlite3.connect(DB_PATH)
+    conn.set_trace_callback(queries.append)
+    t0 = time.perf_counter()
+    result = func(conn)
+    elapsed = time.perf_counter() - t0
+    conn.close()
+    print(f"{label:<28} {len(queries):>6} Abfragen {elapsed*1000:>10.1f} ms  -> {sum(len(d) for d in result.values())} fehlende Tage")
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-y", "--year", type=int, default=2025)
+    args = parser.parse_args()
+
+    last_kw = date(args.year, 12, 28).isocalendar()[1]
+    DB_PATH = os.path.join(tempfile.mkdtemp(), "time.db")
+    HCWR_GLOBALS.args = Namespace(verbose=False, dry_run=False, database=DB_PATH)
+    HCWR_GLOBALS.CFG.read_dict({
+        "Workdays": {"Mo": "8", "Di": "8", "Mi": "8", "Do": "8", "Fr": "8", "Sa": "0", "So": "0"},
+    })
+    create_time_db(DB_PATH, 1, last_day=date.fromisocalendar(args.year, last_kw, 7))
+
+    # Ein paar Lücken einbauen
+    conn = sqlite3.connect(DB_PATH)
+    for kw, wday in ((3, 2), (17, 5), (40, 1)):
+        day = date.fromisocalendar(args.year, kw, wday)
+        conn.execute("DELETE FROM entries WHERE start_time >= ? AND start_time < ?",
+                     (day.strftime('%Y-%m-%d'), (day + timedelta(days=1)).strftime('%Y-%m-%d')))
+    conn.commit()
+    conn.close()
+
+    old = run("alt (7 Abfragen je KW)", lambda c: legacy_weeks_complete(c, args.year, last_kw))
+    new = run("neu (eine Abfrage)", lambda c: check_weeks_complete(c, (args.year, 1), (args.year, last_kw)))
+    print(f"Gleiches Ergebnis: {old == new}")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_week_filter.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+Benchmark KW-Filter der SQLite-Abfragen (whours_sql, wdayhours_sql, absence, week_absence_days):
+Python UDF isoweek() gegenüber halboffenen Bereichsgrenzen auf start_time/stop_time.
+
+Beispiel:
+    python3 bench/bench_week_filter.py -y 5 -e 8 --index
+"""
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+from argparse import Namespace
+from datetime import date
+
+from hcwr_bench_db import create_time_db
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_config_mod import isoweek
+from hcwr_utils_mod import get_week_filter
+from hcwr_settings_mod import reset_settings
+
+QUERIES = ["whours_sql", "wdayhours_sql", "absence", "week_absence_days"]
+
+def run_queries(conn, year, week, mode, repeat):
+    """Führt alle KW-Abfragen 'repeat' mal aus und liefert (Ergebnisse, Sekunden)."""
+    HCWR_GLOBALS.CFG["Database"]["week_filter"] = mode
+    reset_settings()
+    results = {}
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            sql, params = get_week_filter(query, year, week)
+            if query in ("whours_sql", "wdayhours_sql"):
+                sql += HCWR_GLOBALS.DB_QUERIES.wdayhours_sql_excl
+            results[query] = conn.execute(sql, params).fetchall()
+    return results, time.perf_counter() - t0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-y", "--years", type=int, default=5)
+    parser.add_argument("-e", "--entries-per-day", type=int, default=8)
+    parser.add_argument("-r", "--repeat", type=int, default=1)
+    parser.add_argument("--index", action="store_true", help="Index auf entries(start_time) anlegen")
+    args = parser.parse_args()
+
+    HCWR_GLOBALS.args = Namespace(verbose=False, dry_run=False)
+    HCWR_GLOBALS.CFG.read_dict({"Database": {}})
+
+    db_path = os.path.join(tempfile.mkdtemp(), "time.db")
+    last_day = date(2025, 12, 31)
+    first_day, count = create_time_db(db_path, args.years, args.entries_per_day, last_day=last_day)
+    conn = sqlite3.connect(db_path)
+    conn.create_function("isoweek", 3, isoweek)
+    if args.index:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_bench_entries_start ON entries(start_time)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_bench_entries_stop ON entries(stop_time)")
+        conn.execute("ANALYZE")
+    print(f"{count} Einträge von {first_day} bis {last_day}, Index: {args.index}")
+
+    old, t_old = run_queries(conn, 2025, 50, "isoweek", args.repeat)
+    new, t_new = run_queries(conn, 2025, 50, "range", args.repeat)
+    print(f"isoweek UDF: {t_old * 1000 / args.repeat:>8.1f} ms je KW")
+    print(f"range:       {t_new * 1000 / args.repeat:>8.1f} ms je KW")
+    print(f"Gleiches Ergebnis: {old == new}")
+    conn.close()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_week_snapshot.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+Benchmark für den WeekSnapshot: Abfragen und Laufzeit der Wochenberechnungen eines
+hcwr Laufs (Projektsummen, UK/UUK, Wochentagsstunden, Abwesenheiten, Abwesenheitstage)
+einzeln per SQL gegenüber einem WeekSnapshot, inklusive Ergebnisvergleich.
+
+Beispiel:
+    python3 bench/bench_week_snapshot.py -y 5 -w 50
+"""
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+from argparse import Namespace
+from datetime import date, timedelta
+
+from hcwr_bench_db import create_time_db
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_config_mod import get_weekday_hours_per_day
+from hcwr_dbms_mod import berechne_abwesenheiten
+from hcwr_utils_mod import get_wday_absences
+from hcwr_snapshot_mod import load_week_snapshot
+
+UUK_CATEGORIES = ["Auftrag#", "Organisation", "Sacharbeit abrechenbar", "Sacharbeit andere*"]
+
+def week_report(conn, year, week):
+    """Alle Wochenwerte, die bin/hcwr für einen Bericht braucht."""
+    snapshot = HCWR_GLOBALS.WEEK_SNAPSHOT
+    monday = date.fromisocalendar(year, week, 1)
+    params = [monday.strftime("%Y-%m-%d"), (monday + timedelta(days=7)).strftime("%Y-%m-%d")]
+    if snapshot is not None:
+        totals = snapshot.get_project_totals()
+        uuk = {c: snapshot.get_uuk_rows(HCWR_GLOBALS.PROJECTS_ID_MAP[c]) for c in UUK_CATEGORIES}
+    else:
+        totals = conn.execute(HCWR_GLOBALS.DB_QUERIES.total_per_project_by_week, params).fetchall()
+        uuk = {c: conn.execute(HCWR_GLOBALS.DB_QUERIES.tppbw_uuk, params + [HCWR_GLOBALS.PROJECTS_ID_MAP[c]]).fetchall()
+               for c in UUK_CATEGORIES}
+    # julianday() liefert Gleitkomma-Sekunden
+    uuk = {c: [r[:4] + (round(r[4]),) for r in rows] for c, rows in uuk.items()}
+    return {
+        "totals": totals,
+        "uuk": uuk,
+        "wdays": get_weekday_hours_per_day(conn, year, week),
+        "absences": berechne_abwesenheiten(conn, year, week),
+        "absence_days": get_wday_absences(conn, year, week),
+    }
+
+def run(label, func):
+    queries = []
+    conn = sqlite3.connect(DB_PATH)
+    conn.set_trace_callback(queries.append)
+    t0 = time.perf_counter()
+    result = func(conn)
+    elapsed = time.perf_counter() - t0
+    conn.close()
+    print(f"{label:<26} {len(queries):>6} Abfragen {elapsed*1000:>10.2f} ms")
+    return result
+
+def with_snapshot(conn, year, week):
+    load_week_snapshot(conn, year, week)
+    return week_report(conn, year, week)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-y", "--years", type=int, default=5)
+    parser.add_argument("-w", "--week", type=int, default=50)
+    parser.add_argument("--year", type=int, default=2025)
+    args = parser.parse_args()
+
+    DB_PATH = os.path.join(tempfile.mkdtemp(), "time.db")
+    HCWR_GLOBALS.args = Namespace(verbose=False, dry_run=False, database=DB_PATH, year=args.year, week=args.week)
+    HCWR_GLOBALS.CFG.read_dict({"Database": {}})
+    create_time_db(DB_PATH, args.years, last_day=date(args.year, 12, 31))
+
+    # Abwesenheiten und ein Eintrag über die Wochengrenze (So 22:00 - Mo 02:00)
+    monday = date.fromisocalendar(args.year, args.week, 1)
+    conn = sqlite3.connect(DB_PATH)
+    for pid, day in ((3, monday + timedelta(days=1)), (2, monday + timedelta(days=2)), (1, monday + timedelta(days=3))):
+        conn.execute("INSERT INTO entries (project_id, start_time, stop_time, description) VALUES (?, ?, ?, ?)",
+                     (pid, f"{day} 00:00:00", f"{day} 08:00:00", "Abwesenheit"))
+    conn.execute("INSERT INTO entries (project_id, start_time, stop_time, description) VALUES (?, ?, ?, ?)",
+                 (321, f"{monday - timedelta(days=1)} 22:00:00", f"{monday} 02:00:00", "Nachtschicht"))
+    conn.commit()
+    conn.close()
+
+    HCWR_GLOBALS.WEEK_SNAPSHOT = None
+    old = run("einzelne Abfragen", lambda c: week_report(c, args.year, args.week))
+    new = run("WeekSnapshot", lambda c: with_snapshot(c, args.year, args.week))
+    for key in old:
+        print(f"  {key:<14} gleich: {old[key] == new[key]}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           bench_weeks.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+hcwr --weeks: misst 'hcwr --weeks' über die letzten 13, 26 und 52 Wochen einer time.db
+(die Zeit je Woche sollte gleich bleiben) gegen einzelne 'hcwr -n -w KW' Aufrufe und prüft,
+dass jeder Bericht samt Stundenkonto der Ausgabe des einzelnen Aufrufs entspricht. Die
+einzelnen Aufrufe beantworten jede Rückfrage mit 1 (report_of aus bench_batch.py), bei
+mehrdeutigen Keywords also den ersten Treffer wie --weeks. Exit-Code 1 bei Abweichung.
+
+Beispiel:
+    python3 bench/bench_weeks.py
+    python3 bench/bench_weeks.py -s 4 -s 52 -s 104 -y 3 --check 10
+"""
+import os
+import sys
+import time
+import getpass
+import argparse
+import tempfile
+import subprocess
+from datetime import date, timedelta
+
+from hcwr_bench_db import create_time_db
+from bench_suite import BIN_DIR, MODULE_DIR, write_config
+from bench_batch import report_of, same_report
+
+def get_weeks(last_day, count):
+    """Die count Wochen vor der KW von last_day als [(Jahr, KW)], älteste zuerst."""
+    monday = last_day - timedelta(days=last_day.weekday())
+    return [tuple((monday - timedelta(days=7 * n)).isocalendar()[:2]) for n in range(count, 0, -1)]
+
+def run_weeks(config, weeks, out_dir, env):
+    span = f"{weeks[0][0]}/{weeks[0][1]}-{weeks[-1][0]}/{weeks[-1][1]}"
+    cmd = [sys.executable, os.path.join(BIN_DIR, "hcwr"), "-c", config, "--weeks", span, "--out-dir", out_dir]
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    return (time.perf_counter() - t0) * 1000, proc.returncode, proc.stdout
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-s", "--span", type=int, action="append", help="Anzahl Wochen, mehrfach möglich (Default: 13, 26, 52)")
+    parser.add_argument("-y", "--years", type=int, default=2, help="Jahre in der time.db")
+    parser.add_argument("--check", type=int, default=0, help="nur die letzten N Wochen einzeln prüfen (Default: alle)")
+    parser.add_argument("--last-day", default="2025-12-31", help="letzter Tag der time.db")
+    args = parser.parse_args()
+
+    last_day = date.fromisoformat(args.last_day)
+    spans = args.span or [13, 26, 52]
+
+    with tempfile.TemporaryDirectory(prefix="hcwr-weeks-bench-") as tmp:
+        env = dict(os.environ, HOME=tmp, HCWR_NO_DAEMON="1")
+        for key in ("WEEK", "KW", "YEAR", "DATABASE", "GROUP", "EMAIL"):
+            env.pop(key, None)
+        # bin/hcwr lädt seine Module nur, wenn MODULE_DIR noch nicht in sys.path steht
+        env["PYTHONPATH"] = os.pathsep.join(p for p in env.get("PYTHONPATH", "").split(os.pathsep)
+                                            if p and os.path.abspath(p) != MODULE_DIR)
+
+        db_path = os.path.join(tmp, "time.db")
+        keyword_db = os.path.join(tmp, "keyword_id.db")
+        first_day, count = create_time_db(db_path, args.years, 4, last_day=last_day, seed=74, projects=40,
+                                          contract_keywords=100, absence_density=0.08, holidays=True,
+                                          keyword_db=keyword_db)
+        write_config(tmp, db_path, keyword_db, first_day)
+        config = os.path.join(tmp, ".heco", "hcwr.conf")
+        print(f"time.db: {count} Einträge, {args.years} Jahr(e) bis {last_day}")
+
+        print(f"{'Wochen':>7} | {'--weeks':>10} | {'je Woche':>10}")
+        for span in spans:
+            out_dir = os.path.join(tmp, f"out-{span}")
+            ms, code, output = run_weeks(config, get_weeks(last_day, span), out_dir, env)
+            status = "" if code == 0 else f"  Exit-Code {code}"
+            print(f"{span:>7} | {ms:>7.0f} ms | {ms / span:>7.0f} ms{status}")
+            if code:
+                print(output)
+
+        weeks = get_weeks(last_day, max(spans))
+        if args.check:
+            weeks = weeks[-args.check:]
+        name = getpass.getuser()
+        diffs = 0
+        t0 = time.perf_counter()
+        for year, week in weeks:
+            expected = report_of(config, year, week, env)
+            with open(os.path.join(tmp, f"out-{max(spans)}", str(year), str(week), f"{name}.txt")) as f:
+                if not same_report(f.read(), expected):
+                    diffs += 1
+                    print(f"Abweichung: KW {year}/{week}")
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"{len(weeks)} einzelne 'hcwr -n' Aufrufe: {ms:.0f} ms ({ms / len(weeks):.0f} ms je Woche)")
+        print(f"Berichte gleich 'hcwr -n': {diffs == 0} ({len(weeks)} Wochen)")
+        sys.exit(1 if diffs else 0)
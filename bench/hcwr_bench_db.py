@@ -0,0 +1,219 @@
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           hcwr_bench_db.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+"""
+Erzeugt synthetische heco time.db Datenbanken für die Benchmarks unter ./bench.
+
+Die Projekte folgen PROJECTS_ID_MAP und INTERN_PROJEKT_ID_MAP, optional mit weiteren
+Projekten, Contract-Keywords in keyword_id.db, Urlaubs-/Krankheitstagen und Feiertagen.
+
+Beispiel:
+    python3 bench/hcwr_bench_db.py /tmp/time.db -y 5 -e 6
+    python3 bench/hcwr_bench_db.py /tmp/time.db -y 10 -p 40 -k 200 --absence 0.08 --holidays \\
+        --keyword-db /tmp/keyword_id.db
+"""
+import os
+import sys
+import random
+import sqlite3
+import argparse
+from datetime import date, datetime, timedelta
+
+MODULE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../opt/hcwr/modules"))
+if MODULE_DIR not in sys.path:
+    sys.path.insert(0, MODULE_DIR)
+
+from hcwr_globals_mod import HCWR_GLOBALS
+import hcwr_sqlite_queries_sql as DB_QUERIES
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS projects (
+        id INTEGER PRIMARY KEY,
+        key VARCHAR(16) NOT NULL,
+        description VARCHAR(256),
+        active BOOLEAN DEFAULT 1
+    );
+    CREATE TABLE IF NOT EXISTS entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_id INTEGER REFERENCES projects(id),
+        start_time TIMESTAMP NOT NULL,
+        stop_time TIMESTAMP NOT NULL,
+        description VARCHAR(256)
+    );
+"""
+
+# Unterkategorien von "Auftrag#", deren Einträge eine Vertragsnummer brauchen (get_contract_id)
+CONTRACT_PIDS = (321, 322, 323)
+
+# Erste Projekt-ID für zusätzliche Projekte außerhalb des hcwr Projektbaums
+EXTRA_PID_BASE = 1000
+
+# Keywords wie in initialize_contracts_db(), weitere werden zufällig erzeugt
+KEYWORDS = ["pflege", "verbesserung", "features", "betrieb", "openslides-allgemein",
+            "relationale datenbank", "keycloak", "crypto-vote", "projektor-service"]
+
+WORDS = ["Support", "Ticket", "Meeting", "Planung", "Koordination", "Code Review", "Dokumentation",
+         "Deployment", "Fehleranalyse", "Schulung", "Abstimmung", "Release", "Angebot", "Doku"]
+
+def create_projects(cursor, count=None):
+    """
+    Legt die Projektstruktur aus PROJECTS_ID_MAP und INTERN_PROJEKT_ID_MAP an.
+    Oberkategorien (x0) ohne Einrückung, Unterkategorien mit zwei Leerzeichen.
+    Mit 'count' größer als PROJECTS_ID_MAP kommen Projekte ab EXTRA_PID_BASE dazu,
+    mit 'count' kleiner werden nur die ersten 'count' Projekte bebucht.
+
+    Rückgabe:
+        list der Projekt-IDs, auf die gebucht wird
+    """
+    for pname, values in HCWR_GLOBALS.INTERN_PROJEKT_ID_MAP.items():
+        cursor.execute("INSERT INTO projects (id, key, description) VALUES (?, ?, ?)",
+                       (values[0], values[1], pname))
+    for pname, pid in HCWR_GLOBALS.PROJECTS_ID_MAP.items():
+        desc = pname if pid % 10 == 0 else f"  {pname}"
+        cursor.execute("INSERT INTO projects (id, key, description) VALUES (?, ?, ?)",
+                       (pid, str(pid), desc))
+    project_ids = list(HCWR_GLOBALS.PROJECTS_ID_MAP.values())
+    if count is None:
+        return project_ids
+
+    for n in range(max(count - len(project_ids), 0)):
+        pid = EXTRA_PID_BASE + n
+        cursor.execute("INSERT INTO projects (id, key, description) VALUES (?, ?, ?)",
+                       (pid, str(pid), f"  Projekt {n + 1}"))
+        project_ids.append(pid)
+    return project_ids[:max(count, 1)]
+
+def make_contracts(rnd, count):
+    """Liefert 'count' Zeilen (keyword, contract_id, task) für die Tabelle contracts."""
+    rows = [(kw, f"#{4012 + i}", "Projekt" if i > 4 else "Dauertätigkeit")
+            for i, kw in enumerate(KEYWORDS[:count])]
+    while len(rows) < count:
+        word = "".join(rnd.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rnd.randint(5, 12)))
+        rows.append((word, f"#{5000 + len(rows)}", "Projekt"))
+    return rows
+
+def create_keyword_db(path, contracts):
+    """Schreibt 'contracts' als Tabelle contracts nach 'path' (keyword_id.db)."""
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute(DB_QUERIES.create_contracts_tbl)
+    conn.executemany("INSERT INTO contracts (keyword, contract_id, task) VALUES (?, ?, ?)", contracts)
+    conn.commit()
+    conn.close()
+
+def get_holiday_days(first_day, last_day, state=None):
+    """Feiertage von first_day bis last_day als {date: name}, berechnet mit hcwr_holiday_mod."""
+    from hcwr_holiday_mod import native_holidays
+    days = {}
+    for year in range(first_day.year, last_day.year + 1):
+        for day, name in native_holidays(year, state):
+            days[date.fromisoformat(day)] = name
+    return days
+
+def day_entry(day, pid, desc, hours=8):
+    start = datetime(day.year, day.month, day.day, 8, 0, 0)
+    stop = start + timedelta(hours=hours)
+    return (pid, start.strftime("%Y-%m-%d %H:%M:%S"), stop.strftime("%Y-%m-%d %H:%M:%S"), desc)
+
+def create_time_db(path, years=1, entries_per_day=4, last_day=None, seed=74, projects=None,
+                   contract_keywords=0, absence_density=0.0, holidays=False, keyword_db=None):
+    """
+    Erzeugt eine time.db mit Einträgen für 'years' Jahre bis 'last_day' (Default: heute).
+    Mo-Fr werden 'entries_per_day' Einträge à 2 Stunden ab 08:00 gebucht.
+
+    Optional:
+        projects:          Anzahl bebuchter Projekte (siehe create_projects)
+        contract_keywords: Anzahl Keywords für keyword_db, Einträge auf CONTRACT_PIDS
+                           enthalten dann meist ein Keyword, sonst eine Vertragsnummer
+        absence_density:   Anteil der Arbeitstage mit Urlaub (2/3) oder Krank (1/3)
+        holidays:          Feiertage als "Feiertag: <Name>" wie insert_holiday_entries()
+
+    Rückgabe:
+        (erster Tag, Anzahl Einträge)
+    """
+    rnd = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+    if last_day is None:
+        last_day = date.today()
+
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.executescript(SCHEMA)
+    project_ids = create_projects(cursor, projects)
+
+    contracts = make_contracts(rnd, contract_keywords) if contract_keywords else []
+    if keyword_db and contracts:
+        create_keyword_db(keyword_db, contracts)
+
+    first_day = date(last_day.year - years + 1, 1, 1)
+    holiday_days = get_holiday_days(first_day, last_day) if holidays else {}
+    absence = HCWR_GLOBALS.INTERN_PROJEKT_ID_MAP
+    rows = []
+    day = first_day
+    while day <= last_day:
+        if day.weekday() >= 5:
+            day += timedelta(days=1)
+            continue
+        if day in holiday_days:
+            rows.append(day_entry(day, absence["Feiertag"][0], f"Feiertag: {holiday_days[day]}"))
+        elif absence_density and rnd.random() < absence_density:
+            pname = "Urlaub" if rnd.random() < 2 / 3 else "Krank"
+            rows.append(day_entry(day, absence[pname][0], pname))
+        else:
+            start = datetime(day.year, day.month, day.day, 8, 0, 0)
+            for n in range(entries_per_day):
+                stop = start + timedelta(hours=2)
+                pid = rnd.choice(project_ids)
+                if contracts and pid in CONTRACT_PIDS:
+                    keyword, contract_id, task = rnd.choice(contracts)
+                    desc = f"{keyword} {rnd.choice(WORDS)}" if rnd.random() < 0.8 else f"{rnd.choice(WORDS)} {contract_id}"
+                elif contracts or projects is not None:
+                    desc = f"{rnd.choice(WORDS)} {rnd.choice(WORDS)} {pid}-{n}"
+                else:
+                    desc = f"Task {pid}-{n}"
+                rows.append((pid, start.strftime("%Y-%m-%d %H:%M:%S"),
+                             stop.strftime("%Y-%m-%d %H:%M:%S"), desc))
+                start = stop
+        day += timedelta(days=1)
+
+    cursor.executemany(
+        "INSERT INTO entries (project_id, start_time, stop_time, description) VALUES (?, ?, ?, ?)",
+        rows
+    )
+    conn.commit()
+    conn.close()
+    return first_day, len(rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Zielpfad der time.db")
+    parser.add_argument("-y", "--years", type=int, default=1)
+    parser.add_argument("-e", "--entries-per-day", type=int, default=4)
+    parser.add_argument("-p", "--projects", type=int, help="Anzahl bebuchter Projekte (Default: Projektbaum)")
+    parser.add_argument("-k", "--contract-keywords", type=int, default=0, help="Anzahl Contract-Keywords")
+    parser.add_argument("--keyword-db", help="Zielpfad der keyword_id.db für --contract-keywords")
+    parser.add_argument("--absence", type=float, default=0.0, help="Anteil Urlaubs-/Krankheitstage, z. B. 0.08")
+    parser.add_argument("--holidays", action="store_true", help="bundesweite Feiertage eintragen")
+    parser.add_argument("--seed", type=int, default=74)
+    args = parser.parse_args()
+    first_day, count = create_time_db(args.path, args.years, args.entries_per_day, seed=args.seed,
+                                      projects=args.projects, contract_keywords=args.contract_keywords,
+                                      absence_density=args.absence, holidays=args.holidays,
+                                      keyword_db=args.keyword_db)
+    print(f"{args.path}: {count} Einträge ab {first_day}")
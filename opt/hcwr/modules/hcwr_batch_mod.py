@@ -0,0 +1,412 @@
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           hcwr_batch_mod.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+#
+# hcwr --batch users.toml: Wochenfazit für mehrere Benutzer einer KW ohne vim und ohne
+# Rückfragen. Feiertage und Contract-Keyword-Index werden einmal im Elternprozess geladen,
+# danach forkt je Benutzer ein Kind (höchstens --jobs gleichzeitig), das bin/hcwr wie der
+# Daemon (../modules/hcwr_daemon_mod.py) mit Config und Datenbank des Benutzers ausführt.
+# Die Berichte landen atomar in {--out-dir bzw. kw_report_base_dir}/{Jahr}/{KW}/{name}.txt.
+#
+# hcwr --weeks 2025/1-2025/52: alle Wochenfazits eines KW-Bereichs des Aufrufers in einem Prozess.
+# Verbindungen, Caches und die Wochensummen für das Stundenkonto bleiben über alle Wochen stehen,
+# auto_migration, initialize_contracts_db und insert_holiday_entries laufen nur einmal.
+#
+# Beispiel users.toml:
+#     [defaults]
+#     group = "intevation"
+#
+#     [[user]]
+#     name = "ckl"                              # Dateiname des Berichts: ckl.txt
+#     config = "/home/ckl/.heco/hcwr.conf"
+#     database = "/home/ckl/.heco/time.db"      # optional, sonst [Database] dbpath der Config
+#     email = "Christian Klose <ckl@...>"       # optional, sonst [General] fullname der Config
+import io
+import getpass
+import os
+import sys
+import time
+import shutil
+import tempfile
+import traceback
+import configparser
+import contextlib
+import colorama
+from datetime import date, timedelta
+from colorama import Fore, Style
+
+# Import von eigenem Module
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbg_mod import info, warning, get_function_name
+from hcwr_dbms_mod import get_connection, close_connections
+from hcwr_keyword_mod import get_contract_keyword_index
+from hcwr_holiday_mod import get_holidays_of_year
+from hcwr_daemon_mod import reset_daemon_state, run_script
+from hcwr_config_mod import parse_week_span
+import hcwr_client_mod
+
+# Schlüssel je [[user]] in users.toml, name und config sind Pflicht
+BATCH_USER_KEYS = ("name", "config", "database", "email", "group")
+
+# Sidecar-Dateien je Benutzer: Config-Schlüssel in [Database]/[General], Globale und Dateiname
+# neben der Config des Benutzers, wenn die Config keinen Pfad setzt (wie ~/.heco/ beim Default)
+BATCH_USER_PATHS = {
+    "db_keyword_id_path": ("Database", "DB_KEYWORD_ID_PATH", "keyword_id.db"),
+    "db_ledger_path": ("Database", "DB_LEDGER_PATH", "hcwr_ledger.db"),
+    "db_fts_path": ("Database", "DB_FTS_PATH", "hcwr_fts.db"),
+    "holiday_cache_path": ("General", "HOLIDAY_CACHE_PATH", "hcwr_holidays.json"),
+}
+
+def load_batch_users(path):
+    """
+    Liest die Benutzerliste aus users.toml ([defaults] und [[user]] Tabellen).
+
+    Rückgabe:
+        list von dict mit den Schlüsseln aus BATCH_USER_KEYS
+
+    Raises:
+        ValueError: bei fehlenden Pflichtfeldern oder doppelten Namen
+    """
+    fname = get_function_name()
+
+    # tomllib gehört erst ab Python 3.11 zur Standardbibliothek
+    try:
+        import tomllib
+    except ImportError:
+        raise ValueError("--batch benötigt Python 3.11 (tomllib)")
+
+    path = os.path.abspath(os.path.expanduser(path))
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+
+    defaults = data.get("defaults", {})
+    users = []
+    for idx, entry in enumerate(data.get("user", []), 1):
+        user = {key: entry.get(key, defaults.get(key)) for key in BATCH_USER_KEYS}
+        unknown = set(entry) - set(BATCH_USER_KEYS)
+        if unknown:
+            raise ValueError(f"[[user]] Nr. {idx}: unbekannte Schlüssel {', '.join(sorted(unknown))}")
+        if not user["name"] or not user["config"]:
+            raise ValueError(f"[[user]] Nr. {idx}: 'name' und 'config' müssen gesetzt sein")
+        if os.sep in user["name"]:
+            raise ValueError(f"[[user]] Nr. {idx}: ungültiger Name {user['name']!r}")
+        # Relative Pfade gelten ab dem Verzeichnis der users.toml
+        user["config"] = os.path.join(os.path.dirname(path), os.path.expanduser(user["config"]))
+        # Pfad einer SQLite-Datenbank, ein PostgreSQL DSN bleibt wie er ist
+        if user["database"] and not "=" in user["database"]:
+            user["database"] = os.path.join(os.path.dirname(path), os.path.expanduser(user["database"]))
+        users.append(user)
+
+    names = [user["name"] for user in users]
+    doubles = sorted({name for name in names if names.count(name) > 1})
+    if doubles:
+        raise ValueError(f"Doppelte Namen: {', '.join(doubles)}")
+    if not users:
+        raise ValueError("Keine [[user]] Einträge")
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nusers = {users}")
+    return users
+
+def get_batch_user_paths(config_file):
+    """
+    Sidecar-Pfade (Keyword-DB, Ledger, FTS, Feiertags-Cache) eines Benutzers: aus seiner Config,
+    sonst neben der Config. Die Defaults aus HCWR_GLOBALS zeigen auf ~/.heco/ des Aufrufers.
+    """
+    cfg = configparser.ConfigParser()
+    cfg.optionxform = str
+    cfg.read(config_file)
+    config_dir = os.path.dirname(os.path.abspath(config_file))
+    paths = {}
+    for key, (section, name, filename) in BATCH_USER_PATHS.items():
+        value = cfg.get(section, key, fallback=None)
+        paths[name] = os.path.expanduser(value) if value else os.path.join(config_dir, filename)
+    return paths
+
+def warm_batch_caches(users, year):
+    """
+    Lädt Feiertage des Berichtsjahres (und Vorjahres) und je Keyword-DB den Contract-Keyword-Index
+    einmal im Elternprozess. Die Kinder erben beides per fork().
+
+    Rückgabe:
+        dict {Pfad der Keyword-DB: ContractKeywordIndex}
+    """
+    fname = get_function_name()
+
+    for y in (year - 1, year):
+        get_holidays_of_year(y)
+
+    indexes = {}
+    for path in sorted({user["paths"]["DB_KEYWORD_ID_PATH"] for user in users}):
+        if not os.path.exists(path):
+            continue
+        try:
+            indexes[path] = get_contract_keyword_index(path, get_connection)
+        except Exception as e:
+            warning("Batch: Contract-Keyword-Index konnte nicht geladen werden:", f"{path}: {e}", "WARNUNG")
+    # Verbindungen dürfen nicht über fork() geteilt werden
+    close_connections()
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nholidays = {sorted(HCWR_GLOBALS.HOLIDAY_CACHE)}\nindexes = {list(indexes)}")
+    return indexes
+
+def get_batch_argv(script_path, user, report_file):
+    """Kommandozeile für bin/hcwr im Kind, -w/-y und -n kommen aus dem Batch-Aufruf."""
+    argv = [script_path, "-w", str(HCWR_GLOBALS.args.week), "-y", str(HCWR_GLOBALS.args.year),
+            "-c", user["config"], "-g", user["group"] or HCWR_GLOBALS.args.group]
+    if user["database"]:
+        argv += ["-d", user["database"]]
+    if HCWR_GLOBALS.args.dry_run:
+        argv.append("-n")
+    else:
+        argv += ["-o", report_file]
+    return argv
+
+def run_batch_user(user, script_path, argv, log_path, indexes):
+    """Kind: stdin /dev/null, stdout/stderr in log_path, führt bin/hcwr mit argv für user aus und endet mit os._exit()."""
+    code = 1
+    try:
+        null = os.open(os.devnull, os.O_RDONLY)
+        log = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.dup2(null, 0)
+        os.dup2(log, 1)
+        os.dup2(log, 2)
+        os.close(null)
+        os.close(log)
+        sys.stdin = open(0, "r", closefd=False)
+        sys.stdout = open(1, "w", closefd=False)
+        sys.stderr = open(2, "w", buffering=1, closefd=False)
+        colorama.init(autoreset=True)
+
+        # Wie im Daemon: frischer Zustand, nur die warmen Caches bleiben
+        reset_daemon_state()
+        for name, path in user["paths"].items():
+            setattr(HCWR_GLOBALS, name, path)
+        HCWR_GLOBALS.CONTRACT_KEYWORD_INDEX = indexes.get(user["paths"]["DB_KEYWORD_ID_PATH"])
+        HCWR_GLOBALS.BATCH_USER = user
+
+        # Umgebung des Aufrufers darf Name, KW und Datenbank des Benutzers nicht überschreiben
+        for name in ("EMAIL", "YEAR", "WEEK", "KW", "DATABASE"):
+            os.environ.pop(name, None)
+        if user["email"]:
+            os.environ["EMAIL"] = user["email"]
+        HCWR_GLOBALS.DATABASE = None
+
+        hcwr_client_mod.DAEMON_CHILD = True
+        sys.argv = argv
+        code = run_script(script_path)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            close_connections()
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except BaseException:
+            pass
+        os._exit(code & 0xFF)
+
+def print_batch_results(label, rows, dry_run, verbose):
+    """
+    Ergebnistabelle für --batch und --weeks.
+
+    rows: [(Bezeichnung, ok, Exit-Code, Sekunden, Bericht, Ausgabe oder None)]
+    Rückgabe: Anzahl fehlgeschlagener Zeilen
+    """
+    failed = 0
+    print(f"{label:<16} | {'Status':<6} | {'Zeit':>8} | Bericht")
+    print("-" * 16 + "-+-" + "-" * 6 + "-+-" + "-" * 8 + "-+-" + "-" * 40)
+    for name, ok, code, seconds, report_file, log in rows:
+        status = Fore.GREEN + f"{'OK':<6}" if ok else Fore.RED + f"{'FEHLER':<6}"
+        target = "stdout (-n)" if dry_run else report_file
+        print(f"{name:<16} | " + status + Style.RESET_ALL + f" | {seconds * 1000:>5.0f} ms | {target}")
+        if not ok:
+            failed += 1
+        # Bei Fehlern und mit -n/--dry-run die Ausgabe des Kindes zeigen
+        if (not ok or dry_run or verbose) and log and log.strip():
+            exit_code = f" (Exit-Code {code})" if code is not None else ""
+            print(Style.DIM + f"--- {name}{exit_code} ---" + Style.RESET_ALL)
+            print(log.rstrip())
+    return failed
+
+def remove_old_report(report_file):
+    """
+    Löscht einen Bericht aus einem früheren Lauf. Danach zeigt os.path.exists(report_file), dass
+    dieser Lauf ihn geschrieben hat (write_file_if_changed lässt eine gleiche Datei unverändert).
+    """
+    try:
+        os.remove(report_file)
+    except FileNotFoundError:
+        pass
+
+def run_batch(script_path):
+    """
+    --batch users.toml: erzeugt die Wochenfazits aller Benutzer für -w/-y in höchstens
+    --jobs parallelen Prozessen und gibt je Benutzer Status, Laufzeit und Bericht aus.
+
+    Rückgabe:
+        Exit-Code, 0 wenn für alle Benutzer ein Bericht geschrieben wurde
+    """
+    fname = get_function_name()
+    args = HCWR_GLOBALS.args
+
+    try:
+        users = load_batch_users(args.batch)
+    except (OSError, ValueError) as e:
+        warning("Batch: Benutzerliste konnte nicht gelesen werden:", e, "ERROR")
+        return 1
+    base_dir = os.path.abspath(os.path.expanduser(args.out_dir or HCWR_GLOBALS.KW_REPORT_BASE_DIR))
+    report_dir = os.path.join(base_dir, str(args.year), str(args.week))
+    if not args.dry_run:
+        os.makedirs(report_dir, exist_ok=True)
+
+    results = {}
+    pending = []
+    for user in users:
+        # Ohne Config würde bin/hcwr interaktiv eine anlegen
+        if not os.path.exists(user["config"]):
+            results[user["name"]] = (False, None, 0.0, os.path.join(report_dir, f"{user['name']}.txt"),
+                                     f"Keine Konfigurationsdatei gefunden: {user['config']}")
+            continue
+        user["paths"] = get_batch_user_paths(user["config"])
+        pending.append(user)
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, len(pending)))
+
+    info(f"Batch KW {args.week}/{args.year}:", f"{len(users)} Benutzer, {jobs} Prozesse -> {report_dir}")
+    t_start = time.perf_counter()
+    indexes = warm_batch_caches(pending, args.year)
+
+    log_dir = tempfile.mkdtemp(prefix="hcwr-batch-")
+    running = {}
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        while pending or running:
+            while pending and len(running) < jobs:
+                user = pending.pop(0)
+                report_file = os.path.join(report_dir, f"{user['name']}.txt")
+                log_path = os.path.join(log_dir, f"{user['name']}.log")
+                argv = get_batch_argv(script_path, user, report_file)
+                if not args.dry_run:
+                    remove_old_report(report_file)
+                pid = os.fork()
+                if pid == 0:
+                    run_batch_user(user, script_path, argv, log_path, indexes)
+                running[pid] = (user, report_file, log_path, time.perf_counter())
+
+            pid, status = os.wait()
+            if pid not in running:
+                continue
+            user, report_file, log_path, t0 = running.pop(pid)
+            code = os.waitstatus_to_exitcode(status)
+            with open(log_path, errors="replace") as f:
+                log = f.read()
+            # Ohne Fehler und ohne Bericht hat bin/hcwr vorher abgebrochen, z. B. weil die KW noch leer ist.
+            # Ein alter Bericht zählt nicht, der wurde vor dem fork gelöscht.
+            ok = code == 0 and (args.dry_run or os.path.exists(report_file))
+            results[user["name"]] = (ok, code, time.perf_counter() - t0, report_file, log)
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+    failed = print_batch_results("Benutzer", [(user["name"],) + results[user["name"]] for user in users],
+                                 args.dry_run, args.verbose)
+
+    info(f"Batch fertig in {time.perf_counter() - t_start:.1f} s:", f"{len(users) - failed} von {len(users)} Berichten")
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nresults = {[(name, r[:4]) for name, r in results.items()]}")
+    return 1 if failed else 0
+
+def get_span_weeks(span):
+    """Alle (Jahr, KW) von span[0] bis span[1] (parse_week_span) in zeitlicher Reihenfolge."""
+    monday = date.fromisocalendar(*span[0], 1)
+    last = date.fromisocalendar(*span[1], 1)
+    weeks = []
+    while monday <= last:
+        weeks.append(tuple(monday.isocalendar()[:2]))
+        monday += timedelta(days=7)
+    return weeks
+
+def run_weeks(script_path):
+    """
+    --weeks YYYY/KW-YYYY/KW: erzeugt die Wochenfazits aller Wochen des Bereichs nacheinander in
+    diesem Prozess, wie --batch ohne vim und Rückfragen. Zwischen den Wochen bleiben die
+    Datenbankverbindungen, der warme Zustand des Daemons und HCWR_GLOBALS.WEEK_SECONDS_MEMO
+    stehen: das Stundenkonto jeder Woche braucht nur die Summe der neuen KW, der Lauf ist
+    linear in der Anzahl der Wochen.
+
+    Rückgabe:
+        Exit-Code, 0 wenn für alle Wochen ein Bericht geschrieben wurde
+    """
+    fname = get_function_name()
+    args = HCWR_GLOBALS.args
+
+    try:
+        weeks = get_span_weeks(parse_week_span(args.weeks))
+    except Exception as e:
+        warning(f"Fehler beim Parsen von --weeks: ", e, "Error")
+        return 1
+
+    base_dir = os.path.abspath(os.path.expanduser(args.out_dir or HCWR_GLOBALS.KW_REPORT_BASE_DIR))
+    dry_run, verbose = args.dry_run, args.verbose
+    user = {"name": getpass.getuser(), "config": HCWR_GLOBALS.CFG_FILE, "database": None, "email": None, "group": None}
+    # Config, Datenbank und Gruppe dieses Aufrufs gelten für alle Wochen
+    argv_base = ["-c", args.config, "-d", str(args.database), "-g", args.group]
+
+    # auto_migration und initialize_contracts_db sind für diese Config schon gelaufen
+    HCWR_GLOBALS.DAEMON_MIGRATED.add((HCWR_GLOBALS.CFG_FILE, args.database))
+    hcwr_client_mod.DAEMON_CHILD = True
+    memo = {}
+    holidays_done = set()
+
+    info(f"KW {weeks[0][0]}/{weeks[0][1]} bis {weeks[-1][0]}/{weeks[-1][1]}:", f"{len(weeks)} Wochen -> {base_dir}")
+    t_start = time.perf_counter()
+    rows = []
+    for year, week in weeks:
+        report_file = os.path.join(base_dir, str(year), str(week), f"{user['name']}.txt")
+        argv = [script_path, "-w", str(week), "-y", str(year)] + argv_base
+        if dry_run:
+            argv.append("-n")
+        else:
+            os.makedirs(os.path.dirname(report_file), exist_ok=True)
+            remove_old_report(report_file)
+            argv += ["-o", report_file]
+
+        # Wie im Daemon frischer Zustand je Woche, Verbindungen und Wochensummen bleiben
+        connections = HCWR_GLOBALS.DB_CONNECTIONS
+        reset_daemon_state()
+        HCWR_GLOBALS.DB_CONNECTIONS = connections
+        HCWR_GLOBALS.WEEK_SECONDS_MEMO = memo
+        HCWR_GLOBALS.HOLIDAY_ENTRIES_DONE = holidays_done
+        HCWR_GLOBALS.BATCH_USER = user
+        sys.argv = argv
+
+        # Ausgabe je Woche wie das Log bei --batch sammeln
+        log = io.StringIO()
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            code = run_script(script_path)
+        ok = code == 0 and (dry_run or os.path.exists(report_file))
+        rows.append((f"{year}/{week:02d}", ok, code, time.perf_counter() - t0, report_file, log.getvalue()))
+
+    failed = print_batch_results("KW", rows, dry_run, verbose)
+    info(f"Fertig in {time.perf_counter() - t_start:.1f} s:", f"{len(weeks) - failed} von {len(weeks)} Berichten")
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nrows = {rows}\nmemo = {len(memo)} Wochen")
+    return 1 if failed else 0
@@ -0,0 +1,137 @@
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           hcwr_client_mod.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+#
+# Client für den hcwr Daemon (siehe hcwr_daemon_mod.py): wird von bin/hcwr vor allen
+# anderen Modulen geladen und braucht deshalb nur die Standardbibliothek.
+# Läuft ein Daemon, übernimmt er den Aufruf samt stdin/stdout/stderr (SCM_RIGHTS),
+# sonst arbeitet hcwr wie bisher im eigenen Prozess.
+# json und socket werden erst geladen, wenn es einen Daemon Socket gibt: ohne Daemon
+# kostet dieses Modul beim Start von hcwr damit fast nichts.
+import os
+import sys
+import struct
+
+# Umgebungsvariablen, bei denen hcwr immer im eigenen Prozess läuft (Debugging)
+DAEMON_BYPASS_ENV = ("HCWR_NO_DAEMON", "DBG_LEVEL", "DBG_BREAK_POINT", "DBG_PROCESS_ROUTE")
+
+# Wird im Kindprozess des Daemons gesetzt, damit bin/hcwr sich nicht selbst erneut anfragt
+DAEMON_CHILD = False
+
+def get_daemon_socket_path():
+    """Socket des Daemons: $HCWRD_SOCKET, sonst $XDG_RUNTIME_DIR/hcwrd.sock bzw. ~/.heco/hcwrd.sock."""
+    if os.environ.get("HCWRD_SOCKET"):
+        return os.environ["HCWRD_SOCKET"]
+    return os.path.join(os.environ.get("XDG_RUNTIME_DIR") or os.path.expanduser("~/.heco"), "hcwrd.sock")
+
+def recv_exact(sock, size):
+    """Liest genau 'size' Bytes, Rückgabe None bei vorzeitigem Verbindungsende."""
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+def send_request(sock, request, fds=()):
+    """Sendet Länge + JSON, die Dateideskriptoren hängen am Längenfeld."""
+    import json
+    import socket
+    payload = json.dumps(request).encode("utf-8")
+    header = struct.pack("!I", len(payload))
+    if fds:
+        socket.send_fds(sock, [header], list(fds))
+    else:
+        sock.sendall(header)
+    sock.sendall(payload)
+
+def recv_request(sock):
+    """Gegenstück zu send_request(), Rückgabe (request, fds)."""
+    import json
+    import socket
+    header, fds, flags, addr = socket.recv_fds(sock, 4, 3)
+    if len(header) < 4:
+        rest = recv_exact(sock, 4 - len(header))
+        if rest is None:
+            return None, fds
+        header += rest
+    payload = recv_exact(sock, struct.unpack("!I", header)[0])
+    if payload is None:
+        return None, fds
+    return json.loads(payload.decode("utf-8")), fds
+
+def connect_daemon(path=None):
+    """Verbindung zum laufenden Daemon oder None, wenn keiner lauscht."""
+    if path is None:
+        path = get_daemon_socket_path()
+    if not os.path.exists(path):
+        return None
+    import socket
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+def run_via_daemon(argv):
+    """
+    Führt den Aufruf im Daemon aus und beendet den Prozess mit dessen Exit-Code.
+    Rückgabe None, wenn kein Daemon erreichbar ist oder hcwr im eigenen Prozess laufen soll.
+    """
+    if DAEMON_CHILD:
+        return None
+    if any(os.environ.get(name) for name in DAEMON_BYPASS_ENV):
+        return None
+    if any(arg == "--daemon" or arg.startswith("--daemon=") for arg in argv[1:]):
+        return None
+
+    sock = connect_daemon()
+    if sock is None:
+        return None
+
+    request = {"cmd": "run", "argv": list(argv), "cwd": os.getcwd(), "env": dict(os.environ)}
+    try:
+        send_request(sock, request, (0, 1, 2))
+        data = recv_exact(sock, 4)
+    except OSError:
+        sock.close()
+        return None
+    if data is None:
+        # Daemon hat die Anfrage nicht angenommen, es ist noch nichts gelaufen
+        sock.close()
+        return None
+    child = struct.unpack("!i", data)[0]
+
+    # Auf den Exit-Code warten, Strg-C an den bearbeitenden Prozess weiterreichen
+    while True:
+        try:
+            data = recv_exact(sock, 4)
+            break
+        except KeyboardInterrupt:
+            import signal
+            try:
+                os.kill(child, signal.SIGINT)
+            except OSError:
+                pass
+    sock.close()
+    if data is None:
+        print("hcwr Daemon: Verbindung während der Ausführung abgebrochen", file=sys.stderr)
+        sys.exit(1)
+    sys.exit(struct.unpack("!i", data)[0])
@@ -17,44 +17,71 @@
 # -----------------------------------------------------------------------------------------
 import re
 import os
+import io
 import configparser
 import sys
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 from decimal import Decimal, InvalidOperation
 from decimal import Decimal, ROUND_HALF_UP
-import inspect
 
 # Import von eigenem Module
 from hcwr_globals_mod import HCWR_GLOBALS
 from hcwr_dbg_mod import debug, info, warning, get_function_name, show_process_route, debug_sql
-from hcwr_utils_mod import  input_with_prefill
+from hcwr_utils_mod import  input_with_prefill, get_week_filter, file_lock, write_file_if_changed
+from hcwr_snapshot_mod import get_week_snapshot
+from hcwr_settings_mod import read_config_file, get_settings, reset_settings
 
 def update_config_comments():
+    """
+    Schreibt die Example-Kommentare je Sektion in HCWR_GLOBALS.CFG_FILE.
 
+    Grundlage ist der aktuelle Dateiinhalt, gelesen unter der Sperre: Schlüssel, die ein
+    paralleler hcwr-Lauf inzwischen per update_config() geschrieben hat, bleiben erhalten.
+    Aus HCWR_GLOBALS.CFG kommen nur Sektionen und Schlüssel dazu, die in der Datei fehlen.
+    """
     fname = get_function_name()
-    # Neuen Dateiinhalt als Liste von Zeilen aufbauen
-    new_lines = []
-    added = False
-    for section, comments in HCWR_GLOBALS.CONFIG_EXAMPLES.items():
-        if not HCWR_GLOBALS.CFG.has_section(section):
-            HCWR_GLOBALS.CFG.add_section(section)
-            added = True
-
-        # Kommentarblock schreiben
-        new_lines.append(f"[{section}]\n")
-        for line in comments:
-            new_lines.append(f"{line}\n")
-
-        # Key-Value-Paare, wenn vorhanden
-        for key, value in HCWR_GLOBALS.CFG.items(section):
-            new_lines.append(f"{key} = {value}\n")
-
-        new_lines.append("\n")  # Leerzeile zwischen Sektionen
 
-    # Datei überschreiben
-    with open(HCWR_GLOBALS.CFG_FILE,"w") as f:
-        f.writelines(new_lines)
+    with file_lock(HCWR_GLOBALS.CFG_FILE):
+        current = configparser.ConfigParser()
+        current.optionxform = str
+        current.read(HCWR_GLOBALS.CFG_FILE)
+
+        added = False
+        for section in HCWR_GLOBALS.CFG.sections():
+            if not current.has_section(section):
+                current.add_section(section)
+            for key, value in HCWR_GLOBALS.CFG.items(section, raw=True):
+                if not current.has_option(section, key):
+                    current.set(section, key, value)
+        for section in HCWR_GLOBALS.CONFIG_EXAMPLES:
+            if not current.has_section(section):
+                current.add_section(section)
+                added = True
+
+        # Neuen Dateiinhalt als Liste von Zeilen aufbauen, Sektionen ohne Kommentare ans Ende
+        sections = list(HCWR_GLOBALS.CONFIG_EXAMPLES)
+        sections += [section for section in current.sections() if section not in HCWR_GLOBALS.CONFIG_EXAMPLES]
+        new_lines = []
+        for section in sections:
+            # Kommentarblock schreiben
+            new_lines.append(f"[{section}]\n")
+            for line in HCWR_GLOBALS.CONFIG_EXAMPLES.get(section, []):
+                new_lines.append(f"{line}\n")
+
+            # Key-Value-Paare, wenn vorhanden
+            for key, value in current.items(section, raw=True):
+                new_lines.append(f"{key} = {value}\n")
+
+            new_lines.append("\n")  # Leerzeile zwischen Sektionen
+
+        # Datei nur ersetzen, wenn sich etwas geändert hat (läuft am Ende jedes Berichts)
+        written = write_file_if_changed(HCWR_GLOBALS.CFG_FILE, "".join(new_lines))
+
+    if written:
+        # Beim nächsten read_config_file() neu lesen
+        HCWR_GLOBALS.CFG_READ_STAMP = None
+        reset_settings()
 
     if added:
         info(f"Example-Kommentare in {HCWR_GLOBALS.CFG_FILE} aktualisiert!")
@@ -115,7 +142,7 @@ def get_or_create_projects_id_map():
     fname = get_function_name()
 
     if os.path.exists(HCWR_GLOBALS.CFG_FILE):
-        HCWR_GLOBALS.CFG.read(HCWR_GLOBALS.CFG_FILE)
+        read_config_file()
     else:
         HCWR_GLOBALS.CFG['ProjectIDs'] = {}
 
@@ -176,7 +203,7 @@ def get_or_create_wdayhours_map():
     fname = get_function_name()
 
     if os.path.exists(HCWR_GLOBALS.CFG_FILE):
-        HCWR_GLOBALS.CFG.read(HCWR_GLOBALS.CFG_FILE)
+        read_config_file()
     else:
         HCWR_GLOBALS.CFG['Workdays'] = {}
 
@@ -268,16 +295,15 @@ def get_config(call_from=None):
     fname = get_function_name()
 
     if int(HCWR_GLOBALS.DBG_LEVEL)<=0:
-        stack = inspect.stack()
-        caller = stack[1]  # Der direkte Aufrufer
-        debug(f"Aufgerufen von: Zeile {caller.lineno}")
+        caller = sys._getframe(1)  # Der direkte Aufrufer
+        debug(f"Aufgerufen von: Zeile {caller.f_lineno}")
         if int(HCWR_GLOBALS.DBG_LEVEL)==-1:
             debug(f"get_config was called from: {call_from}")
     if not os.path.exists(HCWR_GLOBALS.CFG_FILE):
         set_weekhours()
         set_first_workday()
 
-    HCWR_GLOBALS.CFG.read(HCWR_GLOBALS.CFG_FILE)
+    read_config_file()
 
     if 'Onboarding' not in HCWR_GLOBALS.CFG or 'firstday' not in HCWR_GLOBALS.CFG['Onboarding']:
         info("Es fehlt noch Eintrag zum 1. Arbeitstag bzw. 1. Tag der Nutzung", '')
@@ -292,7 +318,7 @@ def get_config(call_from=None):
         set_heco_db_path()
 
     # Nach den möglichen Änderungen nochmal lesen
-    HCWR_GLOBALS.CFG.read(HCWR_GLOBALS.CFG_FILE)
+    read_config_file()
 
     # Konstanten einlesen, wenn vorhanden:
     # Konstante Pfade:
@@ -301,6 +327,18 @@ def get_config(call_from=None):
             HCWR_GLOBALS.DB_KEYWORD_ID_PATH = os.path.expanduser(HCWR_GLOBALS.CFG['Database']['db_keyword_id_path'])
             if int(HCWR_GLOBALS.DBG_LEVEL)==-1:
                 debug(f"db_keyword_id_path = {HCWR_GLOBALS.DB_KEYWORD_ID_PATH}")
+        if "db_ledger_path" in HCWR_GLOBALS.CFG['Database']:
+            HCWR_GLOBALS.DB_LEDGER_PATH = os.path.expanduser(HCWR_GLOBALS.CFG['Database']['db_ledger_path'])
+            if int(HCWR_GLOBALS.DBG_LEVEL)==-1:
+                debug(f"db_ledger_path = {HCWR_GLOBALS.DB_LEDGER_PATH}")
+        if "db_fts_path" in HCWR_GLOBALS.CFG['Database']:
+            HCWR_GLOBALS.DB_FTS_PATH = os.path.expanduser(HCWR_GLOBALS.CFG['Database']['db_fts_path'])
+            if int(HCWR_GLOBALS.DBG_LEVEL)==-1:
+                debug(f"db_fts_path = {HCWR_GLOBALS.DB_FTS_PATH}")
+        if "holiday_cache_path" in HCWR_GLOBALS.CFG['General']:
+            HCWR_GLOBALS.HOLIDAY_CACHE_PATH = os.path.expanduser(HCWR_GLOBALS.CFG['General']['holiday_cache_path'])
+            if int(HCWR_GLOBALS.DBG_LEVEL)==-1:
+                debug(f"holiday_cache_path = {HCWR_GLOBALS.HOLIDAY_CACHE_PATH}")
         if "kw_report_base_dir" in HCWR_GLOBALS.CFG['General']:
             HCWR_GLOBALS.KW_REPORT_BASE_DIR = os.path.expanduser(HCWR_GLOBALS.CFG['General']['kw_report_base_dir'])
             if int(HCWR_GLOBALS.DBG_LEVEL)==-1:
@@ -331,6 +369,9 @@ def get_config(call_from=None):
 
     weekhours = int(HCWR_GLOBALS.CFG['General']['weekhours'])
     HCWR_GLOBALS.args.database = os.path.expanduser(HCWR_GLOBALS.CFG['Database']['dbpath'])
+    # hcwr --batch: 'database' aus users.toml hat Vorrang vor dbpath -> ../modules/hcwr_batch_mod.py
+    if HCWR_GLOBALS.BATCH_USER is not None and HCWR_GLOBALS.BATCH_USER.get("database"):
+        HCWR_GLOBALS.args.database = HCWR_GLOBALS.BATCH_USER["database"]
     firstday = HCWR_GLOBALS.CFG['Onboarding']['firstday']
     if int(HCWR_GLOBALS.DBG_LEVEL)==-1:
         debug (f"firstday = {firstday}")
@@ -401,7 +442,7 @@ def configure_interactive():
     fname = get_function_name()
     info("Interaktive Konfigurationsbearbeitung:\n", "(Enter-Taste, um Wert zu behalten)\n")
     get_config("configure_interactive")
-    HCWR_GLOBALS.CFG.read(HCWR_GLOBALS.CFG_FILE)
+    read_config_file()
 
     for section in HCWR_GLOBALS.CFG:
         set_val = True
@@ -454,7 +495,7 @@ def set_first_workday():
     """
     fname = get_function_name()
     if os.path.exists(HCWR_GLOBALS.CFG_FILE):
-        HCWR_GLOBALS.CFG.read(HCWR_GLOBALS.CFG_FILE)
+        read_config_file()
 
     # Benutzer nach den ersten Arbeitstag fragen
     firstday = input("Bitte ihre 1. Arbeitstag bzw. 1. Tag der Nutzung eingeben (Format = YYYY-MM-DD): ")
@@ -472,42 +513,55 @@ def set_first_workday():
         show_process_route()
         sys.exit(0)
 
-def update_config(new_config):
+def update_config(new_config, removed=()):
     """
     Vergleicht übergebenes ConfigParser-Objekt (new_config) mit der Datei
     und schreibt die Datei neu, wenn Änderungen vorhanden sind.
+    removed: [(Sektion, Schlüssel)], die aus der Datei entfernt werden (z. B. umbenannte Schlüssel)
     """
     fname = get_function_name()
     # Originale Konfiguration aus Datei einlesen
     old_config = configparser.ConfigParser()
     old_config.optionxform = str
 
-    if not os.path.exists(HCWR_GLOBALS.CFG_FILE):
-        warning(f"Config file not found! Creating now: ", HCWR_GLOBALS.CFG_FILE, "Info")
-        with open(HCWR_GLOBALS.CFG_FILE, 'w') as configfile:
-            old_config.write(configfile)
-    old_config.read(HCWR_GLOBALS.CFG_FILE)
-
-    changed = False  # Flag, ob Änderungen erkannt wurden
-
-    # Alle Sektionen und Keys aus dem neuen Config-Objekt prüfen
-    for section in new_config.sections():
-        if section not in old_config:
-            old_config[section] = {}
+    # Lesen, Vergleichen und Schreiben unter einer Sperre, damit parallele hcwr-Läufe
+    # keine Änderungen des anderen verlieren
+    with file_lock(HCWR_GLOBALS.CFG_FILE):
+        changed = False  # Flag, ob Änderungen erkannt wurden
+        if not os.path.exists(HCWR_GLOBALS.CFG_FILE):
+            warning(f"Config file not found! Creating now: ", HCWR_GLOBALS.CFG_FILE, "Info")
             changed = True
+        old_config.read(HCWR_GLOBALS.CFG_FILE)
+
+        # Alle Sektionen und Keys aus dem neuen Config-Objekt prüfen
+        for section in new_config.sections():
+            if section not in old_config:
+                old_config[section] = {}
+                changed = True
 
-        for key, value in new_config[section].items():
-            if (
-                section not in old_config or
-                key not in old_config[section] or
-                old_config[section][key] != value
-            ):
-                old_config[section][key] = value
+            for key, value in new_config[section].items():
+                if (
+                    section not in old_config or
+                    key not in old_config[section] or
+                    old_config[section][key] != value
+                ):
+                    old_config[section][key] = value
+                    changed = True
+
+        for section, key in removed:
+            if old_config.has_option(section, key):
+                old_config.remove_option(section, key)
                 changed = True
 
+        if changed:
+            content = io.StringIO()
+            old_config.write(content)
+            write_file_if_changed(HCWR_GLOBALS.CFG_FILE, content.getvalue())
+
     if changed:
-        with open(HCWR_GLOBALS.CFG_FILE, 'w') as f:
-            old_config.write(f)
+        # Beim nächsten read_config_file() neu lesen, Settings neu bauen
+        HCWR_GLOBALS.CFG_READ_STAMP = None
+        reset_settings()
         info(f"Konfiguration aktualisiert und gespeichert nach: ", HCWR_GLOBALS.CFG_FILE)
     else:
         info("Keine Änderungen an der Konfiguration vorgenommen.", "")
@@ -599,6 +653,52 @@ def parse_week_env(timestamp):
         show_process_route()
         sys.exit(0)
 
+def parse_week_span(value):
+    """
+    Parst einen KW-Bereich für --check-complete.
+    Akzeptiert Formate wie:
+        - 2025/1-2025/52
+        - 2025/1-52
+        - 2025/19
+        - 2025          (alle Wochen des Jahres)
+
+    Rückgabe:
+        ((year, kw), (year, kw)) - erste und letzte Woche
+    """
+    fname = get_function_name()
+
+    def parse_one(part, default_year=None):
+        if "/" in part:
+            year, week = (int(v) for v in part.split("/"))
+        elif default_year is not None and len(part) < 3:
+            year, week = default_year, int(part)
+        elif len(part) == 4:
+            year = int(part)
+            week = None
+        else:
+            raise ValueError(f"Ungültiges Format für KW-Bereich: {value}")
+        return year, week
+
+    parts = str(value).strip().split("-")
+    if len(parts) > 2:
+        raise ValueError(f"Ungültiges Format für KW-Bereich: {value}")
+
+    first = parse_one(parts[0])
+    last = parse_one(parts[1], first[0]) if len(parts) == 2 else first
+    # Nur Jahr angegeben -> KW 1 bis letzte KW des Jahres
+    if first[1] is None:
+        first = (first[0], 1)
+    if last[1] is None:
+        last = (last[0], date(last[0], 12, 28).isocalendar()[1])
+
+    # Prüft gleichzeitig, ob es die Wochen gibt
+    if date.fromisocalendar(*first, 1) > date.fromisocalendar(*last, 1):
+        raise ValueError(f"KW-Bereich ist rückwärts: {value}")
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nfirst = {first}, last = {last}")
+    return first, last
+
 def isoweek(date_string, year, week):
     """
     SQLite Funktion für die Timestamps in heco time.db
@@ -630,19 +730,16 @@ def get_week_hours(conn, year, week, first_week=None):
     """
     fname = get_function_name()
 
-    sql = HCWR_GLOBALS.DB_QUERIES.whours_sql + HCWR_GLOBALS.DB_QUERIES.wdayhours_sql_excl
-
     cursor = conn.cursor()
-    if HCWR_GLOBALS.CFG.has_option("Database", "dbms") and HCWR_GLOBALS.CFG.get("Database", "dbms") == "pg":
+    if get_settings().is_pg:
+        sql = HCWR_GLOBALS.DB_QUERIES.whours_sql + HCWR_GLOBALS.DB_QUERIES.wdayhours_sql_excl
         if first_week is None:
             cursor.execute(sql, [week, week])
         else:
             cursor.execute(sql, [first_week, week])
     else:
-        if first_week is None:
-            cursor.execute(sql, [year, week, year, week])
-        else:
-            cursor.execute(sql, [year, first_week, year, week])
+        sql, params = get_week_filter("whours_sql", year, week, first_week)
+        cursor.execute(sql + HCWR_GLOBALS.DB_QUERIES.wdayhours_sql_excl, params)
     row = cursor.fetchone()
     if not row:
         warning(f"No Data","found","ERROR")
@@ -670,16 +767,24 @@ def get_weekday_hours_per_day(conn, year, week):
     """
     fname = get_function_name()
 
-    sql = HCWR_GLOBALS.DB_QUERIES.wdayhours_sql + HCWR_GLOBALS.DB_QUERIES.wdayhours_sql_excl
-    #sql = HCWR_GLOBALS.DB_QUERIES.whours_sql + HCWR_GLOBALS.DB_QUERIES.wdayhours_sql_excl
-    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-        info(f"sql = {debug_sql(sql, [week, year, week, year])}")
+    snapshot = get_week_snapshot(year, week)
+    if snapshot is not None:
+        row = snapshot.get_weekday_seconds()
+        if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+            info(f"{fname}:\nWeekSnapshot row = {row}")
+        return row
 
     cursor = conn.cursor()
-    if HCWR_GLOBALS.CFG.has_option("Database", "dbms") and HCWR_GLOBALS.CFG.get("Database", "dbms") == "pg":
-        cursor.execute(sql, [week, year, week, year])
+    if get_settings().is_pg:
+        sql = HCWR_GLOBALS.DB_QUERIES.wdayhours_sql + HCWR_GLOBALS.DB_QUERIES.wdayhours_sql_excl
+        params = [week, year, week, year]
     else:
-        cursor.execute(sql, [year, week, year, week])
+        sql, params = get_week_filter("wdayhours_sql", year, week)
+        sql += HCWR_GLOBALS.DB_QUERIES.wdayhours_sql_excl
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"sql = {debug_sql(sql, params)}")
+
+    cursor.execute(sql, params)
     row = cursor.fetchone()
     if not row:
         warning(f"No Data","found","ERROR")
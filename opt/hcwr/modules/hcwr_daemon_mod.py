@@ -0,0 +1,261 @@
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           hcwr_daemon_mod.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+#
+# hcwr Daemon (opt-in): 'hcwr --daemon start' lädt Module, Contract-Keyword-Index,
+# Feiertage und Zeitkonto-Ledger einmal und lauscht auf einem Unix Socket.
+# hcwr/hcoh schicken argv, cwd, Umgebung und ihre stdin/stdout/stderr über
+# hcwr_client_mod.py an den Daemon. Für jeden Aufruf forkt der Daemon, das Kind führt
+# bin/hcwr mit den warmen Caches aus und schreibt direkt auf das Terminal des Aufrufers.
+import os
+import sys
+import errno
+import signal
+import socket
+import struct
+import runpy
+import traceback
+import configparser
+import colorama
+from datetime import date
+
+# Import von eigenem Module
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbg_mod import debug, info, warning, get_function_name
+from hcwr_dbms_mod import get_connection, close_connections
+from hcwr_keyword_mod import get_contract_keyword_index
+from hcwr_holiday_mod import get_holidays_of_year
+from hcwr_hcwrd_mod import get_kw_overhours
+from hcwr_profile_mod import finish_profile
+import hcwr_client_mod
+from hcwr_client_mod import get_daemon_socket_path, connect_daemon, send_request, recv_request, recv_exact
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Diese Werte bleiben nach dem Aufwärmen im Daemon stehen, alles andere wird zurückgesetzt
+# (HOLIDAY_SOURCE gehört zu HOLIDAY_CACHE, ohne ihn verwirft get_holiday_source() die Feiertage)
+DAEMON_WARM_STATE = ("DBG_LEVEL", "DECIMAL_POINT", "CONTRACT_KEYWORD_INDEX", "HOLIDAY_SOURCE", "DAEMON_MIGRATED")
+
+def daemon_control(action):
+    """--daemon status|stop: fragt den laufenden Daemon ab bzw. beendet ihn."""
+    sock = connect_daemon()
+    if sock is None:
+        info("hcwr Daemon:", f"läuft nicht ({get_daemon_socket_path()})")
+        return 1
+    send_request(sock, {"cmd": action})
+    data = recv_exact(sock, 4)
+    sock.close()
+    if data is None:
+        warning("hcwr Daemon:", "keine Antwort", "ERROR")
+        return 1
+    pid = struct.unpack("!i", data)[0]
+    if action == "stop":
+        info("hcwr Daemon beendet:", f"PID {pid}")
+    else:
+        info("hcwr Daemon läuft:", f"PID {pid}, Socket {get_daemon_socket_path()}")
+    return 0
+
+def warm_daemon_caches():
+    """
+    Lädt einmal im Daemon, was jeder Aufruf sonst neu aufbaut: Contract-Keyword-Index,
+    Feiertage für dieses und nächstes Jahr und den Zeitkonto-Ledger bis zur aktuellen KW.
+    Die Verbindungen werden danach geschlossen, sie dürfen nicht über fork() geteilt werden.
+    """
+    fname = get_function_name()
+
+    get_contract_keyword_index(HCWR_GLOBALS.DB_KEYWORD_ID_PATH, get_connection)
+
+    today = date.today()
+    for year in (today.year, today.year + 1):
+        get_holidays_of_year(year)
+
+    year, week = today.isocalendar()[:2]
+    try:
+        get_kw_overhours(get_connection(HCWR_GLOBALS.args.database), week, year)
+    except Exception as e:
+        warning("hcwr Daemon: Zeitkonto-Ledger konnte nicht vorberechnet werden:", e, "WARNUNG")
+
+    HCWR_GLOBALS.DAEMON_MIGRATED.add((HCWR_GLOBALS.CFG_FILE, HCWR_GLOBALS.args.database))
+    close_connections()
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nholidays = {sorted(HCWR_GLOBALS.HOLIDAY_CACHE)}\nmigrated = {HCWR_GLOBALS.DAEMON_MIGRATED}")
+
+def reset_daemon_state():
+    """
+    Setzt HCWR_GLOBALS auf die Modul-Defaults zurück und behält nur die warmen Caches.
+    Jeder Aufruf liest dann Config und Argumente wie ein frisch gestartetes hcwr.
+    """
+    state = vars(HCWR_GLOBALS)
+    keep = {name: state[name] for name in DAEMON_WARM_STATE if name in state}
+    state.clear()
+    state.update(keep)
+    HCWR_GLOBALS.CFG = configparser.ConfigParser()
+    HCWR_GLOBALS.CFG.optionxform = str
+    HCWR_GLOBALS.DB_CONNECTIONS = {}
+
+def run_script(script_path):
+    """Führt bin/hcwr im Kindprozess aus und liefert den Exit-Code."""
+    # bin/hcwr importiert seine Module nur, solange MODULE_DIR nicht in sys.path steht.
+    # Die Module liegen bereits in sys.modules, der Import kostet also nichts.
+    while MODULE_DIR in sys.path:
+        sys.path.remove(MODULE_DIR)
+    try:
+        runpy.run_path(script_path, run_name="__main__")
+        return 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        traceback.print_exc()
+        return 130
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+def handle_request(listener, conn, request, fds, script_path):
+    """Forkt für einen Aufruf, das Kind übernimmt stdin/stdout/stderr des Clients."""
+    pid = os.fork()
+    if pid:
+        for fd in fds:
+            os.close(fd)
+        conn.close()
+        return
+
+    code = 1
+    try:
+        listener.close()
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        sys.stdin = open(0, "r", closefd=False)
+        sys.stdout = open(1, "w", buffering=1 if os.isatty(1) else -1, closefd=False)
+        sys.stderr = open(2, "w", buffering=1, closefd=False)
+        # colorama entscheidet je Stream, ob Farben ausgegeben oder entfernt werden (wie in hcwr_dbg_mod)
+        colorama.init(autoreset=True)
+
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = list(request["argv"])
+
+        hcwr_client_mod.DAEMON_CHILD = True
+        HCWR_GLOBALS.PROC_NAME = os.path.basename(sys.argv[0])
+        HCWR_GLOBALS.GROUP = os.environ.get('GROUP')
+        HCWR_GLOBALS.DATABASE = os.environ.get('DATABASE')
+
+        conn.sendall(struct.pack("!i", os.getpid()))
+        code = run_script(script_path)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            # Das Kind endet mit os._exit(), atexit läuft hier nicht
+            finish_profile()
+            close_connections()
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except BaseException:
+            pass
+        try:
+            conn.sendall(struct.pack("!i", code))
+        except OSError:
+            pass
+        os._exit(code & 0xFF)
+
+def serve_daemon(script_path):
+    """
+    --daemon start: wärmt die Caches auf und bearbeitet Aufrufe bis 'hcwr --daemon stop'
+    oder SIGTERM. Läuft im Vordergrund, z. B. 'hcwr --daemon start &' oder als systemd --user Dienst.
+    """
+    fname = get_function_name()
+    path = get_daemon_socket_path()
+
+    sock = connect_daemon(path)
+    if sock is not None:
+        sock.close()
+        warning("hcwr Daemon läuft bereits:", path, "ERROR")
+        return 1
+    if os.path.exists(path):
+        os.unlink(path)
+
+    warm_daemon_caches()
+    reset_daemon_state()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(old_umask)
+    listener.listen(16)
+
+    # Kindprozesse nicht einsammeln müssen, SIGTERM beendet wie 'stop'
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    info("hcwr Daemon lauscht auf:", f"{path} (PID {os.getpid()})")
+
+    try:
+        while True:
+            try:
+                conn, addr = listener.accept()
+            except InterruptedError:
+                continue
+            try:
+                request, fds = recv_request(conn)
+            except (OSError, ValueError) as e:
+                warning("hcwr Daemon: ungültige Anfrage:", e)
+                conn.close()
+                continue
+            if request is None:
+                for fd in fds:
+                    os.close(fd)
+                conn.close()
+                continue
+
+            if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+                info(f"{fname}:\nrequest = {request.get('cmd')} {request.get('argv')}")
+
+            if request.get("cmd") == "run" and len(fds) == 3:
+                handle_request(listener, conn, request, fds, script_path)
+                continue
+
+            for fd in fds:
+                os.close(fd)
+            try:
+                conn.sendall(struct.pack("!i", os.getpid()))
+            except OSError as e:
+                if e.errno != errno.EPIPE:
+                    raise
+            conn.close()
+            if request.get("cmd") == "stop":
+                break
+    finally:
+        listener.close()
+        if os.path.exists(path):
+            os.unlink(path)
+    debug("hcwr Daemon beendet")
+    return 0
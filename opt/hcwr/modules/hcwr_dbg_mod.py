@@ -16,7 +16,6 @@
 # Header added by https://github.com/GhostCoder74/Set-Project-Headers                         
 # -----------------------------------------------------------------------------------------
 import sys
-import inspect
 import colorama
 from colorama import Fore, Style
 from os.path import basename
@@ -37,11 +36,10 @@ def debug(msg):
         Die globale Variable DBG_LEVEL muss definiert und in eine Ganzzahl konvertierbar sein.
     """
     if int(HCWR_GLOBALS.DBG_LEVEL) != 0:
-        stack = inspect.stack()
-        caller = stack[1]  # Der direkte Aufrufer
+        caller = sys._getframe(1)  # Der direkte Aufrufer
         if HCWR_GLOBALS.PBAR_VAL > 1 and HCWR_GLOBALS.PBAR_VAL != HCWR_GLOBALS.PBAR_MAX:
             sys.stderr.write("\r" + " "*80 + "\r")
-        print(f"Aufgerufen von: Zeile {caller.lineno}, Funktion {caller.function}")
+        print(f"Aufgerufen von: Zeile {caller.f_lineno}, Funktion {caller.f_code.co_name}")
         print(Fore.YELLOW + Style.BRIGHT + f"DEBUG: {msg}" + Style.RESET_ALL, file=sys.stderr)
 
 def info(msg_a, msg_b="", type="Info"):
@@ -87,25 +85,32 @@ colorama.init(autoreset=True)
 # Definition of colors
 
 def whereami():
-    frame = inspect.currentframe().f_back
+    frame = sys._getframe(1)
     file = basename(frame.f_code.co_filename)
     fn = frame.f_code.co_name
     ln = frame.f_lineno
     return {'file': file,'line': ln, 'fname': fn}
 
 def get_function_name():
-    stack = inspect.stack()
-    caller = stack[1]  # Der direkte Aufrufer
+    """
+    Liefert den Namen der aufrufenden Funktion (bzw. den Dateinamen bei <module>).
 
-    ffile = basename(caller.filename)
-    fline = caller.lineno
-    fname = caller.function
+    Ohne DBG_BREAK_POINT und DBG_PROCESS_ROUTE wird nur sys._getframe(1) gelesen,
+    statt mit inspect.stack() für jeden Frame Quelltextzeilen von der Platte zu lesen.
+    Prozessroute und Call-Tree werden nur bei aktivem Debugging aufgezeichnet.
+    """
+    caller = sys._getframe(1)  # Der direkte Aufrufer
+    code = caller.f_code
+    fname = code.co_name
 
     # Falls aus <module> aufgerufen → Dateiname statt "<module>"
-    display_name = ffile if fname == "<module>" else fname
+    display_name = basename(code.co_filename) if fname == "<module>" else fname
 
-    # aktuelle Tiefe
-    depth = max(len(stack) - 2, 0)
+    if not HCWR_GLOBALS.DBG_BREAK_POINT and not HCWR_GLOBALS.DBG_PROCESS_ROUTE:
+        return display_name
+
+    ffile = basename(code.co_filename)
+    fline = caller.f_lineno
 
     # Breakpoint
     fn = HCWR_GLOBALS.DBG_BREAK_POINT
@@ -122,6 +127,13 @@ def get_function_name():
             HCWR_GLOBALS.DBG_CALL_COUNT.get(entry, 0) + 1
         )
 
+        # aktuelle Tiefe (entspricht len(inspect.stack()) - 2)
+        depth = 0
+        frame = caller.f_back
+        while frame is not None:
+            depth += 1
+            frame = frame.f_back
+
         # für Call-Tree
         HCWR_GLOBALS.DBG_CALL_TREE.append((depth, entry))
 
@@ -16,6 +16,7 @@
 # Header added by https://github.com/GhostCoder74/Set-Project-Headers
 # -----------------------------------------------------------------------------------------
 import importlib
+import atexit
 import shutil
 import subprocess
 import re
@@ -31,8 +32,67 @@ from colorama import Fore, Style
 # Import von eigenem Module
 from hcwr_globals_mod import HCWR_GLOBALS
 from hcwr_dbg_mod import debug, info, warning, get_function_name, show_process_route, debug_sql
-from hcwr_utils_mod import input_with_prefill
+from hcwr_utils_mod import input_with_prefill, get_week_filter
 from hcwr_config_mod import update_config_comments, update_config, get_config
+from hcwr_keyword_mod import get_contract_keyword_index, reset_contract_keyword_index
+from hcwr_snapshot_mod import get_week_snapshot
+from hcwr_settings_mod import read_config_file, get_settings
+from hcwr_sqlstats_mod import instrument_connection
+
+# Verbindungsverwaltung: eine Verbindung je Datenbank und Lauf, wird beim ersten Zugriff
+# geöffnet, danach wiederverwendet und beim Beenden geschlossen.
+def get_connection(target=None, dbms=None):
+    """
+    Liefert die gemeinsame Verbindung zu 'target' und öffnet sie beim ersten Aufruf.
+
+    Parameter:
+        target: Pfad der SQLite-Datenbank oder PostgreSQL DSN (Default: HCWR_GLOBALS.args.database)
+        dbms:   DB-API Modul (Default: HCWR_GLOBALS.DBMS)
+
+    Die Verbindung gehört der Verbindungsverwaltung, Aufrufer schließen sie nicht selbst.
+    """
+    fname = get_function_name()
+
+    if dbms is None:
+        dbms = HCWR_GLOBALS.DBMS
+    if target is None:
+        target = HCWR_GLOBALS.args.database
+    key = (dbms.__name__, str(target))
+
+    conn = HCWR_GLOBALS.DB_CONNECTIONS.get(key)
+    if conn is None:
+        # Jede Ausführung wird je Abfrage gezählt -> ../modules/hcwr_sqlstats_mod.py
+        conn = instrument_connection(dbms.connect(target), str(target))
+        if not HCWR_GLOBALS.DB_CONNECTIONS:
+            atexit.register(close_connections)
+        HCWR_GLOBALS.DB_CONNECTIONS[key] = conn
+        if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+            info(f"{fname}:\nneue Verbindung: {key}")
+        debug(f"DB-Verbindung geöffnet: {key[0]} {key[1]}")
+    return conn
+
+def get_keyword_connection():
+    """Gemeinsame Verbindung zur Contract-Keyword-Datenbank (HCWR_GLOBALS.DB_KEYWORD_ID_PATH)."""
+    return get_connection(HCWR_GLOBALS.DB_KEYWORD_ID_PATH)
+
+def close_connection(target=None, dbms=None):
+    """Schließt die gemeinsame Verbindung zu 'target', z. B. bevor die Datei ersetzt wird."""
+    if dbms is None:
+        dbms = HCWR_GLOBALS.DBMS
+    if target is None:
+        target = HCWR_GLOBALS.args.database
+    conn = HCWR_GLOBALS.DB_CONNECTIONS.pop((dbms.__name__, str(target)), None)
+    if conn is not None:
+        conn.close()
+
+def close_connections():
+    """Schließt alle offenen Verbindungen (atexit). Nicht committete Änderungen werden verworfen."""
+    while HCWR_GLOBALS.DB_CONNECTIONS:
+        key, conn = HCWR_GLOBALS.DB_CONNECTIONS.popitem()
+        try:
+            conn.close()
+        except Exception as e:
+            warning(f"DB-Verbindung {key[1]} konnte nicht geschlossen werden:", e)
 
 def init_heco(kw=None):
     """
@@ -65,7 +125,7 @@ def init_heco(kw=None):
             show_process_route()
             sys.exit(1)
 #TODO: Postgress Support weiter ein-/ausbauen
-    if HCWR_GLOBALS.CFG.has_option("Database", "dbms") and HCWR_GLOBALS.CFG.get("Database", "dbms") == "pg":
+    if get_settings().is_pg:
         info("Derzeit wird nur SQLite unterstutzt für die Initalisierung von heco.")
         show_process_route()
         sys.exit(1)
@@ -108,7 +168,27 @@ def init_heco(kw=None):
         show_process_route()
         sys.exit(1)
 
-def is_current_week_and_complete(db_path, year, kw):
+def get_entry_counts_per_day(conn, first_day, stop_day):
+    """
+    Anzahl der Einträge je Tag im Zeitraum [first_day, stop_day) mit einer Abfrage.
+
+    Rückgabe:
+        dict {"YYYY-MM-DD": count}, Tage ohne Einträge fehlen
+    """
+    fname = get_function_name()
+
+    params = (first_day.strftime('%Y-%m-%d'), stop_day.strftime('%Y-%m-%d'))
+    cursor = conn.cursor()
+    cursor.execute(HCWR_GLOBALS.DB_QUERIES.week_complete, params)
+    # pg liefert date Objekte, SQLite Strings
+    counts = {str(day)[:10]: count for day, count in cursor.fetchall()}
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nsql = {debug_sql(HCWR_GLOBALS.DB_QUERIES.week_complete, params)}")
+        info(f"counts = {counts}")
+    return counts
+
+def is_current_week_and_complete(conn, year, kw):
     """
     Prüf Funktion, die überprüft, ob die definierten Arbeitstage auch schon Arbeitszeiteneinträge haben.
     Und setzt den Trigger ob es eine Tagesabweichung gibt, von der eingetsellten normal Arbeitsstunden.
@@ -121,47 +201,28 @@ def is_current_week_and_complete(db_path, year, kw):
 
     is_current = (year == current_year and kw == current_kw)
 
-    # Wochenbeginn (Montag) und Ende (Sonntag) berechnen
-    def get_week_bounds(year, kw):
-        fname = get_function_name()
-        # ISO-Woche: Montag als erster Tag
-        monday = datetime.strptime(f'{year}-W{kw:02}-1', "%G-W%V-%u")
-        return monday
-
-    HCWR_GLOBALS.MONDAY = get_week_bounds(year, kw)
-
-    # Verbindung zur SQLite-Datenbank herstellen
-    conn = HCWR_GLOBALS.DBMS.connect(db_path)
-    cursor = conn.cursor()
+    # ISO-Woche: Montag als erster Tag
+    HCWR_GLOBALS.MONDAY = datetime.strptime(f'{year}-W{kw:02}-1', "%G-W%V-%u")
 
-    # Wochentage Mo–So
+    # Wochentage Mo–So, Einträge je Tag mit einer Abfrage
     weekdays = HCWR_GLOBALS.WEEKDAYS
+    counts = get_entry_counts_per_day(conn, HCWR_GLOBALS.MONDAY, HCWR_GLOBALS.MONDAY + timedelta(days=7))
     missing_days = []
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         info(f"weekdays = {weekdays}")
 
     #TODO DONE: Auch Sa. & So. fähig machen
     for day_index in range(len(weekdays)):  # Mo.–So.
-        day = HCWR_GLOBALS.MONDAY + timedelta(days=day_index)
-        day_str = day.strftime('%Y-%m-%d')
-        next_day_str = (day + timedelta(days=1)).strftime('%Y-%m-%d')
-
-        cursor.execute(
-            HCWR_GLOBALS.DB_QUERIES.week_complete,
-            (day_str, next_day_str)
-        )
-        count = cursor.fetchone()[0]
+        day_str = (HCWR_GLOBALS.MONDAY + timedelta(days=day_index)).strftime('%Y-%m-%d')
+        count = counts.get(day_str, 0)
         hours = HCWR_GLOBALS.WDAYHOURS_MAP.get(weekdays[day_index], 0)
         if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-            info (f"HCWR_GLOBALS.DB_QUERIES.week_complete = {debug_sql(HCWR_GLOBALS.DB_QUERIES.week_complete,  [day_str, next_day_str])}")
-            info(f"count = {count}, hours = {hours}")
+            info(f"day_str = {day_str}, count = {count}, hours = {hours}")
         if float(hours) == 0:
             count = 1
         if count == 0:
             missing_days.append(weekdays[day_index])
 
-    conn.close()
-
     all_days_complete = (len(missing_days) == 0)
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         info(f"{fname}:\nis_current = {is_current}, all_days_complete = {all_days_complete}, missing_days = {missing_days}")
@@ -170,6 +231,72 @@ def is_current_week_and_complete(db_path, year, kw):
 
     return is_current, all_days_complete, missing_days
 
+def check_weeks_complete(conn, first, last):
+    """
+    Prüft für alle ISO-Wochen von 'first' bis 'last' ((year, kw) Tupel), an welchen
+    Arbeitstagen keine Einträge existieren. Eine Abfrage für den gesamten Zeitraum.
+
+    Arbeitstage sind Tage mit Stunden > 0 in [Workdays]; Tage vor [Onboarding] firstday
+    und Tage in der Zukunft werden nicht geprüft.
+
+    Rückgabe:
+        dict {(year, kw): ["Mo", ...]} - nur Wochen mit fehlenden Tagen
+    """
+    fname = get_function_name()
+
+    first_day = date.fromisocalendar(first[0], first[1], 1)
+    stop_day = date.fromisocalendar(last[0], last[1], 1) + timedelta(days=7)
+    counts = get_entry_counts_per_day(conn, first_day, stop_day)
+
+    settings = get_settings()
+    weekdays = HCWR_GLOBALS.WEEKDAYS
+    hours = {}
+    for wday in weekdays:
+        if wday in settings.workday_hours:
+            hours[wday] = float(settings.workday_hours[wday])
+        else:
+            hours[wday] = float(HCWR_GLOBALS.WDAYHOURS_MAP.get(wday, 0))
+
+    begin = first_day
+    if settings.firstday is not None:
+        begin = max(begin, datetime.strptime(settings.firstday, "%Y-%m-%d").date())
+    end = min(stop_day, date.today() + timedelta(days=1))
+
+    missing = {}
+    day = begin
+    while day < end:
+        wday = weekdays[day.weekday()]
+        if hours[wday] > 0 and counts.get(day.strftime('%Y-%m-%d'), 0) == 0:
+            missing.setdefault(tuple(day.isocalendar()[:2]), []).append(wday)
+        day += timedelta(days=1)
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nfirst_day = {first_day}, stop_day = {stop_day}\nmissing = {missing}")
+        show_process_route()
+        sys.exit(0)
+
+    return missing
+
+def show_weeks_complete(conn, span):
+    """
+    Ausgabe für --check-complete: listet je KW die Arbeitstage ohne Einträge.
+    Exit-Status 1, wenn Tage fehlen, damit ein nächtlicher Check darauf reagieren kann.
+    """
+    fname = get_function_name()
+
+    first, last = span
+    missing = check_weeks_complete(conn, first, last)
+    for (year, kw), days in sorted(missing.items()):
+        monday = date.fromisocalendar(year, kw, 1)
+        print(f"KW {year}/{kw:02d} ({monday.strftime('%d.%m.%Y')}): " + Fore.RED + ", ".join(days) + Style.RESET_ALL)
+
+    label = f"{first[0]}/{first[1]:02d} - {last[0]}/{last[1]:02d}"
+    if missing:
+        warning(f"KW {label}: {sum(len(d) for d in missing.values())} Arbeitstage in {len(missing)} Wochen ohne Einträge", "", "Unvollständig")
+        sys.exit(1)
+    info(f"KW {label}: alle Arbeitstage haben Einträge", "")
+    sys.exit(0)
+
 # Prüft welche "Kürzel" verwentet werden, entsprechend der Vorlage aus:
 # /home/projects/Intern/hecokwreport.hg/template:
 #   heco.projects.sql
@@ -178,7 +305,7 @@ def is_current_week_and_complete(db_path, year, kw):
 def get_db_key_structure():
     fname = get_function_name()
 
-    conn = HCWR_GLOBALS.DBMS.connect(HCWR_GLOBALS.args.database)
+    conn = get_connection()
     cursor = conn.cursor()
 
     cursor.execute(HCWR_GLOBALS.DB_QUERIES.check_db_key_structure)
@@ -246,12 +373,13 @@ def auto_migration():
         debug(f"auto_migration: success = {success}")
         debug(f"auto_migration: Checking for entries if [ProjectIDs] in default {HCWR_GLOBALS.CFG_FILE}")
     if os.path.exists(HCWR_GLOBALS.CFG_FILE):
-        HCWR_GLOBALS.CFG.read(HCWR_GLOBALS.CFG_FILE)
+        read_config_file()
 
         if HCWR_GLOBALS.CFG.has_section("ProjectIDs"):
             if int(HCWR_GLOBALS.DBG_LEVEL)==-1:
                 debug(f"auto_migration: Checking ProjectIDs in {HCWR_GLOBALS.CFG_FILE}")
             changes_made = False
+            removed = []
             mapping = {
                 "Sachbearbeitung abrechenbar": "Sacharbeit abrechenbar",
                 "Sachbearbeitung andere*": "Sacharbeit andere*"
@@ -270,6 +398,7 @@ def auto_migration():
                         info(f"new_key = {new_key}")
                     HCWR_GLOBALS.CFG.remove_option("ProjectIDs", old_key)
                     HCWR_GLOBALS.CFG.set("ProjectIDs", new_key, value)
+                    removed.append(("ProjectIDs", old_key))
                     changes_made = True
 
             if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
@@ -277,7 +406,7 @@ def auto_migration():
 
             if changes_made:
                 success = False
-                update_config(HCWR_GLOBALS.CFG)
+                update_config(HCWR_GLOBALS.CFG, removed)
                 info("Config-Einträge in [ProjectIDs] erfolgreich aktualisiert.")
                 get_config("auto_migration")
                 success = True
@@ -287,13 +416,13 @@ def auto_migration():
     if int(HCWR_GLOBALS.DBG_LEVEL)==-1:
         debug(f"auto_migration: success = {success}")
         debug(f"auto_migration: Checking 'description for project id 322 and 323' heco database {dbpath}")
-    if HCWR_GLOBALS.CFG.has_option("Database", "dbms") and HCWR_GLOBALS.CFG.get("Database", "dbms") == "pg":
+    if get_settings().is_pg:
         HCWR_GLOBALS.DBMS = importlib.import_module('psycopg')
         HCWR_GLOBALS.DB_QUERIES = importlib.import_module('hcwr_pg_queries_sql')
     if os.path.exists(dbpath):
         try:
             success = False
-            conn = HCWR_GLOBALS.DBMS.connect(dbpath)
+            conn = get_connection(dbpath)
             cursor = conn.cursor()
             resA = get_project_id(cursor, "├─ Sachbearbeitung abrechenbar")
             resB = get_project_id(cursor, "└─ Sachbearbeitung andere*")
@@ -337,7 +466,6 @@ def auto_migration():
             sys.exit(1)
         finally:
             success = True
-            conn.close()
 
     # Schritt 4: Spalte "category" in Datenbank: HCWR_GLOBALS.DB_KEYWORD_ID_PATH umbenennen in "task"
     if int(HCWR_GLOBALS.DBG_LEVEL)==-1:
@@ -348,7 +476,7 @@ def auto_migration():
             success = False
             DBMS = importlib.import_module('sqlite3')
             DB_QUERIES = importlib.import_module('hcwr_sqlite_queries_sql')
-            conn = DBMS.connect(HCWR_GLOBALS.DB_KEYWORD_ID_PATH)
+            conn = get_connection(HCWR_GLOBALS.DB_KEYWORD_ID_PATH, DBMS)
             cursor = conn.cursor()
             # Prüfen ob Spalte 'category' existiert
             cursor.execute("PRAGMA table_info(contracts);")
@@ -364,7 +492,6 @@ def auto_migration():
             sys.exit(1)
         finally:
             success = True
-            conn.close()
     if int(HCWR_GLOBALS.DBG_LEVEL)==-1:
         debug(f"auto_migration: success = {success}")
 
@@ -405,7 +532,7 @@ def merge_results(result):
                 uuk_dur += u['duration']
 
         if desc not in merged:
-            if HCWR_GLOBALS.CFG.has_option("Database", "dbms") and HCWR_GLOBALS.CFG.get("Database", "dbms") == "pg":
+            if get_settings().is_pg:
                 merged[desc] = {'duration': 0, 'uuk': []}
             else:
                 merged[desc] = {'duration': 0, 'uuk': None}
@@ -487,8 +614,12 @@ def get_UK_and_UUK(conn, base_sql, category, params):
     #        f"WHERE p.id = {str(pid)} GROUP BY p.id, p.key, p.description, e.description"
     #        )
     cursor = conn.cursor()
-    cursor.execute(sql_query, pnew)
-    result_rows = cursor.fetchall()
+    snapshot = get_week_snapshot(HCWR_GLOBALS.args.year, HCWR_GLOBALS.args.week)
+    if snapshot is not None:
+        result_rows = snapshot.get_uuk_rows(pid)
+    else:
+        cursor.execute(sql_query, pnew)
+        result_rows = cursor.fetchall()
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         info(f"sql_query = {debug_sql(sql_query, pnew)}\nresult_rows for [{category.strip()}] = {result_rows}")
     uk_entry = []
@@ -515,10 +646,7 @@ def get_UK_and_UUK(conn, base_sql, category, params):
                 debug(f"get_UK_and_UUK [contract] -> contract: {contract}")
             if not m and entry != None:
                 #info(f"contract = {contract}, line = {line}")
-                if HCWR_GLOBALS.CFG.has_option("Database", "keyword_place"):
-                    keyword_place = HCWR_GLOBALS.CFG.get("Database", "keyword_place")
-                else:
-                    keyword_place = None
+                keyword_place = get_settings().keyword_place
                 if HCWR_GLOBALS.PROC_NAME in "hcoh":
                     answer = "n"
                 else:
@@ -537,8 +665,10 @@ def get_UK_and_UUK(conn, base_sql, category, params):
                         answer = input_with_prefill(prompt, "", "")
                         if answer in ("j", "ja", "y", "yes"):
                             sql_params = [entry_new, entry, HCWR_GLOBALS.MONDAY.strftime("%Y-%m-%d"), HCWR_GLOBALS.SUNDAY.strftime("%Y-%m-%d")]
-                            cursor.execute(HCWR_GLOBALS.DB_QUERIES.update_entry, sql_params)
+                            cursor.execute(HCWR_GLOBALS.DB_QUERIES.entry_update, sql_params)
                             conn.commit()
+                            if snapshot is not None:
+                                snapshot.rename_entry(entry, entry_new)
                         else:
                             print()
                             info("Keine Änderung vorgenommen für " +
@@ -598,7 +728,7 @@ def initialize_contracts_db():
 
     DBMS = importlib.import_module('sqlite3')
     DB_QUERIES = importlib.import_module('hcwr_sqlite_queries_sql')
-    conn = DBMS.connect(HCWR_GLOBALS.DB_KEYWORD_ID_PATH)
+    conn = get_connection(HCWR_GLOBALS.DB_KEYWORD_ID_PATH, DBMS)
     cursor = conn.cursor()
 
     # Tabelle erstellen (mit AUTOINCREMENT)
@@ -624,11 +754,10 @@ def initialize_contracts_db():
         ('projektor-service', '#4019', 'Projekt'),
     ]
 
-    for keyword, contract_id, task in contracts:
-        cursor.execute(DB_QUERIES.contract_insert, (keyword, contract_id, task, keyword, contract_id))
+    cursor.executemany(DB_QUERIES.contract_insert,
+                       [(keyword, contract_id, task, keyword, contract_id) for keyword, contract_id, task in contracts])
 
     conn.commit()
-    conn.close()
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         info(f"{fname}:\ncontracts = {contracts}")
         show_process_route()
@@ -660,30 +789,21 @@ def get_contract_id(entry, db_path=None):
         db_path = HCWR_GLOBALS.DB_KEYWORD_ID_PATH
 
     # Falls SQLite DB fehlt → erstellen
-    if (not HCWR_GLOBALS.CFG.has_option("Database", "dbms") or
-        HCWR_GLOBALS.CFG.get("Database", "dbms") == "sqlite") and not os.path.exists(db_path):
+    if get_settings().dbms in (None, "sqlite") and not os.path.exists(db_path):
         initialize_contracts_db()
 
-    conn = HCWR_GLOBALS.DBMS.connect(db_path)
-    cursor = conn.cursor()
-
-    try:
-        cursor.execute(HCWR_GLOBALS.DB_QUERIES.contract_select)
-        rows = cursor.fetchall()
-    finally:
-        conn.close()
+    # Keywords nur einmal pro Lauf laden -> ../modules/hcwr_keyword_mod.py
+    keyword_index = get_contract_keyword_index(db_path, get_connection)
 
     entry_lower = entry.lower()
 
     # keyword_place laden (original string, nicht zwangsläufig lower)
-    keyword_place = None
-    if HCWR_GLOBALS.CFG.has_option("Database", "keyword_place"):
-        keyword_place = HCWR_GLOBALS.CFG.get("Database", "keyword_place")
+    keyword_place = get_settings().keyword_place
 
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         info(f"{fname}:\nkeyword_place  = {keyword_place }")
         info(f"entry_lower = {entry_lower}")
-        info(f"rows = {rows}")
+        info(f"rows = {keyword_index.rows}")
 
     if int(HCWR_GLOBALS.DBG_LEVEL) == 1:
         debug(f"keyword_place = {keyword_place}")
@@ -722,22 +842,11 @@ def get_contract_id(entry, db_path=None):
             return True
 
     # Sammle Treffer (nur contract_id + keyword + task)
+    # Wortgrenzen-Match, case-insensitive, alle Keywords in einem Durchlauf über den Entry
     found = []
-    for keyword, contract_id, task in rows:
-        # Wortgrenzen-Match, case-insensitive
-        pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-        r = re.search(pattern, entry_lower)
+    for keyword, contract_id, task in keyword_index.find(entry_lower):
         if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-            info(f"pattern = {pattern}")
-            info(f"r = {r}")
-            info(f"r = {r}")
-            if r:
-                info(f"r.span = {r.span()}")
-                info(f"r.start = {r.start()}")
-                info(f"r.end = {r.end()}")
-
-        if not r:
-            continue
+            info(f"keyword = {keyword}")
 
         p = pos_match(keyword)
         if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
@@ -770,6 +879,12 @@ def get_contract_id(entry, db_path=None):
         if len(found) == 1:
             return found[0]
 
+        # hcwr --batch/--weeks ohne Terminal: input_with_prefill liefert dort nur "",
+        # die Auswahl unten käme nie zu Ende -> erster Treffer wie bei FALL B/C/D
+        if HCWR_GLOBALS.BATCH_USER is not None:
+            warning(f"  {entry}", " <- Mehrdeutiger Eintrag – erster Treffer: " + found[0]['keyword'])
+            return found[0]
+
         # mehrere -> Benutzer wählen lassen
         warning(f"  {entry}", " <- Mehrdeutiger Eintrag – mehrere Keywords gefunden")
         print("Folgende Keywords wurden gefunden:")
@@ -808,7 +923,7 @@ def show_contract_keywords():
         info("Noch keine Contract-Keyword-Datenbank vorhanden.","Initialisiere DB")
         initialize_contracts_db()
 
-    conn = HCWR_GLOBALS.DBMS.connect(HCWR_GLOBALS.DB_KEYWORD_ID_PATH)
+    conn = get_keyword_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT contract_id, keyword, task FROM contracts ORDER BY contract_id, keyword")
@@ -824,7 +939,6 @@ def show_contract_keywords():
         for contract_id, keyword, task in rows:
             print(f"{contract_id:<12} | {keyword:<30} | {task or '-':<20}")
 
-    conn.close()
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         info(f"{fname}:\nrows = {rows}")
         show_process_route()
@@ -845,7 +959,7 @@ def delete_contract_keyword():
         warning("Kein Keyword eingegeben.")
         return
 
-    conn = HCWR_GLOBALS.DBMS.connect(HCWR_GLOBALS.DB_KEYWORD_ID_PATH)
+    conn = get_keyword_connection()
     cursor = conn.cursor()
 
     # Prüfen ob das Keyword existiert
@@ -863,11 +977,11 @@ def delete_contract_keyword():
         if confirm == "j":
             cursor.execute(HCWR_GLOBALS.DB_QUERIES.contract_delete, (keyword,))
             conn.commit()
+            reset_contract_keyword_index()
             info(f"Keyword '{keyword}'"," wurde gelöscht.")
         else:
             info("Löschen abgebrochen.","")
 
-    conn.close()
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         info(f"{fname}:\nresult = {result}")
         show_process_route()
@@ -884,7 +998,7 @@ def set_contract_keywords(keywords):
         initialize_contracts_db()
 
     # DB und Tabelle sicherstellen
-    conn = HCWR_GLOBALS.DBMS.connect(HCWR_GLOBALS.DB_KEYWORD_ID_PATH)
+    conn = get_keyword_connection()
     cursor = conn.cursor()
     cursor.execute(HCWR_GLOBALS.DB_QUERIES.create_contracts_tbl)
     conn.commit()
@@ -918,7 +1032,7 @@ def set_contract_keywords(keywords):
         inserted += 1
 
     conn.commit()
-    conn.close()
+    reset_contract_keyword_index()
     info(f"{inserted} Keyword(s)"," gespeichert.")
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         show_process_route()
@@ -930,13 +1044,20 @@ def berechne_abwesenheiten(conn, year, week):
     """
     fname = get_function_name()
 
+    snapshot = get_week_snapshot(year, week)
+    if snapshot is not None:
+        result = snapshot.get_absences()
+        if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+            info(f"{fname}:\nWeekSnapshot result = {result}")
+        return result
+
     cursor = conn.cursor()
     result = {key: 0 for key in HCWR_GLOBALS.MAPPING}
-    sql = HCWR_GLOBALS.DB_QUERIES.absence
-    if HCWR_GLOBALS.CFG.has_option("Database", "dbms") and HCWR_GLOBALS.CFG.get("Database", "dbms") == "pg":
+    if get_settings().is_pg:
+        sql = HCWR_GLOBALS.DB_QUERIES.absence
         params = [week, week]
     else:
-        params = [year, week, year, week]
+        sql, params = get_week_filter("absence", year, week)
 
     cursor.execute(sql, params)
     rows = cursor.fetchall()
@@ -0,0 +1,185 @@
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           hcwr_fts_mod.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+#
+# FTS5 Volltextindex für -s/--search in -J/--job-entries (nur SQLite, [Database] fts_index = true):
+# entries.description und der Projektname stehen mit rowid = entries.id in ~/.heco/hcwr_fts.db.
+# Die Datei wird als Schema hcwr_fts an die time.db Verbindung gehängt. Vor jeder Suche wird
+# der Index nachgeführt: ist time.db seit dem letzten Lauf unverändert (mtime/Größe), passiert
+# nichts. Sonst werden neue Einträge über das Wasserzeichen max(entries.id) eingefügt; nur wenn
+# die Prüfsumme der bereits indizierten Einträge abweicht, werden die Zeilen mit entries verglichen
+# und geänderte und gelöschte Einträge im Index ersetzt.
+import os
+import re
+import zlib
+import sqlite3
+
+# Import von eigenem Module
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbg_mod import debug, info, warning, get_function_name
+from hcwr_settings_mod import get_settings
+
+FTS_SCHEMA = "hcwr_fts"
+
+# trigram Tokenizer mit Teilstring-Suche gibt es ab SQLite 3.34
+FTS_MIN_SQLITE = (3, 34, 0)
+
+def fts_enabled():
+    """
+    Index nur mit [Database] fts_index = true, SQLite ab 3.34 und gesetztem db_fts_path.
+    Bei -n/--dry-run wird nichts gespeichert, daher auch kein Index verwendet (wie beim Ledger).
+    """
+    if HCWR_GLOBALS.DBMS.__name__ != "sqlite3" or not get_settings().fts_index:
+        return False
+    if sqlite3.sqlite_version_info < FTS_MIN_SQLITE:
+        return False
+    if not HCWR_GLOBALS.DB_FTS_PATH or str(HCWR_GLOBALS.DB_FTS_PATH).lower() in ("none", "false", "off"):
+        return False
+    if HCWR_GLOBALS.args is not None and getattr(HCWR_GLOBALS.args, "dry_run", False):
+        return False
+    return True
+
+def get_db_stamp(db_path):
+    """Wasserzeichen von time.db: Pfad, mtime und Größe, bei WAL-Modus auch der -wal Datei."""
+    parts = [os.path.realpath(db_path)]
+    for path in (db_path, db_path + "-wal"):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        parts.append(f"{st.st_mtime_ns}:{st.st_size}")
+    return "|".join(parts)
+
+def attach_fts_index(conn, db_path=None):
+    """
+    Hängt den Index an die time.db Verbindung und führt ihn nach.
+
+    Rückgabe:
+        True, wenn build_sql_from_search() MATCH über hcwr_fts.entries_fts verwenden kann
+    """
+    fname = get_function_name()
+
+    if not fts_enabled():
+        return False
+    if db_path is None:
+        db_path = HCWR_GLOBALS.args.database
+
+    try:
+        attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+        if FTS_SCHEMA not in attached:
+            os.makedirs(os.path.dirname(os.path.abspath(HCWR_GLOBALS.DB_FTS_PATH)), exist_ok=True)
+            conn.execute(f"ATTACH DATABASE ? AS {FTS_SCHEMA}", (HCWR_GLOBALS.DB_FTS_PATH,))
+            conn.executescript(HCWR_GLOBALS.DB_QUERIES.fts_create_tbl)
+        sync_fts_index(conn, db_path)
+    except sqlite3.Error as e:
+        # Ohne Index sucht build_sql_from_search() wie bisher mit LIKE
+        warning("FTS5 Volltextindex nicht verfügbar:", e, "WARNUNG")
+        conn.rollback()
+        return False
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nDB_FTS_PATH = {HCWR_GLOBALS.DB_FTS_PATH}")
+    return True
+
+def text_crc(text, crc=0):
+    """
+    crc32 über einen mit char(31) verbundenen group_concat Text, mit abschließendem Trenner.
+    So lässt sich die Prüfsumme eines Bereichs mit der des nächsten fortsetzen.
+    """
+    if text is None:
+        return crc
+    return zlib.crc32((text + "\x1f").encode("utf-8"), crc)
+
+def entries_checksum(conn, first_id, last_id, previous="0:0:0"):
+    """
+    Prüfsumme "Anzahl:Summe:crc32" der Einträge mit id im Bereich (first_id, last_id],
+    fortgesetzt von 'previous' (Prüfsumme der Einträge bis first_id).
+    """
+    count, weighted, text = conn.execute(HCWR_GLOBALS.DB_QUERIES.fts_entries_checksum, (first_id, last_id)).fetchone()
+    prev_count, prev_weighted, prev_crc = (int(v) for v in previous.split(":"))
+    return f"{prev_count + count}:{prev_weighted + weighted}:{text_crc(text, prev_crc)}"
+
+def sync_fts_index(conn, db_path):
+    """
+    Bringt hcwr_fts.entries_fts auf den Stand von entries und projects.
+
+    In fts_meta stehen das Wasserzeichen max_id (höchste indizierte entries.id) und Prüfsummen über
+    die Einträge bis max_id und über projects. Sind beide unverändert, werden nur die neuen Einträge
+    oberhalb von max_id eingefügt, der übliche Fall wenn getan bucht. Sonst wird je Zeile über
+    rowid = entries.id verglichen: Einträge mit anderem Text oder Projektnamen und gelöschte Einträge
+    werden aus dem Index entfernt, fehlende eingefügt. Bei einer anderen time.db wird der Index
+    komplett neu aufgebaut.
+
+    Rückgabe:
+        None ohne Änderung, sonst Anzahl der eingefügten Einträge
+    """
+    fname = get_function_name()
+    queries = HCWR_GLOBALS.DB_QUERIES
+
+    meta = dict(conn.execute(queries.fts_meta_select).fetchall())
+    stamp = get_db_stamp(db_path)
+    if meta.get("stamp") == stamp:
+        return None
+
+    source = stamp.split("|")[0]
+    max_id = conn.execute(queries.fts_entries_max_id).fetchone()[0]
+    projects_crc = str(text_crc(conn.execute(queries.fts_projects_concat).fetchone()[0]))
+    indexed_id = int(meta.get("max_id") or 0)
+    stale = []
+    if meta.get("source") != source or "max_id" not in meta or max_id < indexed_id:
+        # Andere time.db, Index ohne Wasserzeichen oder Einträge oberhalb davon gelöscht
+        conn.execute(queries.fts_clear)
+        inserted = conn.execute(queries.fts_insert_range, (0, max_id)).rowcount
+        entries_crc = entries_checksum(conn, 0, max_id)
+    else:
+        entries_crc = entries_checksum(conn, 0, indexed_id)
+        if entries_crc != meta.get("entries_crc") or projects_crc != meta.get("projects_crc"):
+            # Geändert, verschoben, gelöscht oder Projekt umbenannt: Zeilen vergleichen
+            stale = [row[0] for row in conn.execute(queries.fts_stale_rowids)]
+            conn.executemany(queries.fts_delete_rowid, [(rowid,) for rowid in stale])
+            inserted = conn.execute(queries.fts_insert_missing, (indexed_id,)).rowcount
+        else:
+            inserted = 0
+        inserted += conn.execute(queries.fts_insert_range, (indexed_id, max_id)).rowcount
+        entries_crc = entries_checksum(conn, indexed_id, max_id, entries_crc)
+
+    for key, value in (("source", source), ("stamp", stamp), ("max_id", max_id),
+                       ("entries_crc", entries_crc), ("projects_crc", projects_crc)):
+        conn.execute(queries.fts_meta_upsert, (key, str(value)))
+    conn.commit()
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nmax_id = {indexed_id} -> {max_id}, stale = {stale}")
+    debug(f"FTS5 Volltextindex nachgeführt: {len(stale)} entfernt, {inserted} eingefügt")
+    return inserted
+
+def fts_match_expr(value, column="description"):
+    """
+    MATCH-Ausdruck für einen -s Suchwert auf 'column' (description oder project).
+
+    Mit '*' werden die festen Teile zwischen den Platzhaltern gesucht, ohne '*' der ganze Wert.
+    Der trigram Tokenizer findet nur Teile ab 3 Zeichen, ohne solche Teile wird None geliefert.
+    Der Ausdruck trifft eine Obermenge der LIKE/= Treffer, die Bedingung selbst bleibt daher stehen.
+    """
+    if "*" in value:
+        # % und _ sind in LIKE ebenfalls Platzhalter
+        parts = [p for p in re.split(r"[*%_]", value) if len(p) >= 3]
+    else:
+        parts = [value] if len(value) >= 3 else []
+    if not parts:
+        return None
+    return " AND ".join(f'{column} : "{p.replace(chr(34), chr(34) * 2)}"' for p in parts)
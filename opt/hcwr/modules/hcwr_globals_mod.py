@@ -25,8 +25,6 @@ import os
 import locale
 import configparser
 import importlib
-import importlib.abc
-import importlib.util
 import sys
 
 # Set locale for decimal formatting
@@ -84,15 +82,49 @@ class myGlobals:
 
     # Default Konstanter Pfad zur Config des Users
     CFG_FILE = os.path.expanduser("~/.heco/hcwr.conf")
+    # (Pfad, mtime) beim letzten CFG.read und daraus gebaute Settings, siehe ../modules/hcwr_settings_mod.py
+    CFG_READ_STAMP = None
+    SETTINGS = None
     OLD_CFG_PATH = os.path.expanduser("~/.config/hkwreport.conf")
 
     # Default DB Standardwerte
     DBMS = importlib.import_module('sqlite3')
     DB_QUERIES = importlib.import_module('hcwr_sqlite_queries_sql')
+    # Gemeinsame Verbindungen {(DBMS, Pfad/DSN): connection}, siehe get_connection in ../modules/hcwr_dbms_mod.py
+    DB_CONNECTIONS = {}
 
     # Default Intevation Konstanten:
     # werden durch lokale Config des User neu gesetzt falls diese in der Config stehen, siehe get_config
     DB_KEYWORD_ID_PATH = os.path.expanduser("~/.heco/keyword_id.db")
+    # Zeitkonto-Ledger, siehe ../modules/hcwr_ledger_mod.py
+    DB_LEDGER_PATH = os.path.expanduser("~/.heco/hcwr_ledger.db")
+    # FTS5 Volltextindex für -s Suchen (nur SQLite), siehe ../modules/hcwr_fts_mod.py
+    DB_FTS_PATH = os.path.expanduser("~/.heco/hcwr_fts.db")
+    # Contract-Keyword-Index, einmal pro Lauf geladen, siehe ../modules/hcwr_keyword_mod.py
+    CONTRACT_KEYWORD_INDEX = None
+    # Feiertagskalender (native oder geaCal), je Lauf {Jahr: {Datum: Name}} bzw. {Jahr: frozenset[date]},
+    # geaCal Ergebnisse auch auf Platte, siehe ../modules/hcwr_holiday_mod.py
+    HOLIDAY_CACHE_PATH = os.path.expanduser("~/.heco/hcwr_holidays.json")
+    HOLIDAY_CACHE = {}
+    HOLIDAY_DATES = {}
+    # (holiday_source, holiday_state), zu denen die Caches gehören
+    HOLIDAY_SOURCE = None
+    # WeekSnapshot der Berichtswoche, siehe ../modules/hcwr_snapshot_mod.py
+    WEEK_SNAPSHOT = None
+    # (CFG_FILE, Datenbank) für die der hcwr Daemon auto_migration bereits ausgeführt hat,
+    # siehe ../modules/hcwr_daemon_mod.py
+    DAEMON_MIGRATED = set()
+    # Laufprofil für --profile (Phasen, SQL-Statements), siehe ../modules/hcwr_profile_mod.py
+    PROFILE = None
+    # SQL-Statistik je benannter Abfrage und Slow-Query-Log, siehe ../modules/hcwr_sqlstats_mod.py
+    SQL_STATS = None
+    # Benutzer aus users.toml im Kindprozess von hcwr --batch (ohne vim und Rückfragen),
+    # siehe ../modules/hcwr_batch_mod.py
+    BATCH_USER = None
+    # hcwr --weeks: Wochensummen {(Jahr, KW): {"total", "zk_minus"}} und Datenbanken, für die
+    # insert_holiday_entries() schon gelaufen ist, über alle Wochen des Laufs (None = aus)
+    WEEK_SECONDS_MEMO = None
+    HOLIDAY_ENTRIES_DONE = None
     KW_REPORT_BASE_DIR = "/home/intevation/doc/Wochenberichte" # Wird für 'kw_report_dir' gebraucht, siehe weiter unten
     SQL_TEMPLATE = "/Home/projects/Intern/hecokwreport.hg/template/heco.projects.sql"
     DEFAULT_SQL_TEMPLATE = SQL_TEMPLATE
@@ -137,6 +169,12 @@ class myGlobals:
             "# insert_tasks = (none/true/false)",
             "# Default: None or False = disabled, True = enabled",
             "# insert_tasks = false\n#\n",
+            "# Feiertage: native = in hcwr berechnet, geacal = über das geaCal Plugin",
+            "# Default: native mit holiday_state, sonst geacal (ohne geaCal: native, nur bundesweit)\n#",
+            "# holiday_source = native\n#",
+            "# Bundesland für landesweite Feiertage (BW, BY, BE, BB, HB, HH, HE, MV, NI, NW, RP, SL, SN, ST, SH, TH)",
+            "# Default: keins\n#",
+            "# holiday_state = NI\n#\n",
         ],
         "Database": [
             "# Examples:",
@@ -151,6 +189,22 @@ class myGlobals:
             "# Pfad zur Datenbank mit Keyword-IDs",
             "# Default: ~/.heco/keyword_id.db\n#",
             "# db_keyword_id_path = ~/.heco/keyword_id.db\n#",
+            "# Pfad zum Zeitkonto-Ledger (Wochensummen und Saldo je KW, none = deaktiviert)",
+            "# Default: ~/.heco/hcwr_ledger.db\n#",
+            "# db_ledger_path = ~/.heco/hcwr_ledger.db\n#",
+            "# KW-Filter der SQLite-Abfragen: range = indexfähige Datumsgrenzen, isoweek = alte Python UDF",
+            "# Default: range\n#",
+            "# week_filter = range\n#",
+            "# Fehlende Indizes für hcwr auf entries in time.db anlegen (true/false)",
+            "# Default: false, da das Schema von heco verwaltet wird\n#",
+            "# create_indexes = false\n#",
+            "# FTS5 Volltextindex für -s/--search Suchen in -J/--job-entries (true/false, nur SQLite)",
+            "# Der Index liegt in einer eigenen Datei und wird bei jeder Suche nachgeführt",
+            "# Default: false\n#",
+            "# fts_index = false\n#",
+            "# Pfad zum FTS5 Volltextindex",
+            "# Default: ~/.heco/hcwr_fts.db\n#",
+            "# db_fts_path = ~/.heco/hcwr_fts.db\n#",
             "# Wo im String soll das Keyword erwartet werden?",
             "# Values: Am Anfang des Strings = ^, 1, beginning, first\n# oder irgendwo: None, *, any oder $, end, last oder eigener Regex String",
             "# Default: None\n#",
@@ -27,6 +27,8 @@ from hcwr_globals_mod import HCWR_GLOBALS
 from hcwr_config_mod import get_calendar_week
 from hcwr_dbg_mod import debug, info, warning, get_function_name, show_process_route
 from hcwr_utils_mod import progress_bar, input_with_prefill
+from hcwr_ledger_mod import get_ledger_weeks
+from hcwr_settings_mod import get_settings
 
 def validate_date(date_string):
     fname = get_function_name()
@@ -128,7 +130,70 @@ def get_monday_of_week(kw, year):
     return monday.strftime("%Y-%m-%d")
 
 
-def get_kw_overhours(conn=None, kw=None):
+def get_week_seconds(conn, year, first_kw, last_kw):
+    """
+    Holt alle Einträge von KW first_kw bis KW last_kw des Jahres mit einer einzigen
+    Abfrage und summiert die Sekunden im Speicher je ISO-Woche auf.
+
+    Ersetzt die frühere Abfrage je Projekt und Tag (get_total_time), die pro Woche
+    Anzahl Projekte × 7 Abfragen an die Datenbank gestellt hat.
+
+    Rückgabe:
+        dict {kw: {"total": Sekunden ohne 'Zeitkonto Abzug', "zk_minus": Sekunden 'Zeitkonto Abzug'}}
+    """
+    fname = get_function_name()
+
+    weeks = {kw: {"total": 0, "zk_minus": 0} for kw in range(first_kw, last_kw + 1)}
+    if first_kw > last_kw:
+        return weeks
+
+    # Halboffenes Intervall [Montag der ersten KW, Montag nach der letzten KW)
+    start = date.fromisocalendar(year, first_kw, 1)
+    stop = date.fromisocalendar(year, last_kw, 1) + timedelta(days=7)
+    params = (start.strftime("%Y-%m-%d"), stop.strftime("%Y-%m-%d"))
+
+    cursor = conn.cursor()
+    cursor.execute(HCWR_GLOBALS.DB_QUERIES.overhours_entries, params)
+
+    for start_time, stop_time, description in cursor:
+        # SQLite liefert Strings, PostgreSQL datetime-Objekte
+        if isinstance(start_time, str):
+            start_time = datetime.fromisoformat(start_time[:19])
+        if isinstance(stop_time, str):
+            stop_time = datetime.fromisoformat(stop_time[:19])
+        seconds = (stop_time - start_time).total_seconds()
+
+        kw = start_time.isocalendar()[1]
+        if kw not in weeks:
+            continue
+        if "Zeitkonto Abzug" in (description or ""):
+            weeks[kw]["zk_minus"] += seconds
+        else:
+            weeks[kw]["total"] += seconds
+
+    for kw in weeks:
+        weeks[kw]["total"] = int(weeks[kw]["total"])
+        weeks[kw]["zk_minus"] = int(weeks[kw]["zk_minus"])
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nweeks = {weeks}")
+
+    return weeks
+
+def get_memo_week_seconds(conn, year, first_kw, last_kw):
+    """
+    Wie get_week_seconds(), aber über HCWR_GLOBALS.WEEK_SECONDS_MEMO: bei hcwr --weeks wird jede
+    KW nur einmal aus der Datenbank summiert, jede weitere Woche holt nur die neuen KWs.
+    """
+    memo = HCWR_GLOBALS.WEEK_SECONDS_MEMO
+    missing = [kw for kw in range(first_kw, last_kw + 1) if (year, kw) not in memo]
+    if missing:
+        weeks = get_week_seconds(conn, year, min(missing), max(missing))
+        for kw in missing:
+            memo[(year, kw)] = weeks[kw]
+    return {kw: memo[(year, kw)] for kw in range(first_kw, last_kw + 1)}
+
+def get_kw_overhours(conn=None, kw=None, year=None):
     fname = get_function_name()
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         info(f"{fname}:\nkw = {kw}")
@@ -136,24 +201,31 @@ def get_kw_overhours(conn=None, kw=None):
     times = []
 
     # KW des 1. Arbeitstages
-    firstday = HCWR_GLOBALS.CFG.get('Onboarding', 'firstday')
-    year, week = get_calendar_week(firstday)
-    year_now = date.today().year
-    if year != year_now:
+    firstday = get_settings().firstday
+    first_year, week = get_calendar_week(firstday)
+    if year is None:
+        year = date.today().year
+    if first_year != year:
         first_kw = 1
     else:
         first_kw = week
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         info (f"first_kw = {first_kw}")
+
+    weekhours = get_settings().weekhours_seconds
+
+    # Wochensummen aus dem Zeitkonto-Ledger, nur fehlende/geänderte KWs werden nachberechnet,
+    # bei hcwr --weeks aus den Summen der vorherigen Wochen desselben Laufs
+    if HCWR_GLOBALS.WEEK_SECONDS_MEMO is not None:
+        weeks = get_memo_week_seconds(conn, year, first_kw, kw)
+    else:
+        weeks = get_ledger_weeks(conn, year, first_kw, kw, get_week_seconds)
     for i in range(first_kw, kw + 1):
-        result = get_kw_overhours_add(conn, i, None, True, None, None)
+        # KW Zeitkonto: gearbeitete Zeit abzüglich 'Zeitkonto Abzug' minus Vertragsstunden
+        overhours = weeks[i]["total"] - weeks[i]["zk_minus"] - weekhours
         if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-            info (f"result = {result}")
-        for line in result:
-            if 'KW Zeitkonto' in line:
-                time_str = line.split()[2]
-                debug (time_str)
-                times.append(time_str)
+            info (f"KW {i}: {weeks[i]}, KW Zeitkonto: {overhours}")
+        times.append(overhours)
         progress_bar(HCWR_GLOBALS.PBAR_VAL,HCWR_GLOBALS.PBAR_MAX)
         HCWR_GLOBALS.PBAR_VAL += 1
 
@@ -183,14 +255,15 @@ def get_kw_overhours(conn=None, kw=None):
             sys.exit(0)
     return sign, result
 
-def get_kw_overhours_add(conn=None,kw=None,zk=None,za=None,date=None,t=None):
+def get_kw_overhours_add(conn=None,kw=None,zk=None,za=None,date=None,t=None,year=None):
     fname = get_function_name()
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-        info(f"{fname}:\nkw = {kw}, zk = {zk}, za = {za}, date = {date}, t = {t}")
+        info(f"{fname}:\nkw = {kw}, zk = {zk}, za = {za}, date = {date}, t = {t}, year = {year}")
     if kw:
         # Wenn keine Startdatum angegeben ist, setze das Startdatum auf Montag der Kalenderwoche
         # Definiere das Jahr und die Kalenderwoche
-        year = datetime.now().year
+        if year is None:
+            year = datetime.now().year
         
         # Berechne den Montag der Kalenderwoche
         monday = datetime.strptime(f"{year}-W{kw}-1", "%Y-W%W-%w").date()
@@ -214,34 +287,40 @@ def get_kw_overhours_add(conn=None,kw=None,zk=None,za=None,date=None,t=None):
     # Cursor-Objekt erstellen
     cursor = conn.cursor()
 
-    # Alle Einträge aus der Tabelle projects auswählen
-    cursor.execute("SELECT * FROM projects")
-
-    # Ergebnis abrufen
-    projects = cursor.fetchall()
-
     total_kw_time = 0
-    # Ausgabe der Projekte
-    day_total_time = 0
-    for project in projects:
-        project_id = project[0]
-        project_name = project[2]
-        if kw:
-            total_time = get_weekly_total_time(project_id, date, kw, cursor)
+    if kw:
+        # Eine Abfrage für die ganze KW statt Projekte × 7 Tage
+        if HCWR_GLOBALS.WEEK_SECONDS_MEMO is not None:
+            seconds = get_memo_week_seconds(conn, year, kw, kw)[kw]
         else:
-            total_time = get_total_time(project_id, date)
+            seconds = get_week_seconds(conn, year, kw, kw)[kw]
+        total_kw_time = seconds["total"]
+        if za:
+            total_kw_time -= seconds["zk_minus"]
+    else:
+        # Alle Einträge aus der Tabelle projects auswählen
+        cursor.execute("SELECT * FROM projects")
+
+        # Ergebnis abrufen
+        projects = cursor.fetchall()
+
+        # Ausgabe der Projekte
+        day_total_time = 0
+        for project in projects:
+            project_id = project[0]
+            project_name = project[2]
+            total_time = get_total_time(project_id, date, cursor)
             day_total_time += total_time
 
-        if not "Zeitkonto Abzug" in project_name:
-            total_kw_time += total_time
-        if za and "Zeitkonto Abzug" in project_name:
-            total_kw_time -= total_time
+            if not "Zeitkonto Abzug" in project_name:
+                total_kw_time += total_time
+            if za and "Zeitkonto Abzug" in project_name:
+                total_kw_time -= total_time
 
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-        info(f"total_time = {total_time}")
         info(f"total_kw_time = {total_kw_time}")
-    weekhours = int(float(HCWR_GLOBALS.CFG.get('General', 'weekhours')) * 3600)
-    firstday = HCWR_GLOBALS.CFG.get('Onboarding', 'firstday') 
+    weekhours = get_settings().weekhours_seconds
+    firstday = get_settings().firstday
     if kw:
         overhours = total_kw_time - weekhours # Ueberstunden in Sekunden
         if overhours < 0:
@@ -275,8 +354,6 @@ def get_kw_overhours_add(conn=None,kw=None,zk=None,za=None,date=None,t=None):
     else:
         print(f"{date} Total: {int(total_kw_time)}")
 
-    # Datenbankverbindung schließen
-    conn.close()
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         prompt = "Enter für fortfahren oder N für Nein "
         answer = input_with_prefill(prompt, "", '')
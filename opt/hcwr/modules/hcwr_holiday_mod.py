@@ -0,0 +1,278 @@
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           hcwr_holiday_mod.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+#
+# Feiertagskalender: [General] holiday_source = native berechnet die deutschen
+# Feiertage im Prozess (Osterdatum nach Gauß, feste und bewegliche Feiertage, Regeln je
+# Bundesland aus [General] holiday_state). Ohne holiday_source ist native der Default, sobald
+# holiday_state gesetzt ist, vorher bleibt es bei geaCal. Mit holiday_source = geacal wird wie bisher
+# geaCal höchstens einmal pro Jahr aufgerufen, das Ergebnis liegt dann zusätzlich dauerhaft
+# in ~/.heco/hcwr_holidays.json, gültig solange sich das geaCal Binary nicht ändert.
+# Je Lauf liegen die Jahre in HCWR_GLOBALS.HOLIDAY_CACHE bzw. HOLIDAY_DATES.
+import os
+import json
+import functools
+import shutil
+import subprocess
+from datetime import date, timedelta
+
+# Import von eigenem Module
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbg_mod import debug, info, warning, get_function_name
+from hcwr_settings_mod import get_settings
+
+# Bundesländer für [General] holiday_state
+STATES = ("BW", "BY", "BE", "BB", "HB", "HH", "HE", "MV", "NI", "NW", "RP", "SL", "SN", "ST", "SH", "TH")
+
+def easter_sunday(year):
+    """Ostersonntag nach der Gaußschen Osterformel (gregorianisch, mit Ergänzung von Lichtenberg)."""
+    k = year // 100
+    m = 15 + (3 * k + 3) // 4 - (8 * k + 13) // 25
+    s = 2 - (3 * k + 3) // 4
+    a = year % 19
+    d = (19 * a + m) % 30
+    r = (d + a // 11) // 29
+    og = 21 + d - r
+    sz = 7 - (year + year // 4 + s) % 7
+    oe = 7 - (og - sz) % 7
+    # Tag im März, Werte über 31 liegen im April
+    return date(year, 3, 1) + timedelta(days=og + oe - 1)
+
+def buss_und_bettag(year):
+    """Mittwoch vor dem 23. November."""
+    day = date(year, 11, 22)
+    return day - timedelta(days=(day.weekday() - 2) % 7)
+
+# (Name, Datum aus (Jahr, Ostersonntag), Bundesländer oder None = bundesweit, erstes Jahr, letztes Jahr)
+HOLIDAY_RULES = (
+    ("Neujahr",                    lambda y, e: date(y, 1, 1),    None, None, None),
+    ("Heilige Drei Könige",        lambda y, e: date(y, 1, 6),    ("BW", "BY", "ST"), None, None),
+    ("Internationaler Frauentag",  lambda y, e: date(y, 3, 8),    ("BE",), 2019, None),
+    ("Internationaler Frauentag",  lambda y, e: date(y, 3, 8),    ("MV",), 2023, None),
+    ("Karfreitag",                 lambda y, e: e - timedelta(days=2),  None, None, None),
+    ("Ostersonntag",               lambda y, e: e,                ("BB",), None, None),
+    ("Ostermontag",                lambda y, e: e + timedelta(days=1),  None, None, None),
+    ("Tag der Arbeit",             lambda y, e: date(y, 5, 1),    None, None, None),
+    ("Tag der Befreiung",          lambda y, e: date(y, 5, 8),    ("BE",), 2020, 2020),
+    ("Tag der Befreiung",          lambda y, e: date(y, 5, 8),    ("BE",), 2025, 2025),
+    ("Christi Himmelfahrt",        lambda y, e: e + timedelta(days=39), None, None, None),
+    ("Pfingstsonntag",             lambda y, e: e + timedelta(days=49), ("BB",), None, None),
+    ("Pfingstmontag",              lambda y, e: e + timedelta(days=50), None, None, None),
+    ("Fronleichnam",               lambda y, e: e + timedelta(days=60), ("BW", "BY", "HE", "NW", "RP", "SL"), None, None),
+    ("Mariä Himmelfahrt",          lambda y, e: date(y, 8, 15),   ("SL",), None, None),
+    ("Weltkindertag",              lambda y, e: date(y, 9, 20),   ("TH",), 2019, None),
+    ("Tag der Deutschen Einheit",  lambda y, e: date(y, 10, 3),   None, 1990, None),
+    ("Reformationstag",            lambda y, e: date(y, 10, 31),  ("BB", "MV", "SN", "ST", "TH"), 1990, None),
+    ("Reformationstag",            lambda y, e: date(y, 10, 31),  ("HB", "HH", "NI", "SH"), 2018, None),
+    # 500 Jahre Reformation: einmalig bundesweit
+    ("Reformationstag",            lambda y, e: date(y, 10, 31),  None, 2017, 2017),
+    ("Allerheiligen",              lambda y, e: date(y, 11, 1),   ("BW", "BY", "NW", "RP", "SL"), None, None),
+    # Bis 1994 bundesweit, seitdem nur noch in Sachsen
+    ("Buß- und Bettag",            lambda y, e: buss_und_bettag(y), None, None, 1994),
+    ("Buß- und Bettag",            lambda y, e: buss_und_bettag(y), ("SN",), 1995, None),
+    ("1. Weihnachtstag",           lambda y, e: date(y, 12, 25),  None, None, None),
+    ("2. Weihnachtstag",           lambda y, e: date(y, 12, 26),  None, None, None),
+)
+
+def native_holidays(year, state=None):
+    """
+    Gesetzliche Feiertage eines Jahres für 'state' (None = nur bundesweite) ohne geaCal.
+
+    Rückgabe:
+        list [[datum, name], ...] aufsteigend nach Datum, wie run_geacal()
+    """
+    easter = easter_sunday(year)
+    result = {}
+    for name, rule, states, first, last in HOLIDAY_RULES:
+        if states is not None and state not in states:
+            continue
+        if (first is not None and year < first) or (last is not None and year > last):
+            continue
+        # Bundesweiter und landesweiter Eintrag am selben Tag (Reformationstag 2017) nur einmal
+        result.setdefault(rule(year, easter).strftime("%Y-%m-%d"), name)
+    return [[hdate, result[hdate]] for hdate in sorted(result)]
+
+def get_holiday_source():
+    """
+    (Quelle, Bundesland) aus [General] holiday_source und holiday_state.
+
+    Ohne holiday_source: native, wenn holiday_state gesetzt ist, sonst geacal wie bisher,
+    damit landesweite Feiertage (z. B. Reformationstag in NI) nicht stillschweigend fehlen.
+    Ohne geaCal im PATH bleibt nur native mit bundesweiten Feiertagen (einmal gewarnt).
+    Unbekannte Werte führen zu 'native' bzw. nur bundesweiten Feiertagen (einmal gewarnt).
+    """
+    settings = get_settings()
+    state = (settings.holiday_state or "").upper() or None
+    if settings.holiday_source:
+        source = settings.holiday_source.lower()
+    elif state is None and geacal_installed():
+        source = "geacal"
+    else:
+        source = "native"
+    key = (source, state)
+    if key != HCWR_GLOBALS.HOLIDAY_SOURCE:
+        if source not in ("native", "geacal"):
+            warning("Unbekannte holiday_source:", settings.holiday_source, "WARNUNG")
+        if state is not None and state not in STATES:
+            warning("Unbekannter holiday_state:", f"{settings.holiday_state} (erlaubt: {', '.join(STATES)})", "WARNUNG")
+        if source != "geacal" and state is None:
+            warning("Kein [General] holiday_state gesetzt:",
+                    f"nur bundesweite Feiertage, landesweite fehlen (erlaubt: {', '.join(STATES)})", "WARNUNG")
+        # Feiertage anderer Quelle oder eines anderen Bundeslands verwerfen (z. B. im hcwr Daemon)
+        HCWR_GLOBALS.HOLIDAY_CACHE.clear()
+        HCWR_GLOBALS.HOLIDAY_DATES.clear()
+        HCWR_GLOBALS.HOLIDAY_SOURCE = key
+    return key
+
+@functools.lru_cache(maxsize=None)
+def geacal_installed():
+    """geaCal liegt im PATH, einmal je Prozess geprüft."""
+    return shutil.which("geaCal") is not None
+
+def holiday_cache_enabled():
+    """Disk-Cache ist aktiv, solange 'holiday_cache_path' nicht auf none/false/off steht."""
+    return bool(HCWR_GLOBALS.HOLIDAY_CACHE_PATH) and \
+        str(HCWR_GLOBALS.HOLIDAY_CACHE_PATH).lower() not in ("none", "false", "off")
+
+def get_geacal_version():
+    """
+    Versionskennung von geaCal ohne zusätzlichen Prozess: Pfad, Größe und mtime des Binaries.
+    Rückgabe None, wenn geaCal nicht im PATH liegt.
+    """
+    path = shutil.which("geaCal")
+    if path is None:
+        return None
+    st = os.stat(path)
+    return f"{os.path.realpath(path)}:{st.st_size}:{st.st_mtime_ns}"
+
+def load_holiday_cache(version):
+    """Liest die Jahre aus dem Disk-Cache, die mit der gleichen geaCal Version erzeugt wurden."""
+    if not holiday_cache_enabled() or not os.path.exists(HCWR_GLOBALS.HOLIDAY_CACHE_PATH):
+        return {}
+    try:
+        with open(HCWR_GLOBALS.HOLIDAY_CACHE_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        warning("Feiertags-Cache konnte nicht gelesen werden:", e, "WARNUNG")
+        return {}
+    if data.get("geacal") != version:
+        debug("Feiertags-Cache verworfen, geaCal wurde geändert")
+        return {}
+    return data.get("years", {})
+
+def save_holiday_cache(version, years):
+    """Schreibt den Disk-Cache atomar (tmp-Datei + os.replace)."""
+    if not holiday_cache_enabled():
+        return
+    path = HCWR_GLOBALS.HOLIDAY_CACHE_PATH
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"geacal": version, "years": years}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+    except OSError as e:
+        warning("Feiertags-Cache konnte nicht geschrieben werden:", e, "WARNUNG")
+
+def run_geacal(year):
+    """Ruft 'geaCal -l -y YEAR -j' auf und liefert die Liste [[datum, name], ...]."""
+    fname = get_function_name()
+    try:
+        output = subprocess.check_output(
+            ["geaCal", "-l", "-y", str(year), "-j"],
+            text=True
+        )
+    except Exception as e:
+        raise RuntimeError(f"geaCal konnte nicht ausgeführt werden: {e}")
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\noutput = {output}")
+    try:
+        data = json.loads(output)
+        return [[hdate, name] for hdate, name in data.get("holidays", [])]
+    except Exception as e:
+        raise ValueError(f"Ungültiges JSON von geaCal erhalten: {e}")
+
+def get_holidays_of_year(year):
+    """
+    Feiertage eines Jahres als dict {"YYYY-MM-DD": name}.
+
+    Reihenfolge: HCWR_GLOBALS.HOLIDAY_CACHE, danach native_holidays() bzw. bei
+    holiday_source = geacal Disk-Cache und geaCal. Ohne geaCal wird einmal pro Lauf
+    gewarnt und ein leeres dict geliefert.
+    """
+    fname = get_function_name()
+    year = int(year)
+
+    source, state = get_holiday_source()
+    holidays = HCWR_GLOBALS.HOLIDAY_CACHE.get(year)
+    if holidays is not None:
+        return holidays
+
+    if source != "geacal":
+        holidays = {hdate: name for hdate, name in native_holidays(year, state)}
+        HCWR_GLOBALS.HOLIDAY_CACHE[year] = holidays
+        if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+            info(f"{fname}:\nyear = {year}\nstate = {state}\nholidays = {holidays}")
+        return holidays
+
+    version = get_geacal_version()
+    if version is None:
+        if not HCWR_GLOBALS.HOLIDAY_CACHE:
+            warning("Plugin geaCal not found!", "No holyday check possible!")
+        HCWR_GLOBALS.HOLIDAY_CACHE[year] = {}
+        return HCWR_GLOBALS.HOLIDAY_CACHE[year]
+
+    years = load_holiday_cache(version)
+    if str(year) not in years:
+        years[str(year)] = run_geacal(year)
+        save_holiday_cache(version, years)
+        debug(f"geaCal für {year} aufgerufen")
+
+    holidays = {hdate: name for hdate, name in years[str(year)]}
+    HCWR_GLOBALS.HOLIDAY_CACHE[year] = holidays
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nyear = {year}\nholidays = {holidays}")
+    return holidays
+
+def get_holiday_dates(year):
+    """Feiertage eines Jahres als frozenset[date], je Lauf einmal berechnet (HCWR_GLOBALS.HOLIDAY_DATES)."""
+    year = int(year)
+    get_holiday_source()
+    dates = HCWR_GLOBALS.HOLIDAY_DATES.get(year)
+    if dates is None:
+        dates = frozenset(date.fromisoformat(hdate) for hdate in get_holidays_of_year(year))
+        HCWR_GLOBALS.HOLIDAY_DATES[year] = dates
+    return dates
+
+def get_holidays_of_week(year, week):
+    """Feiertage einer ISO-Woche als Liste [(datum, name)], aufsteigend nach Datum."""
+    monday = date.fromisocalendar(year, week, 1)
+    result = []
+    for i in range(7):
+        day = monday + timedelta(days=i)
+        name = get_holidays_of_year(day.year).get(day.strftime("%Y-%m-%d"))
+        if name is not None:
+            result.append((day.strftime("%Y-%m-%d"), name))
+    return result
+
+def get_holiday_name(day):
+    """Name des Feiertags an 'day' (date oder 'YYYY-MM-DD') oder None."""
+    if isinstance(day, str):
+        return get_holidays_of_year(day[:4]).get(day[:10])
+    return get_holidays_of_year(day.year).get(day.strftime("%Y-%m-%d"))
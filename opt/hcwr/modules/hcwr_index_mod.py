@@ -0,0 +1,156 @@
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           hcwr_index_mod.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+#
+# Index-Verwaltung für heco time.db:
+#  - ensure_indexes(): legt fehlende Indizes an, die hcwr für seine Abfragen braucht.
+#    Das Schema gehört heco, daher nur mit [Database] create_indexes = true.
+#  - explain_queries(): EXPLAIN QUERY PLAN für alle Statements in DB_QUERIES,
+#    meldet welche Abfragen noch die Tabelle entries komplett durchsuchen.
+import re
+import sys
+from colorama import Fore, Style
+
+# Import von eigenem Module
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbg_mod import info, warning, get_function_name, show_process_route
+from hcwr_config_mod import isoweek
+from hcwr_settings_mod import get_settings
+
+# SQL Schlüsselwörter, die nach "entries" stehen können und kein Alias sind
+SQL_KEYWORDS = {"where", "on", "join", "left", "inner", "group", "order", "set", "values", "as", "limit", "and", "or"}
+
+def is_pg():
+    return get_settings().is_pg
+
+def ensure_indexes(conn):
+    """
+    Legt fehlende hcwr-Indizes aus DB_QUERIES.create_indexes auf entries an.
+    Nur mit [Database] create_indexes = true und nicht im -n/--dry-run Modus.
+
+    Rückgabe:
+        list der neu angelegten Index-Namen
+    """
+    fname = get_function_name()
+
+    if not get_settings().create_indexes:
+        return []
+
+    cursor = conn.cursor()
+    cursor.execute(HCWR_GLOBALS.DB_QUERIES.index_select, ("entries",))
+    existing = {row[0] for row in cursor.fetchall()}
+    missing = [name for name in HCWR_GLOBALS.DB_QUERIES.create_indexes if name not in existing]
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nexisting = {existing}\nmissing = {missing}")
+
+    if not missing:
+        return []
+    if HCWR_GLOBALS.args.dry_run:
+        info("Dry-Run: fehlende Indizes werden nicht angelegt:", ", ".join(missing))
+        return []
+
+    for name in missing:
+        cursor.execute(HCWR_GLOBALS.DB_QUERIES.create_indexes[name])
+        info("Index angelegt:", name)
+    if not is_pg():
+        cursor.execute("ANALYZE entries")
+    conn.commit()
+    return missing
+
+def get_entries_aliases(sql):
+    """Ermittelt die Namen, unter denen die Tabelle entries in einem Statement vorkommt."""
+    aliases = {"entries"}
+    for alias in re.findall(r"\bentries\s+(?:AS\s+)?(\w+)", sql, re.IGNORECASE):
+        if alias.lower() not in SQL_KEYWORDS:
+            aliases.add(alias)
+    return aliases
+
+def explain_queries(conn):
+    """
+    Führt EXPLAIN QUERY PLAN für jedes Statement in DB_QUERIES aus (nur SQLite) und
+    listet auf, welche Abfragen entries per Full Table Scan lesen.
+
+    Rückgabe:
+        dict {name: (status, details)} mit status OK, INDEX-SCAN, FULL-SCAN oder FEHLER
+    """
+    fname = get_function_name()
+
+    if is_pg():
+        warning("EXPLAIN QUERY PLAN", "ist nur für SQLite verfügbar")
+        return {}
+
+    # Für die *_isoweek Fallback-Abfragen
+    conn.create_function("isoweek", 3, isoweek)
+
+    report = {}
+    for name in sorted(vars(HCWR_GLOBALS.DB_QUERIES)):
+        sql = getattr(HCWR_GLOBALS.DB_QUERIES, name)
+        if name.startswith("_") or not isinstance(sql, str):
+            continue
+        # Kommentare entfernen, nur lesende und schreibende Statements prüfen
+        stmt = re.sub(r"--[^\n]*", "", sql).strip()
+        if not re.match(r"(SELECT|WITH|UPDATE|DELETE|INSERT)\b", stmt, re.IGNORECASE):
+            continue
+        # FTS5 Statements laufen gegen die per ATTACH eingebundene hcwr_fts.db
+        if "entries" not in stmt or "hcwr_fts." in stmt:
+            continue
+
+        try:
+            plan = conn.execute("EXPLAIN QUERY PLAN " + stmt, [None] * stmt.count("?")).fetchall()
+        except Exception as e:
+            report[name] = ("FEHLER", str(e))
+            continue
+
+        aliases = get_entries_aliases(stmt)
+        full_scans, index_scans = [], []
+        for row in plan:
+            detail = row[-1]
+            m = re.match(r"(SCAN|SEARCH) (?:TABLE )?(\w+)", detail)
+            if not m or m.group(2) not in aliases:
+                continue
+            # Ein AUTOMATIC INDEX wird pro Abfrage per Full Scan über entries aufgebaut
+            if "AUTOMATIC" in detail or (m.group(1) == "SCAN" and "USING" not in detail):
+                full_scans.append(detail)
+            elif m.group(1) == "SCAN":
+                index_scans.append(detail)
+
+        if full_scans:
+            report[name] = ("FULL-SCAN", "; ".join(full_scans))
+        elif index_scans:
+            report[name] = ("INDEX-SCAN", "; ".join(index_scans))
+        else:
+            report[name] = ("OK", "")
+
+    colors = {"OK": Fore.GREEN, "INDEX-SCAN": Fore.YELLOW, "FULL-SCAN": Fore.RED, "FEHLER": Fore.MAGENTA}
+    print(f"{'Abfrage':<34} | {'Status':<10} | Details")
+    print("-" * 34 + "-+-" + "-" * 10 + "-+-" + "-" * 40)
+    for name, (status, details) in report.items():
+        print(f"{name:<34} | " + colors[status] + f"{status:<10}" + Style.RESET_ALL + f" | {details}")
+
+    full = [name for name, (status, details) in report.items() if status == "FULL-SCAN"]
+    if full:
+        warning(f"{len(full)} von {len(report)} Abfragen lesen entries komplett:", ", ".join(full), "Index")
+    else:
+        info(f"Alle {len(report)} Abfragen auf entries sind index-gestützt", "")
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nreport = {report}")
+        show_process_route()
+        sys.exit(0)
+
+    return report
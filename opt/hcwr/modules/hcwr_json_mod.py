@@ -15,6 +15,9 @@
 # https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
 # Header added by https://github.com/GhostCoder74/Set-Project-Headers
 # -----------------------------------------------------------------------------------------
+import os
+import sys
+import csv
 import json
 
 # Import von eigenem Module
@@ -48,3 +51,37 @@ def output(data, use_json=False, stdout=True):
                 print(data)
             else:
                 return data
+
+def stream_output(records, fmt="ndjson", out=None):
+    """
+    Schreibt dicts aus einem Iterator einzeln als NDJSON (ein Objekt je Zeile) oder CSV
+    (Kopfzeile aus den Schlüsseln des ersten Datensatzes). Es wird nichts gesammelt.
+
+    Rückgabe:
+        Anzahl der geschriebenen Datensätze
+    """
+    fname = get_function_name()
+    if out is None:
+        out = sys.stdout
+
+    count = 0
+    writer = None
+    try:
+        for record in records:
+            if fmt == "csv":
+                if writer is None:
+                    writer = csv.DictWriter(out, fieldnames=list(record))
+                    writer.writeheader()
+                writer.writerow(record)
+            else:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+        out.flush()
+    except BrokenPipeError:
+        # Leser hat aufgehört (z. B. '| head'), restliche Ausgabe verwerfen
+        if out is sys.stdout:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nfmt = {fmt}\ncount = {count}")
+    return count
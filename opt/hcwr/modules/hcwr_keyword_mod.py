@@ -0,0 +1,149 @@
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           hcwr_keyword_mod.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+#
+# Contract-Keyword-Index: die Tabelle contracts aus keyword_id.db wird einmal pro Lauf
+# geladen und in einen Aho-Corasick-Automaten übersetzt. Ein Entry wird in einem
+# Durchlauf gegen alle Keywords geprüft, die Laufzeit hängt von der Länge des
+# Entries ab und nicht von der Anzahl der Keywords.
+import os
+from collections import deque
+
+# Import von eigenem Module
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbg_mod import debug, info, get_function_name
+
+def is_word_char(c):
+    """Entspricht \\w in Python-Regex für str: alphanumerisch oder Unterstrich."""
+    return c.isalnum() or c == "_"
+
+def is_word_boundary(text, i):
+    """Entspricht \\b an Position i in text."""
+    before = i > 0 and is_word_char(text[i - 1])
+    after = i < len(text) and is_word_char(text[i])
+    return before != after
+
+class ContractKeywordIndex:
+    """
+    Aho-Corasick-Automat über alle Contract-Keywords (case-insensitive).
+
+    find(entry_lower) liefert alle Zeilen (keyword, contract_id, task), deren Keyword als
+    ganzes Wort im Entry vorkommt, in der Reihenfolge der Tabelle contracts. Das entspricht
+    re.search(r'\\b' + re.escape(keyword.lower()) + r'\\b', entry_lower) je Keyword.
+    """
+
+    def __init__(self, rows, db_path=None, mtime=None):
+        self.rows = list(rows)
+        self.db_path = db_path
+        self.mtime = mtime
+        # Trie: Kindknoten je Zeichen, Fail-Links und Ausgaben (Keyword-Länge, Zeilennummern)
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+        keywords = {}
+        for idx, (keyword, contract_id, task) in enumerate(self.rows):
+            if not keyword:
+                continue
+            keywords.setdefault(keyword.lower(), []).append(idx)
+
+        for kw, idxs in keywords.items():
+            node = 0
+            for c in kw:
+                nxt = self.goto[node].get(c)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][c] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = nxt
+            self.out[node].append((len(kw), idxs))
+
+        # Fail-Links per Breitensuche, Ausgaben der Fail-Knoten übernehmen
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for c, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and c not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(c, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def find(self, entry_lower):
+        """Alle Zeilen mit Wortgrenzen-Treffer im (bereits kleingeschriebenen) Entry."""
+        matched = set()
+        node = 0
+        for pos, c in enumerate(entry_lower):
+            while node and c not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(c, 0)
+            for length, idxs in self.out[node]:
+                end = pos + 1
+                if is_word_boundary(entry_lower, end - length) and is_word_boundary(entry_lower, end):
+                    matched.update(idxs)
+        return [self.rows[idx] for idx in sorted(matched)]
+
+def get_contract_keyword_index(db_path=None, connect=None):
+    """
+    Lädt die Tabelle contracts einmal pro Lauf und hält den Index in
+    HCWR_GLOBALS.CONTRACT_KEYWORD_INDEX. Nach Änderungen an den Keywords
+    wird der Index mit reset_contract_keyword_index() verworfen.
+
+    connect: liefert zu db_path die gemeinsame Verbindung (hcwr_dbms_mod.get_connection),
+    ohne connect wird eine eigene Verbindung geöffnet und wieder geschlossen.
+    """
+    fname = get_function_name()
+
+    if db_path is None:
+        db_path = HCWR_GLOBALS.DB_KEYWORD_ID_PATH
+
+    # mtime der Datei: im hcwr Daemon lebt der Index länger als ein Lauf
+    try:
+        mtime = os.path.getmtime(db_path)
+    except OSError:
+        mtime = None
+
+    index = HCWR_GLOBALS.CONTRACT_KEYWORD_INDEX
+    if index is not None and index.db_path == db_path and index.mtime == mtime:
+        return index
+
+    conn = connect(db_path) if connect is not None else HCWR_GLOBALS.DBMS.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(HCWR_GLOBALS.DB_QUERIES.contract_select)
+        rows = cursor.fetchall()
+    finally:
+        if connect is None:
+            conn.close()
+
+    index = ContractKeywordIndex(rows, db_path, mtime)
+    HCWR_GLOBALS.CONTRACT_KEYWORD_INDEX = index
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nrows = {rows}")
+    debug(f"Contract-Keyword-Index geladen: {len(index)} Keywords")
+    return index
+
+def reset_contract_keyword_index():
+    """Verwirft den geladenen Contract-Keyword-Index (z. B. nach Hinzufügen/Löschen)."""
+    HCWR_GLOBALS.CONTRACT_KEYWORD_INDEX = None
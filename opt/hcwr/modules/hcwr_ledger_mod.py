@@ -0,0 +1,210 @@
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           hcwr_ledger_mod.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+#
+# Zeitkonto-Ledger: speichert je ISO-Woche die gearbeiteten Sekunden, die Vertragssekunden,
+# die Sekunden 'Zeitkonto Abzug' und den laufenden Saldo in ~/.heco/hcwr_ledger.db.
+# Abgeschlossene Wochen ändern sich praktisch nie, daher werden bei jedem Lauf nur
+# fehlende Wochen und Wochen mit geänderten Einträgen neu berechnet.
+import os
+import importlib
+from datetime import datetime
+
+# Import von eigenem Module
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbg_mod import debug, info, warning, get_function_name
+from hcwr_dbms_mod import get_connection
+from hcwr_settings_mod import get_settings
+
+def ledger_enabled():
+    """
+    Ledger ist aktiv, solange 'db_ledger_path' nicht auf none/false/off steht.
+    Bei -n/--dry-run wird nichts gespeichert, daher auch kein Ledger verwendet.
+    """
+    if not HCWR_GLOBALS.DB_LEDGER_PATH or str(HCWR_GLOBALS.DB_LEDGER_PATH).lower() in ("none", "false", "off"):
+        return False
+    if HCWR_GLOBALS.args is not None and getattr(HCWR_GLOBALS.args, "dry_run", False):
+        return False
+    return True
+
+def open_ledger():
+    """
+    Öffnet (und initialisiert bei Bedarf) die Ledger-Datenbank.
+    Das Ledger ist immer eine SQLite-Datenbank, auch wenn heco mit PostgreSQL läuft.
+    Die Verbindung kommt aus get_connection() und wird nicht vom Aufrufer geschlossen.
+    """
+    fname = get_function_name()
+
+    os.makedirs(os.path.dirname(HCWR_GLOBALS.DB_LEDGER_PATH), exist_ok=True)
+    DBMS = importlib.import_module('sqlite3')
+    DB_QUERIES = importlib.import_module('hcwr_sqlite_queries_sql')
+    ledger = get_connection(HCWR_GLOBALS.DB_LEDGER_PATH, DBMS)
+    ledger.executescript(DB_QUERIES.ledger_create_tbl)
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nDB_LEDGER_PATH = {HCWR_GLOBALS.DB_LEDGER_PATH}")
+    return ledger, DB_QUERIES
+
+def get_entries_fingerprint(conn):
+    """
+    Fingerprint der entries Tabelle: (Anzahl, max(id), Summe project_id, Summe Sekunden,
+    Summe Startzeiten, Summe ids auf 'Zeitkonto Abzug' Projekten). Damit fallen auch Einträge auf,
+    die in eine andere KW verschoben oder deren Projekt in/aus 'Zeitkonto Abzug' umbenannt wurde.
+    Eine einzige Aggregat-Abfrage, die Zeilen selbst werden nicht übertragen.
+    """
+    cursor = conn.cursor()
+    cursor.execute(HCWR_GLOBALS.DB_QUERIES.ledger_entries_fingerprint)
+    return tuple(int(v) for v in cursor.fetchone())
+
+def get_changed_weeks(conn, old_fp, new_fp):
+    """
+    Ermittelt die ISO-Wochen, deren Einträge sich seit dem letzten Lauf geändert haben.
+
+    Rückgabe:
+        set {(year, kw)} - nur neue Einträge (id > altes max(id)), deren Wochen neu berechnet werden
+        None             - Einträge wurden gelöscht oder geändert, das Ledger muss komplett neu
+    """
+    fname = get_function_name()
+    if old_fp == new_fp:
+        return set()
+    # Fingerprint aus einer älteren Version mit weniger Werten
+    if len(old_fp) != len(new_fp):
+        return None
+
+    cursor = conn.cursor()
+    cursor.execute(HCWR_GLOBALS.DB_QUERIES.ledger_entries_since, (old_fp[1],))
+    rows = cursor.fetchall()
+
+    # Nur wenn die neuen Zeilen den Unterschied komplett erklären, sind alte Wochen unverändert
+    expected = (old_fp[0] + len(rows),
+                new_fp[1] if rows else old_fp[1],
+                old_fp[2] + sum(int(r[1]) for r in rows),
+                old_fp[3] + sum(int(r[2] or 0) for r in rows),
+                old_fp[4] + sum(int(r[3] or 0) for r in rows),
+                old_fp[5] + sum(int(r[4] or 0) for r in rows))
+    if expected != new_fp:
+        if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+            info(f"{fname}:\nexpected = {expected}, new_fp = {new_fp} -> Ledger wird neu aufgebaut")
+        return None
+
+    weeks = set()
+    for start_time, project_id, seconds, start_epoch, zk_id in rows:
+        if isinstance(start_time, str):
+            start_time = datetime.fromisoformat(start_time[:19])
+        weeks.add(tuple(start_time.isocalendar()[:2]))
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nweeks = {weeks}")
+    return weeks
+
+def get_ledger_weeks(conn, year, first_kw, last_kw, compute):
+    """
+    Liefert die Wochensummen von KW first_kw bis KW last_kw aus dem Ledger.
+
+    Fehlende Wochen und Wochen mit geänderten Einträgen werden über 'compute'
+    (hcwr_hcwrd_mod.get_week_seconds) in einer Abfrage nachberechnet und gespeichert.
+    Ändern sich Datenbank, Wochenstunden oder 1. Arbeitstag, wird das Ledger verworfen.
+
+    Rückgabe:
+        dict {kw: {"total": Sekunden ohne 'Zeitkonto Abzug', "zk_minus": Sekunden 'Zeitkonto Abzug'}}
+    """
+    fname = get_function_name()
+
+    if first_kw > last_kw or not ledger_enabled():
+        return compute(conn, year, first_kw, last_kw)
+
+    settings = get_settings()
+    weekhours = settings.weekhours_seconds
+    if settings.is_pg:
+        source = settings.dbpath
+    else:
+        source = os.path.abspath(os.path.expanduser(str(HCWR_GLOBALS.args.database)))
+    signature = {
+        "source": source,
+        "weekhours": str(weekhours),
+        "firstday": settings.firstday,
+    }
+
+    try:
+        ledger, DB_QUERIES = open_ledger()
+    except Exception as e:
+        warning("Zeitkonto-Ledger konnte nicht geöffnet werden:", e, "WARNUNG")
+        return compute(conn, year, first_kw, last_kw)
+
+    cursor = ledger.cursor()
+    cursor.execute(DB_QUERIES.ledger_meta_select)
+    meta = dict(cursor.fetchall())
+
+    new_fp = get_entries_fingerprint(conn)
+    old_fp = tuple(int(v) for v in meta["fingerprint"].split(",")) if meta.get("fingerprint") else None
+
+    changed = None
+    if old_fp is not None and all(meta.get(k) == v for k, v in signature.items()):
+        changed = get_changed_weeks(conn, old_fp, new_fp)
+    if changed is None:
+        debug("Zeitkonto-Ledger wird neu aufgebaut")
+        cursor.execute(DB_QUERIES.ledger_weeks_delete)
+        changed = set()
+
+    cursor.execute(DB_QUERIES.ledger_weeks_select, (year, first_kw, last_kw))
+    rows = {kw: {"total": worked, "zk_minus": zk_minus, "contract": contract, "balance": balance}
+            for kw, worked, contract, zk_minus, balance in cursor.fetchall()}
+
+    stale = [kw for kw in range(first_kw, last_kw + 1)
+             if kw not in rows or (year, kw) in changed]
+
+    if stale:
+        # Zusammenhängender Bereich -> eine Abfrage über compute()
+        weeks = compute(conn, year, min(stale), max(stale))
+        for kw in stale:
+            rows[kw] = dict(weeks[kw])
+
+    # Laufenden Saldo ab first_kw neu aufsummieren, nur gespeichert wird bei Änderungen
+    balance = 0
+    now = datetime.now().isoformat(timespec="seconds")
+    upserts = []
+    for kw in range(first_kw, last_kw + 1):
+        balance += rows[kw]["total"] - rows[kw]["zk_minus"] - weekhours
+        if kw in stale or rows[kw].get("balance") != balance or rows[kw].get("contract") != weekhours:
+            upserts.append((year, kw, rows[kw]["total"], weekhours, rows[kw]["zk_minus"], balance, now))
+        rows[kw]["contract"] = weekhours
+        rows[kw]["balance"] = balance
+    # Ein executemany statt einem Statement je KW
+    if upserts:
+        cursor.executemany(DB_QUERIES.ledger_week_upsert, upserts)
+
+    meta = list(signature.items()) + [("fingerprint", ",".join(str(v) for v in new_fp))]
+    cursor.executemany(DB_QUERIES.ledger_meta_upsert, meta)
+    ledger.commit()
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nstale = {stale}\nrows = {rows}")
+
+    return {kw: rows[kw] for kw in range(first_kw, last_kw + 1)}
+
+def get_ledger_balance(year, kw):
+    """
+    Liest den laufenden Saldo (Sekunden) bis einschließlich KW kw direkt aus dem Ledger.
+    Rückgabe None, wenn die Woche (noch) nicht im Ledger steht.
+    """
+    if not ledger_enabled() or not os.path.exists(HCWR_GLOBALS.DB_LEDGER_PATH):
+        return None
+    ledger, DB_QUERIES = open_ledger()
+    cursor = ledger.cursor()
+    cursor.execute(DB_QUERIES.ledger_weeks_select, (year, kw, kw))
+    row = cursor.fetchone()
+    return row[4] if row else None
@@ -59,8 +59,11 @@ get_last_record_of_eintries_today = """
     ORDER BY start_time DESC, id DESC
     LIMIT 1
 """
+# Anzahl Einträge je Tag im Zeitraum [von, bis), eine Abfrage für eine oder mehrere Wochen
 week_complete = """
-    SELECT count(*) FROM entries WHERE start_time >= %s AND start_time < %s;
+    SELECT start_time::date AS day, count(*) FROM entries
+    WHERE start_time >= %s AND start_time < %s
+    GROUP BY start_time::date
 """
 
 total_per_project = """
@@ -79,6 +82,17 @@ total_per_project = """
     ORDER BY p.id DESC;
 """
 
+# WeekSnapshot (hcwr_snapshot_mod): projects und alle Einträge mit Beginn oder Ende in der KW
+snapshot_projects = """
+    SELECT id, key, description FROM projects ORDER BY id;
+"""
+snapshot_entries = """
+    SELECT e.id, e.project_id, e.start_time, e.stop_time, e.description
+    FROM entries e
+    WHERE (e.start_time::timestamp >= %s AND e.start_time::timestamp < %s)
+       OR (e.stop_time::timestamp >= %s AND e.stop_time::timestamp < %s)
+    ORDER BY e.start_time, e.id;
+"""
 total_per_project_by_week = """
     SELECT
         REPLACE(REPLACE(p.description, '├─', ' '), '└─', ' ') AS description,
@@ -92,7 +106,7 @@ total_per_project_by_week = """
     FROM projects p
     LEFT JOIN entries e 
         ON e.project_id = p.id
-       AND CAST(e.start_time AS DATE) BETWEEN %s AND %s
+       AND e.start_time::timestamp >= %s AND e.start_time::timestamp < %s
     GROUP BY p.id, p.key, p.description
     ORDER BY p.id DESC;
 """
@@ -109,7 +123,7 @@ tppbw_uuk = """
     FROM projects p
     LEFT JOIN entries e 
         ON e.project_id = p.id
-       AND CAST(e.start_time AS DATE) BETWEEN %s AND %s
+       AND e.start_time::timestamp >= %s AND e.start_time::timestamp < %s
     WHERE p.id = %s
     ORDER BY e.start_time;
 """
@@ -194,21 +208,12 @@ absence = """
     ORDER BY p.description;
 """
 
-wday_absence = """
-    SELECT
-        COUNT(*)
-    FROM projects p
-    LEFT JOIN entries e 
-        ON e.project_id = p.id
-       AND (
-            (TO_CHAR(e.start_time::timestamp, 'IW')::int = %s
-             AND EXTRACT(ISOYEAR FROM e.start_time::timestamp) = %s)
-        OR
-            (TO_CHAR(e.stop_time::timestamp, 'IW')::int = %s
-             AND EXTRACT(ISOYEAR FROM e.stop_time::timestamp) = %s)
-       )
-    WHERE 
-        EXTRACT(ISODOW FROM e.start_time::timestamp) = %s
+# ISO-Wochentage (1 = Mo, ..., 7 = So) mit Krank/Urlaub/Feiertag Einträgen in der KW
+week_absence_days = """
+    SELECT DISTINCT EXTRACT(ISODOW FROM e.start_time::timestamp)::int AS wday
+    FROM entries e
+    JOIN projects p ON p.id = e.project_id
+    WHERE ((e.start_time >= %s AND e.start_time < %s) OR (e.stop_time >= %s AND e.stop_time < %s))
         AND (
             p.description LIKE '%%Krank%%'
          OR p.description LIKE '%%Urlaub%%'
@@ -225,8 +230,52 @@ hcwrd_select = """
     WHERE project_id = %s 
       AND start_time::timestamp BETWEEN %s AND %s;
 """
+
+# Alle Einträge eines Zeitraums in einem Durchlauf für das Zeitkonto (hcwr_hcwrd_mod)
+overhours_entries = """
+    SELECT e.start_time, e.stop_time, p.description
+    FROM entries e
+    JOIN projects p ON p.id = e.project_id
+    WHERE e.start_time::timestamp >= %s AND e.start_time::timestamp < %s
+    ORDER BY e.start_time;
+"""
+
+# Fingerprint der entries Tabelle für das Zeitkonto-Ledger (hcwr_ledger_mod), siehe hcwr_sqlite_queries_sql.py
+# Das Ledger selbst liegt immer in SQLite, siehe hcwr_sqlite_queries_sql.py
+ledger_entries_fingerprint = """
+    SELECT COUNT(*), COALESCE(MAX(e.id), 0), COALESCE(SUM(e.project_id), 0),
+           COALESCE(SUM(ROUND(EXTRACT(EPOCH FROM (e.stop_time::timestamp - e.start_time::timestamp)))::bigint), 0),
+           COALESCE(SUM(EXTRACT(EPOCH FROM e.start_time::timestamp)::bigint), 0),
+           COALESCE(SUM(CASE WHEN strpos(p.description, 'Zeitkonto Abzug') > 0 THEN e.id END), 0)
+    FROM entries e
+    LEFT JOIN projects p ON p.id = e.project_id;
+"""
+ledger_entries_since = """
+    SELECT e.start_time, e.project_id,
+           ROUND(EXTRACT(EPOCH FROM (e.stop_time::timestamp - e.start_time::timestamp)))::bigint,
+           EXTRACT(EPOCH FROM e.start_time::timestamp)::bigint,
+           CASE WHEN strpos(p.description, 'Zeitkonto Abzug') > 0 THEN e.id ELSE 0 END
+    FROM entries e
+    LEFT JOIN projects p ON p.id = e.project_id
+    WHERE e.id > %s;
+"""
+# Indizes, die hcwr auf heco time.db benötigt (hcwr_index_mod, nur mit [Database] create_indexes = true)
+create_indexes = {
+    "idx_hcwr_entries_start": """
+        CREATE INDEX IF NOT EXISTS idx_hcwr_entries_start ON entries (start_time, stop_time, project_id);
+    """,
+    "idx_hcwr_entries_stop": """
+        CREATE INDEX IF NOT EXISTS idx_hcwr_entries_stop ON entries (stop_time);
+    """,
+    "idx_hcwr_entries_project_start": """
+        CREATE INDEX IF NOT EXISTS idx_hcwr_entries_project_start ON entries (project_id, start_time);
+    """,
+}
+index_select = """
+    SELECT indexname FROM pg_indexes WHERE tablename = %s;
+"""
 entry_update = """
-    UPDATE entries SET description = %s WHERE description = %s AND date(start_time BETWEEN %s AND %s;
+    UPDATE entries SET description = %s WHERE description = %s AND date(start_time) BETWEEN %s AND %s;
 """
 
 check_db_key_structure = """
@@ -267,7 +316,7 @@ create_contracts_tbl = """
 """
 
 entry_update = """
-    UPDATE entries SET description = %s WHERE description = %s AND date(start_time BETWEEN %s AND %s;
+    UPDATE entries SET description = %s WHERE description = %s AND date(start_time) BETWEEN %s AND %s;
 """
 create_entries_tbl = """
     CREATE TABLE IF NOT EXISTS entries (
@@ -316,3 +365,18 @@ jobtime_entries = f"""
     FROM projects p
     LEFT JOIN entries e ON e.project_id = p.id
 """
+# --stream ndjson|csv (hcwr_tasks_mod.stream_job_entries): nur Zeilen mit Eintrag, in der Reihenfolge
+# der Einträge wie 'hcwr -J -a' (SELECT * FROM entries)
+jobtime_entries_stream = f"""
+    SELECT
+        e.id AS id,
+        {PROJECT_EXPR} AS project,
+        e.start_time AS start_time,
+        e.stop_time AS stop_time,
+        e.description AS description
+    FROM entries e
+    JOIN projects p ON p.id = e.project_id
+"""
+jobtime_entries_stream_order = """
+    ORDER BY e.id
+"""
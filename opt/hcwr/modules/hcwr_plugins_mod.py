@@ -15,12 +15,10 @@
 # https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit    
 # Header added by https://github.com/GhostCoder74/Set-Project-Headers                         
 # -----------------------------------------------------------------------------------------
-import subprocess
 import sys
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 from decimal import Decimal, InvalidOperation
-import json
 import colorama
 from colorama import Fore, Style
 
@@ -28,6 +26,8 @@ from colorama import Fore, Style
 from hcwr_globals_mod import HCWR_GLOBALS
 from hcwr_dbg_mod import debug, info, warning, get_function_name, debug_sql, show_process_route
 from hcwr_utils_mod import get_wday_short_name, add_decimal_hours, command_exists
+from hcwr_holiday_mod import get_holidays_of_week, get_holiday_name, get_holiday_dates
+from hcwr_settings_mod import get_settings
 
 # set public holidays for this and next week
 
@@ -43,6 +43,15 @@ def insert_holiday_entries(db_connection, year, reference_date=None):
 
     fname = get_function_name()
 
+    # hcwr --weeks: die Feiertage um das Referenzdatum nur einmal je Lauf und Datenbank eintragen
+    done = HCWR_GLOBALS.HOLIDAY_ENTRIES_DONE
+    key = (str(HCWR_GLOBALS.args.database), reference_date)
+    if done is not None:
+        if key in done:
+            debug(f"Feiertage bereits eingetragen: {key}")
+            return {"inserted_current_week": [], "inserted_next_week": []}
+        done.add(key)
+
     # Feiertage ermitteln
     weeks = get_holidays_this_and_next_week(year, reference_date)
 
@@ -68,9 +77,7 @@ def insert_holiday_entries(db_connection, year, reference_date=None):
         fn = get_function_name()
         start_ts = f"{date_str} 00:00:00"
         wdname = get_wday_short_name(date_str)
-        wdayhours = Decimal("8.0")
-        if HCWR_GLOBALS.CFG.has_option("Workdays", wdname):
-            wdayhours = Decimal(HCWR_GLOBALS.CFG.get("Workdays", wdname))
+        wdayhours = get_settings().get_workday_hours(wdname, Decimal("8.0"))
         stop_ts = add_decimal_hours(start_ts, wdayhours)
         desc     = f"Feiertag: {name}"
 
@@ -102,81 +109,33 @@ def insert_holiday_entries(db_connection, year, reference_date=None):
     else:
         return result
 
-# geaCal Implementierung für Feiertags Entries
+# Feiertags Entries aus dem Feiertagskalender (hcwr_holiday_mod)
 def get_holidays_this_and_next_week(year, reference_date=None):
     """
-    Ruft geaCal auf, holt die JSON-Feiertage und gibt die Feiertage
-    der aktuellen und der nächsten ISO-Woche zurück.
+    Gibt die Feiertage der aktuellen und der nächsten ISO-Woche zurück.
+    Die Feiertage kommen aus hcwr_holiday_mod (native oder geaCal höchstens einmal pro Jahr).
     """
     fname = get_function_name()
 
-    # Pre-define of result
-    result = {
-        "current_week": [],
-        "next_week": []
-    }
-
-    if not reference_date is None:
-        year = datetime.strptime(reference_date, "%Y-%m-%d").date().year
-
-    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-        info(f"{fname}:\nresult = {result}")
-
-    # Checking for geaCal exists
-    if not command_exists("geaCal"):
-        warning("Plugin geaCal not found!", "No holyday check possible!")
-        return result
-
-    # --- 1. geaCal ausführen ---
-    try:
-        output = subprocess.check_output(
-            ["geaCal", "-l", "-y", str(year), "-j"],
-            text=True
-        )
-    except Exception as e:
-        raise RuntimeError(f"geaCal konnte nicht ausgeführt werden: {e}")
-
-    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-        info(f"output = {output}")
-    # --- 2. JSON parsen ---
-    try:
-        data = json.loads(output)
-        holidays = data.get("holidays", [])
-    except Exception as e:
-        raise ValueError(f"Ungültiges JSON von geaCal erhalten: {e}")
-
-    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-        info(f"data = {data}")
-    # --- 3. Referenzdatum bestimmen ---
     if reference_date is None:
         reference_date = date.today()
     elif isinstance(reference_date, str):
         reference_date = datetime.strptime(reference_date, "%Y-%m-%d").date()
 
+    # Jahreswechsel (auch KW 53) über das Datum der nächsten Woche
     year_now, week_now, _ = reference_date.isocalendar()
-    next_week = week_now + 1
-    next_year = year_now
-
-    # Jahreswechsel berücksichtigen
-    if next_week > 52:
-        next_week = 1
-        next_year += 1
+    next_year, next_week, _ = (reference_date + timedelta(days=7)).isocalendar()
 
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-        info(f"year_now = {year_now}")
+        info(f"{fname}:\nyear_now = {year_now}")
         info(f"week_now = {week_now}")
         info(f"next_week = {next_week}")
         info(f"next_year = {next_year}")
 
-    # --- 4. Feiertage der beiden Wochen filtern ---
-    for hdate_str, name in holidays:
-        hdate = datetime.strptime(hdate_str, "%Y-%m-%d").date()
-        hy, hw, _ = hdate.isocalendar()
-
-        if hy == year_now and hw == week_now:
-            result["current_week"].append((hdate_str, name))
-        elif hy == next_year and hw == next_week:
-            result["next_week"].append((hdate_str, name))
+    result = {
+        "current_week": get_holidays_of_week(year_now, week_now),
+        "next_week": get_holidays_of_week(next_year, next_week)
+    }
 
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         info(f"{fname}:\nresult = {result}")
@@ -193,8 +152,8 @@ def date_to_ymd(date_obj):
     
 def is_feiertag(date_obj, cursor):
     """
-    Prüft, ob 'date_obj' ein Feiertag ist, basierend auf
-    get_holidays_this_and_next_week().
+    Prüft, ob 'date_obj' ein Feiertag ist: erst im Feiertagskalender
+    (hcwr_holiday_mod), danach auf manuell eingetragene Feiertage.
     """
 
     fname = get_function_name()
@@ -203,6 +162,8 @@ def is_feiertag(date_obj, cursor):
         date_obj = datetime.strptime(date_obj, "%Y-%m-%d").date()
         year = date_obj.year
     elif isinstance(date_obj, date):
+        if isinstance(date_obj, datetime):
+            date_obj = date_obj.date()
         year = date_obj.year
     else:
         warning(f"Wrong format of date: {date_obj}")
@@ -213,65 +174,47 @@ def is_feiertag(date_obj, cursor):
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         info(f"{fname}:\ndate_str = {date_str}")
 
-    holidays_dict = get_holidays_this_and_next_week(year, date_str )
-    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-        info(f"holidays_dict = {holidays_dict}")
-
-    if float(HCWR_GLOBALS.CFG.get("Workdays", get_wday_short_name(date_str))) == float(0):
+    if get_settings().workday_hours[get_wday_short_name(date_str)] == 0:
         if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
             info(f"date_str = {date_str}\nreturn 2")
         else:
             return 2
-        
-    # In beiden Wochen suchen
-    for week in ("current_week", "next_week"):
-        if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-            info(f"week = {week}")
-        
-        hdict = holidays_dict.get(week, [])
-        if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-            info(f"hdict = {hdict}")
-        if not hdict:
-            def check_for_manuell_inserted_hdays(dstr):
-                fn = get_function_name()
-                fid = HCWR_GLOBALS.INTERN_PROJEKT_ID_MAP.get('Feiertag')[0]
-                exists_sql = HCWR_GLOBALS.DB_QUERIES.LOA_exists_sql
-                cursor.execute(exists_sql, (dstr, fid))
-                row = cursor.fetchone()
-                if fn in HCWR_GLOBALS.DBG_BREAK_POINT:
-                    info(f"{fn}:\ndate_str = {dstr}, row = {row[1]}")
-                    show_process_route()
-                    sys.exit(0)
-                if row:
-                    info(f"Manuellen Eintrag für Feiertag gefunden: " + 
-                    Fore.MAGENTA + 
-                    dstr + Fore.WHITE + " ist " +
-                    Fore.MAGENTA + row[1])
-                    return dstr
-                return False    
-
-            cres =  check_for_manuell_inserted_hdays(date_str)
-            if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-                info(f"cres = {cres}")
-            return cres
 
+    # Feiertag laut Feiertagskalender (native oder geaCal): Lookup im Jahres-Set
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"hname = {get_holiday_name(date_obj)}")
+    if date_obj in get_holiday_dates(year):
+        if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+            info(f"return {date_str}")
         else:
-            for hdate, _ in holidays_dict.get(week, []):
-                if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-                    info(f"hdate = {hdate}")
-                if hdate == date_str:
-                    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-                        info(f"hdate = {hdate}")
-                        info(f"return {hdate}")
-                    else:
-                        return hdate
+            return date_str
 
+    def check_for_manuell_inserted_hdays(dstr):
+        fn = get_function_name()
+        fid = HCWR_GLOBALS.INTERN_PROJEKT_ID_MAP.get('Feiertag')[0]
+        exists_sql = HCWR_GLOBALS.DB_QUERIES.LOA_exists_sql
+        cursor.execute(exists_sql, (dstr, fid))
+        row = cursor.fetchone()
+        if fn in HCWR_GLOBALS.DBG_BREAK_POINT:
+            info(f"{fn}:\ndate_str = {dstr}, row = {row}")
+            show_process_route()
+            sys.exit(0)
+        if row:
+            info(f"Manuellen Eintrag für Feiertag gefunden: " + 
+            Fore.MAGENTA + 
+            dstr + Fore.WHITE + " ist " +
+            Fore.MAGENTA + row[1])
+            return dstr
+        return False    
+
+    cres =  check_for_manuell_inserted_hdays(date_str)
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"cres = {cres}")
         show_process_route()
-        info(f"return status: False")
+        info(f"return status: {cres}")
         sys.exit(0)
 
-    return False
+    return cres
 
 def insert_LOA_entries(db_connection, hstart_date, pname="Urlaub", hstop_date=None, DEL_MODE=False, H=None, M=None):
     """
@@ -440,9 +383,7 @@ def insert_LOA_entries(db_connection, hstart_date, pname="Urlaub", hstop_date=No
             PH_labeldesc = row[1]
 
             wdname = get_wday_short_name(date_str)
-            wdayhours = Decimal("8.0")
-            if HCWR_GLOBALS.CFG.has_option("Workdays", wdname):
-                wdayhours = Decimal(HCWR_GLOBALS.CFG.get("Workdays", wdname))
+            wdayhours = get_settings().get_workday_hours(wdname, Decimal("8.0"))
 
             # DEL_MODE = True → Feiertag wieder normale Stunden
             if DEL_MODE:
@@ -558,9 +499,7 @@ def insert_LOA_entries(db_connection, hstart_date, pname="Urlaub", hstop_date=No
         wdname = get_wday_short_name(date_str)
 
         # Arbeitsstunden des Wochentags bestimmen
-        wdayhours = Decimal("8.0")
-        if HCWR_GLOBALS.CFG.has_option("Workdays", wdname):
-            wdayhours = Decimal(HCWR_GLOBALS.CFG.get("Workdays", wdname))
+        wdayhours = get_settings().get_workday_hours(wdname, Decimal("8.0"))
 
         # No work day → no entry saving!
         if wdayhours == 0:
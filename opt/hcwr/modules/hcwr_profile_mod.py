@@ -0,0 +1,210 @@
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           hcwr_profile_mod.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+#
+# Laufprofil für --profile[=out.json]: bin/hcwr markiert mit profile_phase() die Phasen eines
+# Berichts (an den Stellen der progress_bar Schritte), je Phase werden Dauer, Anzahl und
+# Laufzeit der SQL-Statements aller Verbindungen aus get_connection() erfasst, dazu die
+# teuersten Abfragen und das Slow-Query-Log aus ../modules/hcwr_sqlstats_mod.py
+# (--profile-explain mit EXPLAIN QUERY PLAN). Optional schreibt --profile-pstats eine
+# cProfile Datei und --profile-malloc N die N größten Allokationen laut tracemalloc.
+# Die Auswertung läuft beim Beenden (atexit), auch nach show_process_route().
+import sys
+import json
+import time
+import atexit
+from colorama import Fore, Style
+
+# Import von eigenem Module
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbg_mod import info, warning, get_function_name
+from hcwr_sqlstats_mod import get_sql_stats, format_sql_stats
+
+# Phasen des Berichtslaufs in bin/hcwr und ihre Bezeichnung in der Ausgabe
+PHASE_LABELS = {
+    "config": "Config und Migration",
+    "job_entries": "Job-Einträge (-J)",
+    "complete": "Vollständigkeitsprüfung",
+    "absence_entry": "Abwesenheit eintragen (-A)",
+    "totals": "Projektsummen",
+    "uuk": "UK/UUK Aufteilung",
+    "weekdays": "Wochentagsstunden",
+    "absences": "Abwesenheiten",
+    "overtime": "Überstunden-Historie",
+    "render": "Bericht erstellen",
+    "output": "Ausgabe",
+}
+
+class RunProfile:
+    """
+    Dauer und SQL-Statements je Phase eines hcwr Laufs.
+
+    Phasen folgen nacheinander, phase(name) beendet die laufende Phase. Mehrfach
+    betretene Phasen werden zusammengezählt.
+    """
+
+    def __init__(self, json_path=None, pstats_path=None, malloc_top=None, explain=False):
+        self.json_path = json_path
+        self.pstats_path = pstats_path
+        self.malloc_top = malloc_top
+        self.explain = explain
+        self.phases = {}
+        self.current = None
+        self.started = time.perf_counter()
+        self.phase_started = self.started
+        self.profiler = None
+
+    def phase(self, name):
+        now = time.perf_counter()
+        if self.current is not None:
+            self.phases[self.current]["seconds"] += now - self.phase_started
+        self.current = name
+        self.phase_started = now
+        if name is not None:
+            self.phases.setdefault(name, {"seconds": 0.0, "sql": 0, "sql_seconds": 0.0, "pbar": HCWR_GLOBALS.PBAR_VAL})
+
+    def count_statement(self, seconds):
+        if self.current is not None:
+            self.phases[self.current]["sql"] += 1
+            self.phases[self.current]["sql_seconds"] += seconds
+
+    def result(self):
+        total = time.perf_counter() - self.started
+        phases = []
+        for name, values in self.phases.items():
+            phases.append({
+                "name": name,
+                "label": PHASE_LABELS.get(name, name),
+                "ms": round(values["seconds"] * 1000, 2),
+                "sql": values["sql"],
+                "sql_ms": round(values["sql_seconds"] * 1000, 2),
+                "pbar": values["pbar"],
+            })
+        return {
+            "proc": HCWR_GLOBALS.PROC_NAME,
+            "argv": sys.argv[1:],
+            "year": getattr(HCWR_GLOBALS.args, "year", None),
+            "week": getattr(HCWR_GLOBALS.args, "week", None),
+            "total_ms": round(total * 1000, 2),
+            "sql_total": sum(p["sql"] for p in phases),
+            "sql_ms": round(sum(p["sql_ms"] for p in phases), 2),
+            "phases": phases,
+            "queries": [{"name": name, "count": count, "ms": round(seconds * 1000, 2)}
+                        for name, count, seconds in get_sql_stats().top(20)],
+            "slow_queries": [{"name": name, "n": n, "ms": round(seconds * 1000, 2)}
+                             for seconds, n, name, sql, params, target in get_sql_stats().slowest()],
+        }
+
+def start_profile(json_path=None, pstats_path=None, malloc_top=None, explain=False):
+    """
+    Startet das Laufprofil, die erste Phase ist "config".
+
+    Parameter:
+        json_path:   Ergebnis zusätzlich als JSON schreiben
+        pstats_path: cProfile Statistik für pstats/snakeviz schreiben
+        malloc_top:  Anzahl der größten Allokationen (tracemalloc) in der Ausgabe
+        explain:     EXPLAIN QUERY PLAN für die langsamsten Abfragen ausgeben (nur SQLite)
+    """
+    fname = get_function_name()
+
+    profile = RunProfile(json_path or None, pstats_path, malloc_top, explain)
+    HCWR_GLOBALS.PROFILE = profile
+    if malloc_top:
+        import tracemalloc
+        tracemalloc.start()
+    if pstats_path:
+        import cProfile
+        profile.profiler = cProfile.Profile()
+        profile.profiler.enable()
+    profile.phase("config")
+    atexit.register(finish_profile)
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\njson_path = {json_path}\npstats_path = {pstats_path}\nmalloc_top = {malloc_top}")
+
+def profile_phase(name):
+    """Beendet die laufende Phase und startet 'name', ohne --profile ohne Wirkung."""
+    if HCWR_GLOBALS.PROFILE is not None:
+        HCWR_GLOBALS.PROFILE.phase(name)
+
+def get_malloc_top(limit):
+    """Die 'limit' größten Allokationen je Quelltextzeile als list of dict."""
+    import tracemalloc
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    top = []
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        top.append({"where": f"{frame.filename}:{frame.lineno}", "kib": round(stat.size / 1024, 1), "count": stat.count})
+    return top
+
+def print_profile(result, explain=False):
+    """Gibt das Laufprofil als Tabelle auf stderr aus."""
+    if HCWR_GLOBALS.PBAR_VAL > 1 and HCWR_GLOBALS.PBAR_VAL != HCWR_GLOBALS.PBAR_MAX:
+        sys.stderr.write("\r" + " "*80 + "\r")
+    total = result["total_ms"] or 1
+    print(Fore.CYAN + "\nPROFIL " + Style.RESET_ALL + f"{result['proc']} {' '.join(result['argv'])}", file=sys.stderr)
+    print(f"{'Phase':<28} | {'Zeit ms':>9} | {'Anteil':>6} | {'SQL':>5} | {'SQL ms':>8}", file=sys.stderr)
+    print("-" * 28 + "-+-" + "-" * 9 + "-+-" + "-" * 6 + "-+-" + "-" * 5 + "-+-" + "-" * 8, file=sys.stderr)
+    for p in result["phases"]:
+        print(f"{p['label']:<28} | {p['ms']:>9.1f} | {p['ms'] / total:>6.1%} | {p['sql']:>5} | {p['sql_ms']:>8.1f}", file=sys.stderr)
+    print("-" * 28 + "-+-" + "-" * 9 + "-+-" + "-" * 6 + "-+-" + "-" * 5 + "-+-" + "-" * 8, file=sys.stderr)
+    print(Style.BRIGHT + f"{'Gesamt':<28} | {result['total_ms']:>9.1f} | {'':>6} | {result['sql_total']:>5} | {result['sql_ms']:>8.1f}" + Style.RESET_ALL, file=sys.stderr)
+    if result["sql_total"]:
+        print(Fore.CYAN + "\nSQL je Abfrage" + Style.RESET_ALL, file=sys.stderr)
+        for line in format_sql_stats(get_sql_stats(), 10, explain):
+            print(line, file=sys.stderr)
+    if result.get("malloc_top"):
+        print(Fore.CYAN + "\nGrößte Allokationen (tracemalloc)" + Style.RESET_ALL, file=sys.stderr)
+        for m in result["malloc_top"]:
+            print(f"{m['kib']:>10.1f} KiB {m['count']:>7} x  {m['where']}", file=sys.stderr)
+
+def finish_profile():
+    """atexit: letzte Phase beenden, Profil ausgeben und Dateien schreiben."""
+    fname = get_function_name()
+
+    profile = HCWR_GLOBALS.PROFILE
+    if profile is None:
+        return
+    HCWR_GLOBALS.PROFILE = None
+    profile.phase(None)
+    if profile.profiler is not None:
+        profile.profiler.disable()
+
+    result = profile.result()
+    if profile.malloc_top:
+        result["malloc_top"] = get_malloc_top(profile.malloc_top)
+    if profile.pstats_path:
+        try:
+            profile.profiler.dump_stats(profile.pstats_path)
+            result["pstats"] = profile.pstats_path
+        except OSError as e:
+            warning("cProfile Datei konnte nicht geschrieben werden:", e, "WARNUNG")
+
+    print_profile(result, profile.explain)
+    if profile.json_path:
+        try:
+            with open(profile.json_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2, ensure_ascii=False, default=str)
+            info("Profil geschrieben:", profile.json_path)
+        except OSError as e:
+            warning("Profil konnte nicht geschrieben werden:", e, "WARNUNG")
+    if profile.pstats_path and "pstats" in result:
+        info("cProfile geschrieben:", f"{profile.pstats_path} (python3 -m pstats {profile.pstats_path})")
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nresult = {result}")
@@ -22,6 +22,7 @@ import time
 
 from hcwr_globals_mod import HCWR_GLOBALS
 from hcwr_dbg_mod import debug, info, warning, get_function_name, show_process_route
+from hcwr_utils_mod import file_lock, write_file_if_changed
 
 def ssh_config_check():
     """
@@ -73,9 +74,9 @@ def ssh_config_check():
     else:
         info(f"🔎 'Host {HCWR_GLOBALS.SSH_HOST}' mit User-Eintrag bereits vorhanden. Keine Änderung nötig.")
 
-    # Datei zurückschreiben
-    with open(ssh_config_path, "w") as f:
-        f.writelines(config_lines)
+    # Datei nur zurückschreiben, wenn ein Block oder eine User-Zeile ergänzt wurde
+    with file_lock(ssh_config_path):
+        write_file_if_changed(ssh_config_path, "".join(config_lines))
 
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         show_process_route()
@@ -0,0 +1,132 @@
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           hcwr_settings_mod.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+#
+# Settings: die Werte aus HCWR_GLOBALS.CFG, die in Schleifen gebraucht werden
+# (dbms, Workdays, keyword_place, show_uuk, ...), einmal ausgewertet und typisiert.
+# Neu gebaut wird nur, wenn read_config_file() die Config-Datei wegen geänderter mtime
+# neu gelesen hat oder die Config über update_config() geschrieben wurde.
+import os
+from decimal import Decimal
+
+# Import von eigenem Module
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbg_mod import debug, info, get_function_name
+
+def get_config_stamp(path=None):
+    """(Pfad, mtime in ns) der Config-Datei, mtime None wenn sie (noch) nicht existiert."""
+    if path is None:
+        path = HCWR_GLOBALS.CFG_FILE
+    try:
+        return path, os.stat(path).st_mtime_ns
+    except OSError:
+        return path, None
+
+def read_config_file():
+    """
+    HCWR_GLOBALS.CFG.read(CFG_FILE), aber nur wenn sich die Datei seit dem letzten
+    Lesen geändert hat. Rückgabe True, wenn gelesen wurde.
+    """
+    stamp = get_config_stamp()
+    if stamp == HCWR_GLOBALS.CFG_READ_STAMP:
+        return False
+    HCWR_GLOBALS.CFG.read(stamp[0])
+    HCWR_GLOBALS.CFG_READ_STAMP = stamp
+    HCWR_GLOBALS.SETTINGS = None
+    return True
+
+def get_option(section, option, default=None):
+    if HCWR_GLOBALS.CFG.has_option(section, option):
+        return HCWR_GLOBALS.CFG.get(section, option)
+    return default
+
+def is_true(value, true_values=("true",)):
+    return value is not None and value.lower() in true_values
+
+class Settings:
+    """
+    Unveränderlicher, typisierter Auszug aus HCWR_GLOBALS.CFG.
+
+    Attribute:
+        dbms, is_pg, dbpath, keyword_place, week_filter, create_indexes, fts_index,
+        show_uuk, insert_tasks, holiday_source, holiday_state, firstday, weekhours, weekhours_seconds,
+        workday_hours {Tag: Decimal} (nur gesetzte Tage) und
+        workday_seconds (Mo..So, nicht gesetzte Tage = 0)
+    """
+
+    def __init__(self, stamp):
+        set_attr = super().__setattr__
+        set_attr("path", stamp[0])
+        set_attr("mtime", stamp[1])
+
+        dbms = get_option("Database", "dbms")
+        set_attr("dbms", dbms)
+        set_attr("is_pg", dbms == "pg")
+        set_attr("dbpath", get_option("Database", "dbpath"))
+        set_attr("keyword_place", get_option("Database", "keyword_place"))
+        set_attr("week_filter", get_option("Database", "week_filter"))
+        set_attr("create_indexes", is_true(get_option("Database", "create_indexes"), ("true", "yes", "1", "on")))
+        set_attr("fts_index", is_true(get_option("Database", "fts_index"), ("true", "yes", "1", "on")))
+        set_attr("show_uuk", is_true(get_option("General", "show_uuk")))
+        set_attr("insert_tasks", is_true(get_option("General", "insert_tasks")))
+        set_attr("holiday_source", get_option("General", "holiday_source"))
+        set_attr("holiday_state", get_option("General", "holiday_state"))
+        set_attr("firstday", get_option("Onboarding", "firstday"))
+
+        weekhours = get_option("General", "weekhours")
+        set_attr("weekhours", float(weekhours) if weekhours is not None else None)
+        set_attr("weekhours_seconds", int(float(weekhours) * 3600) if weekhours is not None else None)
+
+        # Decimal aus dem String, wie bisher Decimal(CFG.get("Workdays", ...)) in ../modules/hcwr_plugins_mod.py
+        workday_hours = {}
+        for day in HCWR_GLOBALS.WEEKDAYS:
+            value = get_option("Workdays", day)
+            if value is not None:
+                workday_hours[day] = Decimal(value)
+        set_attr("workday_hours", workday_hours)
+        set_attr("workday_seconds", tuple(int(workday_hours.get(day, 0) * 3600) for day in HCWR_GLOBALS.WEEKDAYS))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Settings sind unveränderlich: {name}")
+
+    def get_workday_hours(self, day, default=None):
+        """Arbeitsstunden eines Wochentags ('Mo'..'So') aus [Workdays] oder default."""
+        return self.workday_hours.get(day, default)
+
+def get_settings():
+    """
+    Liefert die Settings zu HCWR_GLOBALS.CFG, in Schleifen nur ein Attributzugriff.
+    Neu gebaut wird, wenn read_config_file() eine geänderte Config-Datei gelesen hat
+    oder update_config() sie geschrieben hat (reset_settings()).
+    """
+    settings = HCWR_GLOBALS.SETTINGS
+    if settings is not None:
+        return settings
+
+    fname = get_function_name()
+
+    settings = Settings(get_config_stamp())
+    HCWR_GLOBALS.SETTINGS = settings
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nsettings = {vars(settings)}")
+    debug(f"Settings geladen aus {settings.path}")
+    return settings
+
+def reset_settings():
+    """Verwirft die Settings, z. B. nachdem CFG im Speicher geändert wurde."""
+    HCWR_GLOBALS.SETTINGS = None
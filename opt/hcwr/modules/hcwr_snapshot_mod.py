@@ -0,0 +1,168 @@
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           hcwr_snapshot_mod.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+#
+# WeekSnapshot: lädt die Einträge einer ISO-Woche und die Tabelle projects einmal und
+# berechnet daraus im Speicher, was bisher einzelne Abfragen geliefert haben:
+#   get_project_totals()     -> total_per_project_by_week
+#   get_uuk_rows()           -> tppbw_uuk (je Auftrag Unterkategorie)
+#   get_weekday_seconds()    -> wdayhours_sql + wdayhours_sql_excl
+#   get_absences()           -> absence (berechne_abwesenheiten, Temp-Prüfung)
+#   get_absence_weekdays()   -> week_absence_days
+# Einträge, die vor Montag beginnen und in der Woche enden, zählen wie in den Abfragen
+# nur bei Wochentagsstunden und Abwesenheiten mit.
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+
+# Import von eigenem Module
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbg_mod import debug, info, get_function_name
+
+# Projekte, die nicht zu den Wochentagsstunden zählen (wdayhours_sql_excl)
+WDAYHOURS_EXCL = ("feiertag", "urlaub", "krank", "privat", "zeitkonto")
+# Projekte für die Abwesenheitstage (week_absence_days)
+ABSENCE_DAYS = ("krank", "urlaub", "feiertag")
+
+def clean_description(desc):
+    """Entspricht REPLACE(REPLACE(p.description, '├─', ' '), '└─', ' ') der Abfragen."""
+    return desc.replace("├─", " ").replace("└─", " ") if desc is not None else desc
+
+def to_datetime(value):
+    """SQLite liefert Timestamps als String, PostgreSQL als datetime."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+class WeekSnapshot:
+    """
+    Alle Einträge einer ISO-Woche (Beginn oder Ende in [Montag, Montag der Folgewoche))
+    plus die Tabelle projects, mit einer Abfrage je Tabelle geladen.
+
+    Dauer in Sekunden wie in den Abfragen: SQLite ganze Sekunden (strftime('%s')),
+    PostgreSQL Decimal (EXTRACT(EPOCH ...)).
+    """
+
+    def __init__(self, conn, year, week):
+        fname = get_function_name()
+
+        self.year = int(year)
+        self.week = int(week)
+        self.monday = datetime.combine(date.fromisocalendar(self.year, self.week, 1), datetime.min.time())
+        self.next_monday = self.monday + timedelta(days=7)
+        start, stop = self.monday.strftime("%Y-%m-%d"), self.next_monday.strftime("%Y-%m-%d")
+
+        cursor = conn.cursor()
+        cursor.execute(HCWR_GLOBALS.DB_QUERIES.snapshot_projects)
+        # (id, key, description) aufsteigend nach id
+        self.projects = sorted(cursor.fetchall(), key=lambda p: p[0])
+        self.project_desc = {pid: desc for pid, key, desc in self.projects}
+
+        cursor.execute(HCWR_GLOBALS.DB_QUERIES.snapshot_entries, (start, stop, start, stop))
+        self.entries = []
+        for entry_id, project_id, start_time, stop_time, description in cursor.fetchall():
+            # Einträge ohne Projekt fallen in den Abfragen durch den JOIN auf projects heraus
+            if project_id not in self.project_desc:
+                continue
+            start_dt = to_datetime(start_time)
+            stop_dt = to_datetime(stop_time)
+            if isinstance(start_time, str):
+                seconds = int((stop_dt.replace(microsecond=0) - start_dt.replace(microsecond=0)).total_seconds())
+            else:
+                seconds = Decimal(str((stop_dt - start_dt).total_seconds()))
+            self.entries.append({
+                "id": entry_id,
+                "project_id": project_id,
+                "start_time": start_time,
+                "start": start_dt,
+                "seconds": seconds,
+                "description": description,
+                # Beginn in der KW (total_per_project_by_week, tppbw_uuk)
+                "in_week": self.monday <= start_dt.replace(tzinfo=None) < self.next_monday,
+            })
+
+        if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+            info(f"{fname}:\nprojects = {len(self.projects)}, entries = {len(self.entries)}")
+        debug(f"WeekSnapshot {self.year}/{self.week}: {len(self.entries)} Einträge, {len(self.projects)} Projekte")
+
+    def matches(self, year, week):
+        return (self.year, self.week) == (int(year), int(week))
+
+    def project_matches(self, project_id, words):
+        desc = (self.project_desc.get(project_id) or "").lower()
+        return any(word in desc for word in words)
+
+    def get_project_totals(self):
+        """Wie total_per_project_by_week: [(description, Sekunden)] für alle Projekte, id absteigend."""
+        totals = {}
+        for e in self.entries:
+            if e["in_week"]:
+                totals[e["project_id"]] = totals.get(e["project_id"], 0) + e["seconds"]
+        return [(clean_description(desc), totals.get(pid, 0)) for pid, key, desc in reversed(self.projects)]
+
+    def get_uuk_rows(self, project_id):
+        """
+        Wie tppbw_uuk: [(start_time, id, entry, description, Sekunden)] nach Beginn sortiert.
+        Ohne Einträge eine Zeile mit None (LEFT JOIN), sofern es das Projekt gibt.
+        """
+        desc = clean_description(self.project_desc.get(int(project_id)))
+        rows = [(e["start_time"], e["id"], e["description"], desc, e["seconds"])
+                for e in self.entries if e["in_week"] and e["project_id"] == int(project_id)]
+        if not rows and int(project_id) in self.project_desc:
+            rows = [(None, None, None, desc, 0)]
+        return rows
+
+    def get_weekday_seconds(self):
+        """Wie wdayhours_sql + wdayhours_sql_excl: (Mo, Di, Mi, Do, Fr, Sa, So, KW_Total) in Sekunden."""
+        days = [0] * 7
+        for e in self.entries:
+            if not self.project_matches(e["project_id"], WDAYHOURS_EXCL):
+                days[e["start"].weekday()] += e["seconds"]
+        return tuple(days) + (sum(days),)
+
+    def get_absences(self):
+        """Wie absence + berechne_abwesenheiten: Sekunden je Schlüssel aus HCWR_GLOBALS.MAPPING."""
+        result = {key: 0 for key in HCWR_GLOBALS.MAPPING}
+        for e in self.entries:
+            desc = (clean_description(self.project_desc.get(e["project_id"])) or "").strip()
+            for key, keywords in HCWR_GLOBALS.MAPPING.items():
+                if any(desc.startswith(word) for word in keywords):
+                    result[key] += e["seconds"]
+                    break
+        return result
+
+    def get_absence_weekdays(self):
+        """Wie week_absence_days: Wochentage ('1' = Mo, ..., '7' = So) mit Krank/Urlaub/Feiertag."""
+        return {str(e["start"].isoweekday()) for e in self.entries
+                if self.project_matches(e["project_id"], ABSENCE_DAYS)}
+
+    def rename_entry(self, old, new):
+        """Nachziehen von entry_update, wenn ein Eintrag während des Berichts korrigiert wird."""
+        for e in self.entries:
+            if e["in_week"] and e["description"] == old:
+                e["description"] = new
+
+def load_week_snapshot(conn, year, week):
+    """Lädt den WeekSnapshot für year/week und legt ihn in HCWR_GLOBALS.WEEK_SNAPSHOT ab."""
+    HCWR_GLOBALS.WEEK_SNAPSHOT = WeekSnapshot(conn, year, week)
+    return HCWR_GLOBALS.WEEK_SNAPSHOT
+
+def get_week_snapshot(year, week):
+    """Geladener WeekSnapshot für year/week oder None (dann fragen die Funktionen die DB ab)."""
+    snapshot = HCWR_GLOBALS.WEEK_SNAPSHOT
+    if snapshot is not None and snapshot.matches(year, week):
+        return snapshot
+    return None
@@ -59,8 +59,11 @@ get_last_record_of_eintries_today = """
     ORDER BY start_time DESC, id DESC
     LIMIT 1
 """
+# Anzahl Einträge je Tag im Zeitraum [von, bis), eine Abfrage für eine oder mehrere Wochen
 week_complete = """
-    SELECT count(*) FROM entries WHERE start_time >= ? AND start_time < ?;
+    SELECT date(start_time) AS day, count(*) FROM entries
+    WHERE start_time >= ? AND start_time < ?
+    GROUP BY date(start_time)
 """
 
 total_per_project = """
@@ -72,12 +75,23 @@ total_per_project = """
     GROUP BY p.id, p.key, p.description
     ORDER BY p.id DESC;
 """
+# WeekSnapshot (hcwr_snapshot_mod): projects und alle Einträge mit Beginn oder Ende in der KW
+snapshot_projects = """
+    SELECT id, key, description FROM projects ORDER BY id;
+"""
+snapshot_entries = """
+    SELECT e.id, e.project_id, e.start_time, e.stop_time, e.description
+    FROM entries e
+    WHERE (e.start_time >= ? AND e.start_time < ?)
+       OR (e.stop_time >= ? AND e.stop_time < ?)
+    ORDER BY e.start_time, e.id;
+"""
 total_per_project_by_week = """
     SELECT
         REPLACE(REPLACE(p.description, '├─', ' '), '└─', ' ') AS description,
         COALESCE(SUM(strftime('%s', e.stop_time) - strftime('%s', e.start_time)), 0) AS total_duration
     FROM projects p
-    LEFT JOIN entries e ON e.project_id = p.id AND date(e.start_time) BETWEEN ? AND ?
+    LEFT JOIN entries e ON e.project_id = p.id AND e.start_time >= ? AND e.start_time < ?
     GROUP BY p.id, p.key, p.description
     ORDER BY p.id DESC;
 """
@@ -94,7 +108,7 @@ tppbw_uuk = """
     FROM projects p
     LEFT JOIN entries e 
         ON e.project_id = p.id
-       AND DATE(e.start_time) BETWEEN ? AND ?
+       AND e.start_time >= ? AND e.start_time < ?
     WHERE p.id = ?
     ORDER BY e.start_time;
 """
@@ -104,7 +118,7 @@ whours_sql = """
         SUM((strftime('%s', e.stop_time) - strftime('%s', e.start_time)) / 3600.0) AS KW_Total
     FROM projects p
     LEFT JOIN entries e ON e.project_id = p.id
-        AND (isoweek(date(e.start_time), ?, ?) OR isoweek(date(e.stop_time), ?, ?))
+        AND ((e.start_time >= ? AND e.start_time < ?) OR (e.stop_time >= ? AND e.stop_time < ?))
     WHERE strftime('%w', e.start_time) BETWEEN '0' AND '6' 
 """
 
@@ -135,7 +149,7 @@ wdayhours_sql = """
         SUM((strftime('%s', e.stop_time) - strftime('%s', e.start_time))) AS KW_Total
     FROM projects p
     LEFT JOIN entries e ON e.project_id = p.id
-        AND (isoweek(date(e.start_time), ?, ?) OR isoweek(date(e.stop_time), ?, ?))
+        AND ((e.start_time >= ? AND e.start_time < ?) OR (e.stop_time >= ? AND e.stop_time < ?))
     WHERE strftime('%w', e.start_time) BETWEEN '0' AND '6' 
 """
 
@@ -153,17 +167,80 @@ absence = """
         COALESCE(SUM(strftime('%s', e.stop_time) - strftime('%s', e.start_time)), 0) AS stunden
     FROM projects p
     LEFT JOIN entries e ON e.project_id = p.id
-    WHERE (isoweek(date(e.start_time), ?, ?) OR isoweek(date(e.stop_time), ?, ?))
+    WHERE ((e.start_time >= ? AND e.start_time < ?) OR (e.stop_time >= ? AND e.stop_time < ?))
     GROUP BY p.description;
 """
 
-wday_absence = """
+# Wochentage (strftime %w: 0 = So, 1 = Mo, ..., 6 = Sa) mit Krank/Urlaub/Feiertag Einträgen in der KW
+week_absence_days = """
+    SELECT DISTINCT CAST(strftime('%w', e.start_time) AS INTEGER) AS wday
+    FROM entries e
+    JOIN projects p ON p.id = e.project_id
+    WHERE ((e.start_time >= ? AND e.start_time < ?) OR (e.stop_time >= ? AND e.stop_time < ?))
+        AND (
+            p.description LIKE '%Krank%' OR
+            p.description LIKE '%Urlaub%' OR
+            p.description LIKE '%Feiertag%'
+        );
+"""
+
+# Kompatibilitäts-Fallback mit der Python UDF isoweek() (Config: [Database] week_filter = isoweek)
+# Ruft isoweek() für jede Zeile in entries auf, kein Index nutzbar -> Full Table Scan
+whours_sql_isoweek = """
     SELECT
-        COUNT(*) 
+        SUM((strftime('%s', e.stop_time) - strftime('%s', e.start_time)) / 3600.0) AS KW_Total
     FROM projects p
     LEFT JOIN entries e ON e.project_id = p.id
         AND (isoweek(date(e.start_time), ?, ?) OR isoweek(date(e.stop_time), ?, ?))
-    WHERE strftime('%w', e.start_time) = ?
+    WHERE strftime('%w', e.start_time) BETWEEN '0' AND '6' 
+"""
+
+wdayhours_sql_isoweek = """
+    -- So = 0, Mo = 1, ..., Sa = 6
+    SELECT
+        SUM(CASE strftime('%w', e.start_time)
+            WHEN '1' THEN (strftime('%s', e.stop_time) - strftime('%s', e.start_time))
+            ELSE 0 END) AS Mo,
+        SUM(CASE strftime('%w', e.start_time)
+            WHEN '2' THEN (strftime('%s', e.stop_time) - strftime('%s', e.start_time))
+            ELSE 0 END) AS Di,
+        SUM(CASE strftime('%w', e.start_time)
+            WHEN '3' THEN (strftime('%s', e.stop_time) - strftime('%s', e.start_time))
+            ELSE 0 END) AS Mi,
+        SUM(CASE strftime('%w', e.start_time)
+            WHEN '4' THEN (strftime('%s', e.stop_time) - strftime('%s', e.start_time))
+            ELSE 0 END) AS Do,
+        SUM(CASE strftime('%w', e.start_time)
+            WHEN '5' THEN (strftime('%s', e.stop_time) - strftime('%s', e.start_time))
+            ELSE 0 END) AS Fr,
+        SUM(CASE strftime('%w', e.start_time)
+            WHEN '6' THEN (strftime('%s', e.stop_time) - strftime('%s', e.start_time))
+            ELSE 0 END) AS Sa,
+        SUM(CASE strftime('%w', e.start_time)
+            WHEN '0' THEN (strftime('%s', e.stop_time) - strftime('%s', e.start_time))
+            ELSE 0 END) AS So,
+        SUM((strftime('%s', e.stop_time) - strftime('%s', e.start_time))) AS KW_Total
+    FROM projects p
+    LEFT JOIN entries e ON e.project_id = p.id
+        AND (isoweek(date(e.start_time), ?, ?) OR isoweek(date(e.stop_time), ?, ?))
+    WHERE strftime('%w', e.start_time) BETWEEN '0' AND '6' 
+"""
+
+absence_isoweek = """
+    SELECT
+        REPLACE(REPLACE(p.description, '├─', ' '), '└─', ' ') AS description,
+        COALESCE(SUM(strftime('%s', e.stop_time) - strftime('%s', e.start_time)), 0) AS stunden
+    FROM projects p
+    LEFT JOIN entries e ON e.project_id = p.id
+    WHERE (isoweek(date(e.start_time), ?, ?) OR isoweek(date(e.stop_time), ?, ?))
+    GROUP BY p.description;
+"""
+
+week_absence_days_isoweek = """
+    SELECT DISTINCT CAST(strftime('%w', e.start_time) AS INTEGER) AS wday
+    FROM entries e
+    JOIN projects p ON p.id = e.project_id
+    WHERE (isoweek(date(e.start_time), ?, ?) OR isoweek(date(e.stop_time), ?, ?))
         AND (
             p.description LIKE '%Krank%' OR
             p.description LIKE '%Urlaub%' OR
@@ -177,8 +254,174 @@ pid_by_description = """
 hcwrd_select = """
     SELECT * FROM entries WHERE project_id=? AND start_time BETWEEN ? AND ?
 """
+
+# Alle Einträge eines Zeitraums in einem Durchlauf für das Zeitkonto (hcwr_hcwrd_mod)
+overhours_entries = """
+    SELECT e.start_time, e.stop_time, p.description
+    FROM entries e
+    JOIN projects p ON p.id = e.project_id
+    WHERE e.start_time >= ? AND e.start_time < ?
+    ORDER BY e.start_time;
+"""
+
+# Fingerprint der entries Tabelle für das Zeitkonto-Ledger (hcwr_ledger_mod):
+# Anzahl, max(id), Summe project_id, Summe Sekunden, Summe Startzeit (Epoch) und Summe der ids
+# aller Einträge auf einem 'Zeitkonto Abzug' Projekt (Verschieben in andere KW, Umbenennen)
+ledger_entries_fingerprint = """
+    SELECT COUNT(*), COALESCE(MAX(e.id), 0), COALESCE(SUM(e.project_id), 0),
+           COALESCE(SUM(CAST(ROUND((julianday(e.stop_time) - julianday(e.start_time)) * 86400) AS INTEGER)), 0),
+           COALESCE(SUM(CAST(strftime('%s', e.start_time) AS INTEGER)), 0),
+           COALESCE(SUM(CASE WHEN instr(p.description, 'Zeitkonto Abzug') > 0 THEN e.id END), 0)
+    FROM entries e
+    LEFT JOIN projects p ON p.id = e.project_id;
+"""
+ledger_entries_since = """
+    SELECT e.start_time, e.project_id,
+           CAST(ROUND((julianday(e.stop_time) - julianday(e.start_time)) * 86400) AS INTEGER),
+           CAST(strftime('%s', e.start_time) AS INTEGER),
+           CASE WHEN instr(p.description, 'Zeitkonto Abzug') > 0 THEN e.id ELSE 0 END
+    FROM entries e
+    LEFT JOIN projects p ON p.id = e.project_id
+    WHERE e.id > ?;
+"""
+
+# FTS5 Volltextindex ~/.heco/hcwr_fts.db über entries.description und den Projektnamen (hcwr_fts_mod).
+# Die Datei wird per ATTACH als Schema hcwr_fts an die time.db Verbindung gehängt, rowid = entries.id.
+fts_create_tbl = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS hcwr_fts.entries_fts USING fts5(description, project, tokenize = 'trigram');
+    CREATE TABLE IF NOT EXISTS hcwr_fts.fts_meta (
+        key   TEXT PRIMARY KEY,
+        value TEXT
+    );
+"""
+fts_meta_select = """
+    SELECT key, value FROM hcwr_fts.fts_meta;
+"""
+fts_meta_upsert = """
+    INSERT OR REPLACE INTO hcwr_fts.fts_meta (key, value) VALUES (?, ?);
+"""
+fts_clear = """
+    DELETE FROM hcwr_fts.entries_fts;
+"""
+# Wasserzeichen: höchste entries.id, bis zu der der Index aufgebaut ist
+fts_entries_max_id = """
+    SELECT COALESCE(MAX(id), 0) FROM entries;
+"""
+# Prüfsumme der Einträge mit id im Bereich (?, ?]: Anzahl (Löschen), Summe id * project_id
+# (Verschieben) und die Texte für crc32 in hcwr_fts_mod (Ändern), in rowid-Reihenfolge
+fts_entries_checksum = """
+    SELECT COUNT(*), COALESCE(SUM(id * COALESCE(project_id, 0)), 0), group_concat(COALESCE(description, ''), char(31))
+    FROM entries
+    WHERE id > ? AND id <= ?;
+"""
+fts_projects_concat = """
+    SELECT group_concat(id || ':' || COALESCE(description, ''), char(31))
+    FROM (SELECT id, description FROM projects ORDER BY id);
+"""
+# Zeilen im Index, deren Eintrag gelöscht ist oder deren Text bzw. Projektname sich geändert hat
+fts_stale_rowids = """
+    SELECT f.rowid
+    FROM hcwr_fts.entries_fts f
+    LEFT JOIN entries e ON e.id = f.rowid
+    LEFT JOIN projects p ON p.id = e.project_id
+    WHERE e.id IS NULL
+       OR f.description IS NOT e.description
+       OR f.project IS NOT REPLACE(REPLACE(p.description, '├─ ', ''), '└─ ', '');
+"""
+fts_delete_rowid = """
+    DELETE FROM hcwr_fts.entries_fts WHERE rowid = ?;
+"""
+# Fehlende Einträge bis zum Wasserzeichen (nach fts_stale_rowids)
+fts_insert_missing = """
+    INSERT INTO hcwr_fts.entries_fts (rowid, description, project)
+    SELECT e.id, e.description, REPLACE(REPLACE(p.description, '├─ ', ''), '└─ ', '')
+    FROM entries e
+    LEFT JOIN projects p ON p.id = e.project_id
+    WHERE e.id <= ? AND e.id NOT IN (SELECT rowid FROM hcwr_fts.entries_fts);
+"""
+# Neue Einträge mit id im Bereich (?, ?]
+fts_insert_range = """
+    INSERT INTO hcwr_fts.entries_fts (rowid, description, project)
+    SELECT e.id, e.description, REPLACE(REPLACE(p.description, '├─ ', ''), '└─ ', '')
+    FROM entries e
+    LEFT JOIN projects p ON p.id = e.project_id
+    WHERE e.id > ? AND e.id <= ?;
+"""
+# Vorfilter in build_sql_from_search(), die LIKE/= Bedingung bleibt dahinter stehen
+fts_match = "e.id IN (SELECT rowid FROM hcwr_fts.entries_fts WHERE entries_fts MATCH ?)"
+# jobtime_entries für Suchen mit fts_match: von entries aus, damit SQLite die Treffer aus dem
+# Index per rowid liest. Projekte ohne Einträge liefern bei jobtime_entries nur NULL-Zeilen.
+# Sortiert wie jobtime_entries über (project_id, start_time) bzw. den automatischen Index.
+jobtime_entries_fts = """
+    SELECT
+        e.id AS id,
+        REPLACE(REPLACE(p.description, '├─ ', ''), '└─ ', '') AS project,
+        e.start_time AS start_time,
+        e.stop_time AS stop_time,
+        e.description AS description
+    FROM entries e
+    JOIN projects p ON p.id = e.project_id
+"""
+jobtime_entries_fts_order = """
+    ORDER BY p.id, e.start_time, e.id
+"""
+
+# Zeitkonto-Ledger ~/.heco/hcwr_ledger.db (immer SQLite, auch bei dbms = pg)
+ledger_create_tbl = """
+    CREATE TABLE IF NOT EXISTS ledger_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    CREATE TABLE IF NOT EXISTS ledger_weeks (
+        year INTEGER NOT NULL,
+        kw INTEGER NOT NULL,
+        worked INTEGER NOT NULL,
+        contract INTEGER NOT NULL,
+        zk_minus INTEGER NOT NULL,
+        balance INTEGER NOT NULL,
+        updated TEXT NOT NULL,
+        PRIMARY KEY (year, kw)
+    );
+"""
+ledger_meta_select = """
+    SELECT key, value FROM ledger_meta;
+"""
+ledger_meta_upsert = """
+    INSERT INTO ledger_meta (key, value) VALUES (?, ?)
+    ON CONFLICT(key) DO UPDATE SET value = excluded.value;
+"""
+ledger_weeks_select = """
+    SELECT kw, worked, contract, zk_minus, balance FROM ledger_weeks
+    WHERE year = ? AND kw BETWEEN ? AND ?
+    ORDER BY kw;
+"""
+ledger_week_upsert = """
+    INSERT INTO ledger_weeks (year, kw, worked, contract, zk_minus, balance, updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(year, kw) DO UPDATE SET
+        worked = excluded.worked, contract = excluded.contract, zk_minus = excluded.zk_minus,
+        balance = excluded.balance, updated = excluded.updated;
+"""
+ledger_weeks_delete = """
+    DELETE FROM ledger_weeks;
+"""
+# Indizes, die hcwr auf heco time.db benötigt (hcwr_index_mod, nur mit [Database] create_indexes = true)
+create_indexes = {
+    "idx_hcwr_entries_start": """
+        CREATE INDEX IF NOT EXISTS idx_hcwr_entries_start ON entries (start_time, stop_time, project_id);
+    """,
+    "idx_hcwr_entries_stop": """
+        CREATE INDEX IF NOT EXISTS idx_hcwr_entries_stop ON entries (stop_time);
+    """,
+    "idx_hcwr_entries_project_start": """
+        CREATE INDEX IF NOT EXISTS idx_hcwr_entries_project_start ON entries (project_id, start_time);
+    """,
+}
+index_select = """
+    SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?;
+"""
 entry_update = """
-    UPDATE entries SET description = ? WHERE description = ? AND date(start_time BETWEEN ? AND ?;
+    UPDATE entries SET description = ? WHERE description = ? AND date(start_time) BETWEEN ? AND ?;
 """
 
 check_db_key_structure = """
@@ -228,3 +471,18 @@ jobtime_entries = """
     FROM projects p
     LEFT JOIN entries e ON e.project_id = p.id
 """
+# --stream ndjson|csv (hcwr_tasks_mod.stream_job_entries): nur Zeilen mit Eintrag, in der Reihenfolge
+# der Einträge wie 'hcwr -J -a' (SELECT * FROM entries)
+jobtime_entries_stream = """
+    SELECT
+        e.id AS id,
+        REPLACE(REPLACE(p.description, '├─ ', ''), '└─ ', '') AS project,
+        e.start_time AS start_time,
+        e.stop_time AS stop_time,
+        e.description AS description
+    FROM entries e
+    JOIN projects p ON p.id = e.project_id
+"""
+jobtime_entries_stream_order = """
+    ORDER BY e.id
+"""
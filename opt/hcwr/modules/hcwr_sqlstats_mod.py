@@ -0,0 +1,262 @@
+# -----------------------------------------------------------------------------------------
+# Project:        "hcwr - heco Weekly Report" for Wochenfazit from Bernhard Reiter
+# File:           hcwr_sqlstats_mod.py
+# Authors:        Christian Klose <cklose@intevation.de>
+#                 Raimund Renkert <rrenkert@intevation.de>
+# GitHub:         https://github.com/GhostCoder74/heco-weekly-report (GhostCoder74)
+# Copyright (c) 2024-2026 by Intevation GmbH
+# SPDX-License-Identifier: GPL-2.0-or-later
+#
+# File version:   1.0.0
+#
+# This file is part of "hcwr - heco Weekly Report"
+# Do not remove this header.
+# Wochenfazit URL:
+# https://heptapod.host/intevation/getan/-/blob/branch/default/getan/templates/wochenfazit
+# Header added by https://github.com/GhostCoder74/Set-Project-Headers
+# -----------------------------------------------------------------------------------------
+#
+# SQL-Instrumentierung: get_connection() liefert Verbindungen, deren execute() über
+# InstrumentedConnection/InstrumentedCursor läuft. Jede Ausführung wird unter dem Namen
+# aus DB_QUERIES (z. B. "whours_sql") mit Anzahl und Laufzeit in HCWR_GLOBALS.SQL_STATS
+# gezählt, die langsamsten Ausführungen stehen im Slow-Query-Log. Mit sql_budget() lässt
+# sich prüfen, dass ein Ablauf höchstens N Statements ausführt (keine N+1 Abfragen).
+import sys
+import time
+import heapq
+from contextlib import contextmanager
+
+# Import von eigenem Module
+from hcwr_globals_mod import HCWR_GLOBALS
+from hcwr_dbg_mod import warning
+
+# Einträge im Slow-Query-Log
+SLOW_LOG_SIZE = 10
+
+# Module mit benannten Abfragen, aus denen die Namen für die Statistik kommen
+QUERY_MODULES = ("hcwr_sqlite_queries_sql", "hcwr_pg_queries_sql")
+
+class SqlBudgetExceeded(AssertionError):
+    """Ein Ablauf hat mehr SQL-Statements ausgeführt als mit sql_budget() erlaubt."""
+
+class SqlStats:
+    """
+    Anzahl und Laufzeit je benannter Abfrage sowie die langsamsten Ausführungen eines Laufs.
+
+    queries: {name: [Anzahl, Sekunden]}
+    slow:    Min-Heap [(Sekunden, lfd. Nr., name, sql, params, Datenbank)] mit höchstens SLOW_LOG_SIZE Einträgen
+    """
+
+    def __init__(self, slow_log_size=SLOW_LOG_SIZE):
+        self.queries = {}
+        self.slow = []
+        self.slow_log_size = slow_log_size
+        self.total = 0
+        self.seconds = 0.0
+        self.names = {}
+        self.names_loaded = ()
+
+    def query_name(self, sql):
+        """Name der Abfrage in DB_QUERIES, sonst der Anfang des Statements."""
+        loaded = tuple(name for name in QUERY_MODULES if name in sys.modules)
+        if loaded != self.names_loaded:
+            for module_name in loaded:
+                for name, value in vars(sys.modules[module_name]).items():
+                    if isinstance(value, str) and not name.startswith("_"):
+                        self.names.setdefault(value, name)
+            self.names_loaded = loaded
+        name = self.names.get(sql)
+        if name is None:
+            name = " ".join(str(sql).split())[:60]
+            self.names[sql] = name
+        return name
+
+    def record(self, sql, params, seconds, target=None):
+        name = self.query_name(sql)
+        entry = self.queries.get(name)
+        if entry is None:
+            self.queries[name] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+        self.total += 1
+        self.seconds += seconds
+
+        item = (seconds, self.total, name, sql, params, target)
+        if len(self.slow) < self.slow_log_size:
+            heapq.heappush(self.slow, item)
+        elif seconds > self.slow[0][0]:
+            heapq.heapreplace(self.slow, item)
+
+        # --profile zählt je Phase mit -> ../modules/hcwr_profile_mod.py
+        if HCWR_GLOBALS.PROFILE is not None:
+            HCWR_GLOBALS.PROFILE.count_statement(seconds)
+
+    def top(self, limit=10):
+        """[(name, Anzahl, Sekunden)] nach Gesamtlaufzeit absteigend."""
+        rows = [(name, count, seconds) for name, (count, seconds) in self.queries.items()]
+        return sorted(rows, key=lambda r: r[2], reverse=True)[:limit]
+
+    def slowest(self):
+        """Slow-Query-Log, langsamste Ausführung zuerst."""
+        return sorted(self.slow, reverse=True)
+
+def get_sql_stats():
+    """SqlStats des Laufs, beim ersten Zugriff angelegt."""
+    if HCWR_GLOBALS.SQL_STATS is None:
+        HCWR_GLOBALS.SQL_STATS = SqlStats()
+    return HCWR_GLOBALS.SQL_STATS
+
+class InstrumentedCursor:
+    """Cursor, dessen execute()/executemany() in SqlStats gezählt werden, alles andere geht durch."""
+
+    def __init__(self, cursor, target=None):
+        object.__setattr__(self, "_cursor", cursor)
+        object.__setattr__(self, "_target", target)
+
+    def execute(self, sql, params=None):
+        t0 = time.perf_counter()
+        try:
+            # Ohne Parameter wie bisher aufrufen, psycopg wertet sonst % im Statement aus
+            if params is None:
+                self._cursor.execute(sql)
+            else:
+                self._cursor.execute(sql, params)
+        finally:
+            get_sql_stats().record(sql, params, time.perf_counter() - t0, self._target)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        t0 = time.perf_counter()
+        try:
+            self._cursor.executemany(sql, seq_of_params)
+        finally:
+            get_sql_stats().record(sql, None, time.perf_counter() - t0, self._target)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._cursor.__exit__(*exc)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+class InstrumentedConnection:
+    """
+    DB-API Verbindung mit InstrumentedCursor. conn.execute()/executescript() (nur SQLite)
+    werden ebenfalls gezählt, alle übrigen Attribute gehen an die Verbindung durch.
+    """
+
+    def __init__(self, conn, target=None):
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_target", target)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs), self._target)
+
+    def execute(self, sql, params=None):
+        t0 = time.perf_counter()
+        try:
+            if params is None:
+                return self._conn.execute(sql)
+            return self._conn.execute(sql, params)
+        finally:
+            get_sql_stats().record(sql, params, time.perf_counter() - t0, self._target)
+
+    def executescript(self, sql):
+        t0 = time.perf_counter()
+        try:
+            return self._conn.executescript(sql)
+        finally:
+            get_sql_stats().record(sql, None, time.perf_counter() - t0, self._target)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+def instrument_connection(conn, target=None):
+    """Hüllt eine neue DB-API Verbindung zu 'target' (Pfad oder DSN) für SqlStats ein."""
+    return InstrumentedConnection(conn, target)
+
+@contextmanager
+def sql_budget(limit, label="Ablauf"):
+    """
+    Prüft, dass im with-Block höchstens 'limit' SQL-Statements ausgeführt werden.
+
+    Beispiel:
+        with sql_budget(10, "Wochenbericht"):
+            ...
+
+    Wirft SqlBudgetExceeded mit den häufigsten Abfragen des Blocks.
+    """
+    stats = get_sql_stats()
+    before_total = stats.total
+    before = {name: values[0] for name, values in stats.queries.items()}
+    yield stats
+    used = stats.total - before_total
+    if used > limit:
+        counts = sorted(((values[0] - before.get(name, 0), name) for name, values in stats.queries.items()),
+                        reverse=True)
+        detail = ", ".join(f"{name} x{count}" for count, name in counts[:5] if count)
+        raise SqlBudgetExceeded(f"{label}: {used} SQL-Statements, erlaubt sind {limit} ({detail})")
+
+def explain_plan(connections, target, sql, params):
+    """
+    EXPLAIN QUERY PLAN für ein lesendes Statement auf 'target' (nur SQLite), sonst None.
+    Die Verbindungen in 'connections' {target: conn} werden bei Bedarf geöffnet.
+    """
+    if target is None or not str(sql).lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    try:
+        conn = connections.get(target)
+        if conn is None:
+            import sqlite3
+            from hcwr_config_mod import isoweek
+            conn = connections[target] = sqlite3.connect(target)
+            conn.create_function("isoweek", 3, isoweek)
+        return [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params or ()).fetchall()]
+    except Exception as e:
+        return [f"FEHLER: {e}"]
+
+def format_sql_stats(stats, limit=10, explain=False):
+    """
+    Zeilen für die Ausgabe: Abfragen nach Gesamtlaufzeit und Slow-Query-Log,
+    mit 'explain' zusätzlich EXPLAIN QUERY PLAN je langsamer Abfrage (nur SQLite).
+    """
+    lines = [f"{'Abfrage':<40} | {'Anzahl':>6} | {'ms':>9} | {'ms/Aufruf':>9}"]
+    lines.append("-" * 40 + "-+-" + "-" * 6 + "-+-" + "-" * 9 + "-+-" + "-" * 9)
+    for name, count, seconds in stats.top(limit):
+        lines.append(f"{name[:40]:<40} | {count:>6} | {seconds * 1000:>9.2f} | {seconds * 1000 / count:>9.3f}")
+    lines.append(f"{'Gesamt':<40} | {stats.total:>6} | {stats.seconds * 1000:>9.2f} |")
+    lines.append("")
+    lines.append("Langsamste Ausführungen:")
+    if explain and HCWR_GLOBALS.DBMS.__name__ != "sqlite3":
+        warning("EXPLAIN QUERY PLAN", "ist nur für SQLite verfügbar")
+        explain = False
+    connections = {}
+    for seconds, n, name, sql, params, target in stats.slowest()[:limit]:
+        lines.append(f"{seconds * 1000:>9.2f} ms  #{n:<5} {name}")
+        if explain:
+            for detail in explain_plan(connections, target, sql, params) or []:
+                lines.append(f"{'':>16}{detail}")
+    for conn in connections.values():
+        conn.close()
+    return lines
@@ -26,8 +26,10 @@ from decimal import Decimal, InvalidOperation
 # Import von eigenem Module
 from hcwr_globals_mod import HCWR_GLOBALS
 from hcwr_dbg_mod import debug, info, warning, get_function_name, show_process_route, debug_sql
-from hcwr_json_mod import to_json, output
+from hcwr_json_mod import to_json, output, stream_output
 from hcwr_utils_mod import format_decimal, input_with_prefill
+from hcwr_dbms_mod import get_connection
+from hcwr_fts_mod import attach_fts_index, fts_match_expr
 
 def format_string_to_block(s: str, max_line_length: int = 80) -> str:
     """
@@ -186,7 +188,7 @@ def parse_duration(duration):
 
     return result
 
-def build_sql_from_search(search_raw, ph, PROJECT_EXPR):
+def build_sql_from_search(search_raw, ph, PROJECT_EXPR, use_fts=False):
     """
     Parse a search expression into a WHERE-clause + params.
     Supports:
@@ -197,6 +199,8 @@ def build_sql_from_search(search_raw, ph, PROJECT_EXPR):
       - Category prefix: C=...  -> uses PROJECT_EXPR
       - Wildcards: '*' -> SQL LIKE (value converted to %)
       - Parameterized output using placeholder `ph` (e.g. '?' or '%s')
+      - use_fts: operands not under NOT get a MATCH pre-filter on hcwr_fts.entries_fts
+        (hcwr_fts_mod.attach_fts_index), the LIKE/= condition stays as exact check
     Returns:
       (where_sql_string, params_list)
 
@@ -291,7 +295,7 @@ def build_sql_from_search(search_raw, ph, PROJECT_EXPR):
 
     # --- Build SQL fragment objects from postfix ---
     # We represent a fragment as tuple (sql_string, params_list)
-    def make_operand_fragment(token):
+    def make_operand_fragment(token, fts_ok=False):
         # handle escaped leading \! (user might have typed "\!foo" — treat as literal "!" in value)
         negate = False
         tok = token
@@ -330,10 +334,17 @@ def build_sql_from_search(search_raw, ph, PROJECT_EXPR):
             sql = f"{column} = {ph}"
             param = val
 
+        params = [param]
+        if fts_ok and not negate:
+            match = fts_match_expr(val, "project" if column == PROJECT_EXPR else "description")
+            if match:
+                sql = f"({HCWR_GLOBALS.DB_QUERIES.fts_match} AND {sql})"
+                params = [match, param]
+
         if negate:
             sql = f"NOT ({sql})"
 
-        return (sql, [param])
+        return (sql, params)
 
     def combine_fragments(a, b, op):
         a_sql, a_params = a
@@ -353,9 +364,26 @@ def build_sql_from_search(search_raw, ph, PROJECT_EXPR):
     tokens = fix_parentheses(tokens)
     postfix = to_postfix(tokens)
 
+    # Operanden unter einer ungeraden Anzahl NOT bekommen keinen MATCH Vorfilter:
+    # bei description = NULL wäre NOT (MATCH AND LIKE) wahr, NOT (LIKE) aber NULL
+    positive = {}
+    if use_fts:
+        pstack = []
+        for i, t in enumerate(postfix):
+            if t == "!":
+                if pstack:
+                    pstack[-1] = [(j, not pos) for j, pos in pstack[-1]]
+            elif t in ("&", "|"):
+                if len(pstack) >= 2:
+                    b = pstack.pop()
+                    pstack[-1] = pstack[-1] + b
+            else:
+                pstack.append([(i, True)])
+        positive = {j: pos for frag in pstack for j, pos in frag}
+
     # Evaluate postfix into SQL fragments
     stack = []
-    for t in postfix:
+    for i, t in enumerate(postfix):
         if t == "!":
             if not stack:
                 # malformed but try to recover: skip
@@ -373,7 +401,7 @@ def build_sql_from_search(search_raw, ph, PROJECT_EXPR):
             stack.append(combine_fragments(a, b, t))
         else:
             # operand
-            stack.append(make_operand_fragment(t))
+            stack.append(make_operand_fragment(t, positive.get(i, False)))
 
     if not stack:
         return ("", [])
@@ -412,11 +440,32 @@ def build_sql_from_search(search_raw, ph, PROJECT_EXPR):
             show_process_route()
     return result
 
-def fetch_and_display_entries(search = "", asListObj = False, stdout = True):
-    fname = get_function_name()
+def sum_times_by_entry(data):
+    """
+    Fasst Zeilen mit gleichem Entry-Text zu einer Zeile zusammen (--sum-times).
+    Die Dauer steht danach in Sekunden in Spalte 4, die Reihenfolge ist die des ersten Auftretens.
+    """
+    totals = {}
+    for line in data:
+        idx, category, start, end, duration, entry = line
+        duration_sec = parse_duration(duration)
 
-    conn = HCWR_GLOBALS.DBMS.connect(HCWR_GLOBALS.args.database)
-    cursor = conn.cursor()
+        existing = totals.get(entry)
+        if existing:
+            existing[4] += duration_sec
+        else:
+            totals[entry] = [idx, category, start, end, duration_sec, entry]
+    return list(totals.values())
+
+def build_jobtime_conditions(search=""):
+    """
+    WHERE-Bedingungen für die Job-Entries (-J) aus -s/--search, -T, -a, -B/-E und KW.
+
+    Rückgabe:
+        (conditions, params, search_raw, use_fts), conditions ist leer wenn nichts gefiltert wird,
+        use_fts ist True wenn die Bedingungen den FTS5 Volltextindex (hcwr_fts_mod) verwenden
+    """
+    fname = get_function_name()
 
     conditions = []
     params = []
@@ -434,6 +483,7 @@ def fetch_and_display_entries(search = "", asListObj = False, stdout = True):
     elif search and HCWR_GLOBALS.args.search:
         search_raw = search + "&(" + HCWR_GLOBALS.args.search + ")"
 
+    # S= Gruppierung ist nicht umgesetzt, der Suchparameter wird hier abgewiesen
     if "S=" in search_raw:
         info(Fore.WHITE + "Suchparameter " + Fore.RED + "'S=' " + Fore.WHITE + "ist nicht mit Option:",Fore.RED + "-z/--zeiterfassung" + Fore.WHITE + " erlaubt!")
         show_process_route()
@@ -454,16 +504,17 @@ def fetch_and_display_entries(search = "", asListObj = False, stdout = True):
     # ------------------------------------------------------------
     # ⭐ NEUER PARSER WIRD HIER AUFGERUFEN
     # ------------------------------------------------------------
+    use_fts = False
     if search_raw:
-        where_expr = build_sql_from_search(search_raw, ph, PROJECT_EXPR)
+        # FTS5 Volltextindex nur für SQLite, ohne Index bleibt es bei LIKE
+        use_fts = ph == "?" and attach_fts_index(get_connection(HCWR_GLOBALS.args.database))
+        where_expr = build_sql_from_search(search_raw, ph, PROJECT_EXPR, use_fts)
         conditions.append(where_expr[0])
         params = where_expr[1]
     # ------------------------------------------------------------
 
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         info(f"{fname}:\nsearch_raw = {search_raw}")
-        info(f"asListObj = {asListObj}")
-        info(f"stdout = {stdout}")
         prompt = "Enter für fortfahren oder N für Nein "
         answer = input_with_prefill(prompt, "", '')
         if answer in ("N", "n"):
@@ -488,9 +539,30 @@ def fetch_and_display_entries(search = "", asListObj = False, stdout = True):
                 stop_day.strftime("%Y-%m-%d")
             ])
 
+    return conditions, params, search_raw, use_fts
+
+def build_jobtime_query(conditions, use_fts=False):
+    """jobtime_entries mit WHERE, mit FTS5 Volltextindex als jobtime_entries_fts (gleiche Zeilen und Reihenfolge)."""
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    if use_fts:
+        return HCWR_GLOBALS.DB_QUERIES.jobtime_entries_fts + where + HCWR_GLOBALS.DB_QUERIES.jobtime_entries_fts_order
+    return HCWR_GLOBALS.DB_QUERIES.jobtime_entries + where
+
+def fetch_and_display_entries(search = "", asListObj = False, stdout = True):
+    fname = get_function_name()
+
+    conn = get_connection(HCWR_GLOBALS.args.database)
+    cursor = conn.cursor()
+
+    conditions, params, search_raw, use_fts = build_jobtime_conditions(search)
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"asListObj = {asListObj}")
+        info(f"stdout = {stdout}")
+
     # --- Query ---
     if conditions:
-        query = HCWR_GLOBALS.DB_QUERIES.jobtime_entries + "WHERE " + " AND ".join(conditions)
+        query = build_jobtime_query(conditions, use_fts)
     else:
         query = "SELECT * FROM entries"
 
@@ -521,61 +593,6 @@ def fetch_and_display_entries(search = "", asListObj = False, stdout = True):
             time_difference = calculate_time_difference(start_time, end_time)
             formatted_time = format_time_difference(time_difference)
 
-            description = entry[4]
-
-            # ------------------------------------------------------------
-            # 🔥 Summierungs-Mechanismus für S=
-            # ------------------------------------------------------------
-            search_raw_items = [s.strip() for s in search_raw.replace("|", "°").replace("&", "°").replace("(", "").replace(")", "").split("°")]
-            sum_item_like = [
-                s[2:].strip("*") for s in search_raw_items
-                if s.upper().startswith("S=")
-            ]
-
-            sum_existing = next(
-                (s for s in sum_item_like if s in description),
-                None
-            )
-
-            if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-                info(f"search_raw_items = {search_raw_items}")
-                info(f"sum_item_like = {sum_item_like}")
-                info(f"sum_existing = {sum_existing}")
-                info(f"query = {debug_sql(query, params)}")
-                prompt = "Enter für fortfahren oder N für Nein "
-                answer = input_with_prefill(prompt, "", '')
-                if answer in ("N", "n"):
-                    show_process_route()
-
-            if sum_existing:
-
-                group_key = sum_existing
-                debug(f"group_key = {group_key}")
-
-                existing = next((e for e in data if sum_existing in e[5]), None)
-                duration_sec = parse_duration(formatted_time)
-
-                if existing:
-                    existing[0] = f"{existing[0]}|{entry[0]}"
-                    existing[2] = f"{existing[2]}|{start_time[:16]}"
-                    existing[3] = f"{existing[3]}|{end_time[:16]}"
-                    existing[4] += duration_sec
-                    existing[5] = f"{existing[5]}|{description.strip(sum_existing.strip('/')).strip('/')}"
-                    debug(f"existing = {existing}")
-
-                else:
-                    new_entry = [
-                        entry_id,
-                        entry_cat,
-                        start_time[:16],
-                        end_time[:16],
-                        duration_sec,
-                        f"{group_key}: {description.strip(group_key.strip('/')).strip('/')}"
-                    ]
-                    data.append(new_entry)
-
-                continue
-
             new_entry = list(entry)
             new_entry.insert(4, formatted_time)
             new_entry[0] = entry_id
@@ -607,8 +624,6 @@ def fetch_and_display_entries(search = "", asListObj = False, stdout = True):
             output(line)
         show_process_route()
 
-    conn.close()
-
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
         info(f"DATA = {data}")
         info(f"asListObj = {asListObj}")
@@ -620,18 +635,7 @@ def fetch_and_display_entries(search = "", asListObj = False, stdout = True):
             show_process_route()
     # --- Finale Ausgabe bei --sum-times ---
     if HCWR_GLOBALS.args.sum_times:
-        new_data = []
-
-        for line in data:
-            idx, category, start, end, duration, entry = line
-            duration_sec = parse_duration(duration)
-
-            existing = next((x for x in new_data if x[5] == entry), None)
-
-            if existing:
-                existing[4] += duration_sec
-            else:
-                new_data.append([idx, category, start, end, duration_sec, entry])
+        new_data = sum_times_by_entry(data)
         total_data = []
         for line in new_data:
             sec = line[4]
@@ -674,3 +678,72 @@ def fetch_and_display_entries(search = "", asListObj = False, stdout = True):
                 show_process_route()
         return data
 
+
+# Zeilen je fetchmany() bzw. je Runde des Server-Side-Cursors beim Streaming
+STREAM_FETCH_SIZE = 1000
+
+def iter_rows(cursor, size=STREAM_FETCH_SIZE):
+    """Liefert die Zeilen eines ausgeführten Cursors in Blöcken von 'size' ohne fetchall()."""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+def job_entry_records(rows):
+    """Formatiert Job-Entries einzeln zu dicts für NDJSON/CSV, Zeilen ohne Eintrag (LEFT JOIN) entfallen."""
+    for entry in rows:
+        if not entry[2]:
+            continue
+        start_time = str(entry[2])[:19]
+        end_time = str(entry[3])[:19]
+        seconds = calculate_time_difference(start_time, end_time)
+        yield {
+            "id": entry[0],
+            "category": entry[1],
+            "start": start_time[:16],
+            "end": end_time[:16],
+            "duration": format_time_difference(seconds),
+            "seconds": int(seconds),
+            "description": entry[4],
+        }
+
+def stream_job_entries(fmt="ndjson", search="", out=None):
+    """
+    --stream ndjson|csv: Job-Entries (-J) zeilenweise ausgeben, ohne das Ergebnis im Speicher
+    zu sammeln. SQLite liest per fetchmany(), PostgreSQL über einen Server-Side-Cursor.
+
+    Rückgabe:
+        Anzahl der ausgegebenen Einträge
+    """
+    fname = get_function_name()
+
+    conditions, params, search_raw, use_fts = build_jobtime_conditions(search)
+    # Nur Zeilen mit Eintrag, sortiert nach Entry-ID wie 'hcwr -J -a'
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    query = HCWR_GLOBALS.DB_QUERIES.jobtime_entries_stream + where + HCWR_GLOBALS.DB_QUERIES.jobtime_entries_stream_order
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nfmt = {fmt}")
+        info(f"query = {debug_sql(query, params)}")
+        prompt = "Enter für fortfahren oder N für Nein "
+        answer = input_with_prefill(prompt, "", '')
+        if answer in ("N", "n"):
+            show_process_route()
+
+    conn = get_connection(HCWR_GLOBALS.args.database)
+    if HCWR_GLOBALS.DBMS.__name__ == "sqlite3":
+        cursor = conn.cursor()
+    else:
+        # Benannter Cursor: psycopg holt die Zeilen blockweise vom Server
+        cursor = conn.cursor(name="hcwr_stream_job_entries")
+        cursor.itersize = STREAM_FETCH_SIZE
+
+    try:
+        cursor.execute(query, params)
+        count = stream_output(job_entry_records(iter_rows(cursor)), fmt, out)
+    finally:
+        cursor.close()
+
+    debug(f"{count} Job-Entries als {fmt} ausgegeben")
+    return count
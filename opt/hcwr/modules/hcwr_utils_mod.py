@@ -23,7 +23,9 @@ import grp
 import getpass
 import sys
 import time
+import stat
 import itertools
+from contextlib import contextmanager
 from colorama import init, Fore, Style
 init()
 from datetime import datetime, date, timedelta
@@ -33,6 +35,8 @@ from decimal import Decimal, InvalidOperation
 # Import von eigenem Module
 from hcwr_globals_mod import HCWR_GLOBALS
 from hcwr_dbg_mod import debug, info, warning, get_function_name, show_process_route, debug_sql
+from hcwr_snapshot_mod import get_week_snapshot
+from hcwr_settings_mod import get_settings
 
 # Set locale for decimal formatting
 locale.setlocale(locale.LC_ALL, '')
@@ -126,6 +130,10 @@ def get_wday_short_name(date_str):
 def input_with_prefill(prompt, prefill, end='\n'):
     fname = get_function_name()
     """Input Prompt, der die Möglichkeit bietet, das Value zu setzen umd es bearbeiten zu können."""
+    if HCWR_GLOBALS.BATCH_USER is not None:
+        # hcwr --batch läuft ohne Terminal: die Vorgabe gilt wie Enter
+        print(prompt + prefill, file=sys.stderr, flush=True)
+        return prefill
     def hook():
         fname = get_function_name()
         readline.insert_text(prefill)
@@ -199,34 +207,87 @@ About:
   Python3 Based Executable Script
 """)
 
+def get_week_range(year, week, first_week=None):
+    """
+    Halboffene Grenzen [Montag, Montag der Folgewoche) einer ISO-KW als 'YYYY-MM-DD'.
+    Mit first_week von Montag der KW first_week bis Montag nach der KW week.
+    Für die aktuelle KW werden HCWR_GLOBALS.MONDAY/SUNDAY verwendet.
+    """
+    if first_week is None and HCWR_GLOBALS.MONDAY and HCWR_GLOBALS.MONDAY.isocalendar()[:2] == (int(year), int(week)):
+        monday = HCWR_GLOBALS.MONDAY
+        next_monday = HCWR_GLOBALS.SUNDAY + timedelta(days=1)
+    else:
+        monday = date.fromisocalendar(int(year), int(first_week or week), 1)
+        next_monday = date.fromisocalendar(int(year), int(week), 1) + timedelta(days=7)
+    return monday.strftime("%Y-%m-%d"), next_monday.strftime("%Y-%m-%d")
+
+def get_week_filter(query, year, week, first_week=None):
+    """
+    Liefert SQL und Parameter einer SQLite-KW-Abfrage (whours_sql, wdayhours_sql, absence, week_absence_days).
+
+    Standard sind indexfähige Bereichsgrenzen auf start_time/stop_time aus get_week_range().
+    Mit [Database] week_filter = isoweek wird die alte Variante mit der Python UDF isoweek() verwendet.
+    """
+    fname = get_function_name()
+
+    if get_settings().week_filter == "isoweek":
+        sql = getattr(HCWR_GLOBALS.DB_QUERIES, f"{query}_isoweek")
+        params = [year, first_week or week, year, week]
+    else:
+        start, stop = get_week_range(year, week, first_week)
+        sql = getattr(HCWR_GLOBALS.DB_QUERIES, query)
+        params = [start, stop, start, stop]
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\nsql = {debug_sql(sql, params)}")
+    return sql, params
+
 #  if wday is Krank, Urlaub, Feiertag
-def has_wday_absence(conn, weekday_num, year, week):
+def get_wday_absences(conn, year, week):
     """
-    Checks if there are any entries for 'Krank', 'Urlaub' or 'Feiertag' on a given weekday.
+    Ermittelt mit einer Abfrage alle Wochentage der ISO-KW mit Einträgen für 'Krank', 'Urlaub' oder 'Feiertag'.
 
     :param conn: db connection
-    :param weekday_num: '1' = Mo, '2' = Di, ..., '7' = So
     :param year: ISO year
     :param week: ISO calendar week
-    :return: True if there are any such entries on that weekday
+    :return: set der Wochentagsnummern wie in HCWR_GLOBALS.WEEKDAY_MAP ('1' = Mo, ..., '7' = So)
     """
     fname = get_function_name()
 
-    sql = HCWR_GLOBALS.DB_QUERIES.wday_absence
+    snapshot = get_week_snapshot(year, week)
+    if snapshot is not None:
+        return snapshot.get_absence_weekdays()
+
     cursor = conn.cursor()
-    if HCWR_GLOBALS.CFG.has_option("Database", "dbms") and HCWR_GLOBALS.CFG.get("Database", "dbms") == "pg":
-        if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-            info(f"sql = {debug_sql(sql, [year, week, year, week, weekday_num])}")
-        cursor.execute(sql, [year, week, year, week, weekday_num])
+    if get_settings().is_pg:
+        start, stop = get_week_range(year, week)
+        sql, params = HCWR_GLOBALS.DB_QUERIES.week_absence_days, [start, stop, start, stop]
     else:
-        cursor.execute(sql, [year, week, year, week, weekday_num])
-    count = cursor.fetchone()[0]
+        sql, params = get_week_filter("week_absence_days", year, week)
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"sql = {debug_sql(sql, params)}")
+    cursor.execute(sql, params)
+    # SQLite liefert So = 0, pg ISODOW So = 7
+    absences = {str(int(row[0]) or 7) for row in cursor.fetchall()}
     if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
-        info(f"{fname}:\ncount = {count}")
+        info(f"{fname}:\nabsences = {absences}")
         show_process_route()
         sys.exit(0)
 
-    return count > 0
+    return absences
+
+def has_wday_absence(conn, weekday_num, year, week):
+    """
+    Checks if there are any entries for 'Krank', 'Urlaub' or 'Feiertag' on a given weekday.
+    Für mehrere Wochentage einer KW besser einmal get_wday_absences() verwenden.
+
+    :param conn: db connection
+    :param weekday_num: '1' = Mo, '2' = Di, ..., '7' = So
+    :param year: ISO year
+    :param week: ISO calendar week
+    :return: True if there are any such entries on that weekday
+    """
+    return str(weekday_num) in get_wday_absences(conn, year, week)
 
 def get_wday_diff(conn, wdays, year, week):
     """Collect and print weekday deviations only if there are any."""
@@ -235,6 +296,9 @@ def get_wday_diff(conn, wdays, year, week):
     lines = [""]
     default_comment = HCWR_GLOBALS.REMINDER_TXT
 
+    # Abwesenheiten aller Wochentage mit einer Abfrage, der Rest läuft im Speicher
+    absences = get_wday_absences(conn, year, week)
+
     for dayname, stunden in wdays.items():
         try:
             stunden = Decimal(stunden)
@@ -246,7 +310,7 @@ def get_wday_diff(conn, wdays, year, week):
         weekday_num = weekday_map[dayname]
 
         # Skip if the day has only absence entries
-        if has_wday_absence(conn, weekday_num, year, week):
+        if weekday_num in absences:
             continue
 
         # Check for deviation from expected hours
@@ -291,6 +355,69 @@ def chgrp(path, group_name):
     except Exception as e:
         print("Fehler:", e)
 
+@contextmanager
+def file_lock(path):
+    """
+    Exklusive Sperre über die Lockdatei '<path>.lock' (fcntl.lockf, funktioniert auch auf NFS).
+    Damit überschreiben sich z. B. ein cron-Lauf und ein interaktiver Lauf nicht gegenseitig die Config.
+    Lässt sich die Lockdatei nicht anlegen, wird ohne Sperre weitergearbeitet.
+    """
+    import fcntl
+    fname = get_function_name()
+    lock_path = os.path.realpath(path) + ".lock"
+    try:
+        lock_file = open(lock_path, "a")
+    except OSError as e:
+        debug(f"Keine Lockdatei {lock_path}: {e}")
+        yield
+        return
+    try:
+        fcntl.lockf(lock_file, fcntl.LOCK_EX)
+        yield
+    finally:
+        lock_file.close()  # gibt auch die Sperre frei
+
+def write_file_if_changed(path, content):
+    """
+    Schreibt content nach path, aber nur wenn sich der Inhalt von der Datei unterscheidet.
+    Geschrieben wird in eine temporäre Datei im selben Verzeichnis, die dann per os.replace()
+    die alte ersetzt: Leser sehen immer die alte oder die neue Datei, nie eine halbe.
+    Die Rechte der alten Datei bleiben erhalten, Symlinks werden aufgelöst.
+
+    Rückgabe:
+        True, wenn geschrieben wurde
+    """
+    import tempfile
+    fname = get_function_name()
+    target = os.path.realpath(path)
+    try:
+        with open(target, "r") as f:
+            if f.read() == content:
+                return False
+        mode = stat.S_IMODE(os.stat(target).st_mode)
+    except FileNotFoundError:
+        # Wie open(path, "w"): 0666 abzüglich umask
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(target)}.", suffix=".tmp", dir=os.path.dirname(target))
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    if fname in HCWR_GLOBALS.DBG_BREAK_POINT:
+        info(f"{fname}:\n{target} geschrieben ({len(content)} Zeichen)")
+    return True
+
 def progress_bar(pos, maxval, msg=""):
     """
     Zeichnet eine farbige Progressbar mit animiertem Spinner.
@@ -27,9 +27,10 @@ from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 # Import von eigenem Module
 from hcwr_globals_mod import HCWR_GLOBALS
 from hcwr_dbg_mod import debug, info, warning, get_function_name, show_process_route
-from hcwr_utils_mod import format_decimal, get_wday_diff, input_with_prefill, chgrp
+from hcwr_utils_mod import format_decimal, get_wday_diff, input_with_prefill, chgrp, write_file_if_changed
 from hcwr_extexec_mod import run_wochenfazit
 from hcwr_tasks_mod import get_my_tasks 
+from hcwr_settings_mod import get_settings
 
 def SecToHours(sec, xtype=","):
     result = Decimal(sec / 3600).quantize(Decimal("0.0"), rounding=ROUND_HALF_UP)
@@ -74,15 +75,12 @@ def generate_report(work_hours, kw_should, contract_hours, feiertage, urlaub, ab
     # Tagabweichungen hinzufügen (erst jetzt!)
     report_lines.append(get_wday_diff(conn, wdays, HCWR_GLOBALS.args.year, HCWR_GLOBALS.args.week))
 
-    conn.close()
-
     if work_hours > 0 and kw_should > 0:
 
         # TODO: Per config option oder arg eine Uniq-Liste der Tätigkeiten der KW einfügen wenn dies gesetzt wurde.
         my_tasks = None
-        if HCWR_GLOBALS.CFG.has_option('General', 'insert_tasks'):
-            if HCWR_GLOBALS.CFG.get("General", "insert_tasks").lower() == "true":
-                my_tasks = get_my_tasks()
+        if get_settings().insert_tasks:
+            my_tasks = get_my_tasks()
 
         # my_tasks ist noch in Arbeit
         if my_tasks is None:
@@ -140,19 +138,18 @@ def generate_report(work_hours, kw_should, contract_hours, feiertage, urlaub, ab
                 uuk_entries = sub.get('uuk')
                 if int(HCWR_GLOBALS.DBG_LEVEL) == -99:
                     info("uuk_entries = ",uuk_entries)
-                    debug(f"config = {HCWR_GLOBALS.has_option('General', 'show_uuk')}")
+                    debug(f"config = {get_settings().show_uuk}")
                 if uuk_entries != None:
-                    if HCWR_GLOBALS.CFG.has_option("General", "show_uuk"):
-                        if HCWR_GLOBALS.CFG.get("General", "show_uuk").lower() == "true":
+                    if get_settings().show_uuk:
+                        if int(HCWR_GLOBALS.DBG_LEVEL) == -99:
+                            info("uuk = ",uuk_entries)
+                        if isinstance(uuk_entries, dict):
                             if int(HCWR_GLOBALS.DBG_LEVEL) == -99:
-                                info("uuk = ",uuk_entries)
-                            if isinstance(uuk_entries, dict):
-                                if int(HCWR_GLOBALS.DBG_LEVEL) == -99:
-                                    info("uuk is dict")
-                                desc = uuk_entries['description']
-                                dur = uuk_entries['duration']
-                                if desc and dur is not None:
-                                    report_lines.append(f"{desc}: {SecToHours(dur)}")
+                                info("uuk is dict")
+                            desc = uuk_entries['description']
+                            dur = uuk_entries['duration']
+                            if desc and dur is not None:
+                                report_lines.append(f"{desc}: {SecToHours(dur)}")
 
     if zk_minus > 0:
         report_lines.append(f"\nPS:\n  {HCWR_GLOBALS.MAPPING['zk_minus'][0]}: {SecToHours(zk_minus)}")
@@ -172,6 +169,12 @@ def handle_output(report_content: str):
 
     if HCWR_GLOBALS.args.dry_run:
         print(report_content)
+    elif HCWR_GLOBALS.BATCH_USER is not None:
+        # hcwr --batch: ohne vim und Prüfung direkt und atomar speichern
+        os.makedirs(os.path.dirname(HCWR_GLOBALS.KW_REPORT_FILE), exist_ok=True)
+        write_file_if_changed(HCWR_GLOBALS.KW_REPORT_FILE, report_content + "\n")
+        print(f"Bericht gespeichert unter: {HCWR_GLOBALS.KW_REPORT_FILE}", file=sys.stderr)
+        chgrp(HCWR_GLOBALS.KW_REPORT_FILE, HCWR_GLOBALS.args.group)
     else:
         # Zielpfade vorbereiten
         kwd = HCWR_GLOBALS.KW_REPORT_DIR